@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+同步路径 vs 异步路径吞吐对比
+
+在本地启动模拟节点（Ethereum/Solana JSON-RPC 与 Vechain REST），
+以 N 个并发调用方分别驱动同步方法（逐个阻塞执行，等同于旧版同步工具）
+和异步方法（asyncio.gather 并发执行），输出每秒请求数。
+
+用法:
+    python benchmarks/bench_async.py --callers 50 --latency-ms 50
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+from aiohttp import web
+
+from blockchain_mcp.ethereum import Ethereum
+from blockchain_mcp.solana import SolanaBlockchain
+from blockchain_mcp.vechain import Vechain
+
+ADDRESS = "0xd3CdA913deB6f67967B99D67aCDFa1712C293601"
+
+
+def _make_app(latency: float) -> web.Application:
+    async def jsonrpc(request):
+        await asyncio.sleep(latency)
+        body = await request.json()
+        if body["method"] == "getBalance":
+            result = {"context": {"slot": 1}, "value": 1_000_000_000}
+        else:
+            result = hex(10**18)
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": result})
+
+    async def account(request):
+        await asyncio.sleep(latency)
+        return web.json_response({"balance": hex(10**18), "energy": hex(10**18), "hasCode": False})
+
+    app = web.Application()
+    app.router.add_post("/rpc", jsonrpc)
+    app.router.add_get("/thor/accounts/{address}", account)
+    return app
+
+
+def start_mock_node(latency: float) -> str:
+    """在后台线程启动模拟节点，返回基础URL"""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder = {}
+
+    async def _start():
+        runner = web.AppRunner(_make_app(latency), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        holder["port"] = site._server.sockets[0].getsockname()[1]
+        ready.set()
+
+    def _run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(_start())
+        loop.run_forever()
+
+    threading.Thread(target=_run, daemon=True).start()
+    ready.wait()
+    return f"http://127.0.0.1:{holder['port']}"
+
+
+def bench_sync(client, address: str, callers: int) -> float:
+    start = time.perf_counter()
+    for _ in range(callers):
+        client.get_balance(address)
+    return callers / (time.perf_counter() - start)
+
+
+async def bench_async(client, address: str, callers: int) -> float:
+    await client.get_balance_async(address)  # 预热连接
+    start = time.perf_counter()
+    await asyncio.gather(*(client.get_balance_async(address) for _ in range(callers)))
+    return callers / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=50, help="并发调用方数量")
+    parser.add_argument("--latency-ms", type=float, default=50, help="模拟节点响应延迟（毫秒）")
+    args = parser.parse_args()
+
+    base_url = start_mock_node(args.latency_ms / 1000)
+    clients = {
+        "ethereum": (Ethereum(f"{base_url}/rpc"), ADDRESS),
+        "solana": (SolanaBlockchain(f"{base_url}/rpc"), "3wf3Ttu4UhGC6ff1N7NVruXjdhsiP2CgPDMo4qhBApK9"),
+        "vechain": (Vechain(f"{base_url}/thor"), ADDRESS),
+    }
+
+    results = {}
+    for name, (client, address) in clients.items():
+        sync_rps = bench_sync(client, address, args.callers)
+        async_rps = asyncio.run(bench_async(client, address, args.callers))
+        results[name] = {
+            "sync_rps": round(sync_rps, 1),
+            "async_rps": round(async_rps, 1),
+            "speedup": round(async_rps / sync_rps, 1),
+        }
+    print(json.dumps({"callers": args.callers, "latency_ms": args.latency_ms, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+链头跟踪：以太坊/Solana 轮询与 Vechain 区块订阅
+
+启动 mock_nodes.py 的模拟节点，用与服务相同的 HeadTrackerService 跟随各链链头 --seconds 秒：
+以太坊轮询 eth_blockNumber，Solana 轮询 getSlot，Vechain 订阅 /subscriptions/block websocket
+（模拟节点逐个推送链头前 --head-blocks 个区块，每 --reorg-every 个区块推送一条 obsolete 消息）。
+
+每条链输出跟踪到的链头高度、更新次数、重组次数、错误次数，以及链头查询（latest/best）是否由内存链头返回、
+未访问节点。Vechain 另外检查重组是否清除了缓存中的 best 区块；任一检查失败时以非零状态退出。
+
+用法:
+    python benchmarks/bench_head_tracking.py --seconds 3 --reorg-every 10
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import urllib.request
+from typing import Dict
+
+from mock_nodes import ETHEREUM_HEAD, SOLANA_HEAD_SLOT, VECHAIN_HEAD, MockConfig, start_mock_nodes
+
+
+def upstream_requests(urls: Dict[str, str]) -> Dict[str, int]:
+    base = urls["COINGECKO_API_URL"].rsplit("/", 1)[0]
+    with urllib.request.urlopen(base + "/stats") as response:
+        return json.load(response)["requests"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0, help="跟随链头的时间")
+    parser.add_argument("--head-blocks", type=int, default=30, help="Vechain 区块订阅推送的区块数")
+    parser.add_argument("--head-interval-ms", type=float, default=50.0, help="区块订阅的推送间隔（毫秒）")
+    parser.add_argument("--reorg-every", type=int, default=10, help="每推送该数量的区块模拟一次分叉（0 为不模拟）")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="模拟节点每个请求的延迟")
+    parser.add_argument("--output", help="结果JSON保存路径")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms, txs_per_block=20, head_blocks=args.head_blocks,
+        head_interval_ms=args.head_interval_ms, reorg_every=args.reorg_every
+    )
+    urls, process = start_mock_nodes(config)
+    # 不读写用户目录下的磁盘预热缓存；轮询间隔缩短以便在短时间内完成多轮
+    os.environ.update(urls, BLOCKCHAIN_MCP_WARM_CACHE="", BLOCKCHAIN_MCP_HEAD_POLL_INTERVAL="0.2")
+
+    from blockchain_mcp.block_cache import BLOCK_CACHE
+    from blockchain_mcp.ethereum import Ethereum
+    from blockchain_mcp.head_tracker import HEAD_TRACKERS
+    from blockchain_mcp.solana import SolanaBlockchain
+    from blockchain_mcp.vechain import Vechain
+
+    chains = {
+        "ethereum": (Ethereum(urls["ETHEREUM_NODE_URL"]), ETHEREUM_HEAD),
+        "solana": (SolanaBlockchain(urls["SOLANA_NODE_URL"]), SOLANA_HEAD_SLOT),
+        "vechain": (Vechain(urls["VECHAIN_NODE_URL"]), VECHAIN_HEAD),
+    }
+    try:
+        # 先缓存一次 best 区块（TTL 延长到整个运行期间），重组时应被清除
+        BLOCK_CACHE.head_ttl = args.seconds + 60
+        vechain = chains["vechain"][0]
+        vechain.get_block_info(vechain.head_tag)
+        best_key = vechain._cache_key("block", vechain.head_tag)
+
+        HEAD_TRACKERS.start(bc for bc, _ in chains.values())
+        time.sleep(args.seconds)
+        stats = HEAD_TRACKERS.stats()
+
+        results = {}
+        for name, (bc, expected) in chains.items():
+            before = upstream_requests(urls).get(name, 0)
+            response = bc.get_block_info(bc.head_tag)
+            served_from_memory = upstream_requests(urls).get(name, 0) == before
+            results[name] = dict(
+                stats[name], expected_head=expected, head_query_ok=response.success,
+                head_query_upstream_free=served_from_memory
+            )
+        expected_reorgs = args.head_blocks // args.reorg_every if args.reorg_every else 0
+        results["vechain"]["expected_reorgs"] = expected_reorgs
+        results["vechain"]["best_invalidated"] = BLOCK_CACHE.get(best_key) is None if expected_reorgs else None
+    finally:
+        HEAD_TRACKERS.stop()
+        process.terminate()
+
+    failed = False
+    for name, result in results.items():
+        ok = (
+            result["number"] is not None and result["errors"] == 0
+            and result["head_query_ok"] and result["head_query_upstream_free"]
+        )
+        if name == "vechain":
+            ok = ok and result["number"] == result["expected_head"] and result["reorgs"] == result["expected_reorgs"]
+            ok = ok and result["best_invalidated"] is not False
+        failed = failed or not ok
+        print(
+            f"{name:<9} head={result['number']} updates={result['updates']} reorgs={result['reorgs']} "
+            f"errors={result['errors']} {'ok' if ok else 'FAILED'}",
+            file=sys.stderr
+        )
+
+    report = {
+        "meta": {
+            "python": platform.python_version(), "platform": platform.platform(), "seconds": args.seconds,
+            "head_blocks": args.head_blocks, "head_interval_ms": args.head_interval_ms, "reorg_every": args.reorg_every,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output)
+    print(output)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+多进程 HTTP/SSE 部署负载测试
+
+对 --workers 中的每个进程数，以 ``BLOCKCHAIN_MCP_TRANSPORT=sse`` 启动服务（节点为 mock_nodes.py 的模拟节点），
+用 --clients 个 MCP SSE 客户端会话并发调用 ``get_blockchain_info``（区块在 --span 个已最终确定的区块中随机选取）
+和 ``get_price``，输出吞吐、p50/p99 延迟、错误数，以及模拟节点实际收到的上游请求数。
+
+各会话的消息 POST 由内核分配到任意工作进程，错误数为0说明跨进程转发正常；
+多进程时上游请求数接近单进程，说明区块与价格结果经共享缓存在进程间复用。
+
+用法:
+    python benchmarks/bench_http.py --workers 1,4 --clients 32 --requests 2000 --latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import aiohttp
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from mock_nodes import VECHAIN_HEAD, MockConfig, start_mock_nodes
+
+# 模拟节点中链头以下180个区块之后的 Vechain 区块为 isFinalized，可被永久（共享）缓存
+FINAL_DEPTH = 200
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_port(port: int, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise TimeoutError(f"server did not listen on port {port}")
+
+
+async def upstream_requests(base_url: str) -> Dict[str, int]:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{base_url}/stats") as response:
+            return (await response.json())["requests"]
+
+
+async def run_clients(url: str, clients: int, requests: int, span: int, price_ratio: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    calls = []
+    for _ in range(requests):
+        if rng.random() < price_ratio:
+            calls.append(("get_price", {"blockchain_name": "vechain"}))
+        else:
+            block = VECHAIN_HEAD - FINAL_DEPTH - rng.randrange(span)
+            calls.append(("get_blockchain_info", {"blockchain_name": "vechain", "block_number": block}))
+    latencies: List[float] = []
+    errors = 0
+    samples = set()
+
+    async def client(share: List[tuple]):
+        nonlocal errors
+        async with sse_client(url) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                for tool, arguments in share:
+                    started = time.perf_counter()
+                    try:
+                        result = await session.call_tool(tool, arguments)
+                        text = result.content[0].text if result.content else "Error: empty result"
+                    except Exception as e:
+                        text = f"Error: {str(e)}"
+                    latencies.append(time.perf_counter() - started)
+                    if text.startswith(("Error", "ValueError")):
+                        errors += 1
+                        samples.add(text[:160])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(calls[i::clients]) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+        "error_samples": sorted(samples)[:3],
+    }
+
+
+async def run_scenario(workers: int, args, env: Dict[str, str], base_url: str) -> dict:
+    port = free_port()
+    scenario_env = dict(
+        env,
+        BLOCKCHAIN_MCP_TRANSPORT="sse",
+        BLOCKCHAIN_MCP_HTTP_PORT=str(port),
+        BLOCKCHAIN_MCP_HTTP_WORKERS=str(workers),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-c", "from blockchain_mcp import main; main()"], env=scenario_env, stderr=subprocess.DEVNULL
+    )
+    try:
+        await wait_for_port(port)
+        before = await upstream_requests(base_url)
+        result = await run_clients(
+            f"http://127.0.0.1:{port}/sse", args.clients, args.requests, args.span, args.price_ratio, args.seed
+        )
+        after = await upstream_requests(base_url)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    result["workers"] = workers
+    result["upstream_requests"] = {chain: after[chain] - before.get(chain, 0) for chain in after}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,4", help="逗号分隔的工作进程数")
+    parser.add_argument("--clients", type=int, default=32, help="并发的 SSE 客户端会话数")
+    parser.add_argument("--requests", type=int, default=2000, help="每个场景的工具调用总数")
+    parser.add_argument("--span", type=int, default=500, help="随机选取区块的范围，决定缓存命中率")
+    parser.add_argument("--price-ratio", type=float, default=0.2, help="get_price 调用的比例")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="模拟节点响应延迟（毫秒）")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="结果JSON保存路径")
+    args = parser.parse_args()
+
+    urls, process = start_mock_nodes(MockConfig(latency_ms=args.latency_ms))
+    base_url = urls["COINGECKO_API_URL"].rsplit("/", 1)[0]
+    source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    # 不写入用户目录下的磁盘预热缓存，每次测量都从冷缓存开始
+    env = dict(os.environ, **urls, BLOCKCHAIN_MCP_LOG_LEVEL="WARNING", BLOCKCHAIN_MCP_CHAINS="vechain", BLOCKCHAIN_MCP_WARM_CACHE="")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [source, os.environ.get("PYTHONPATH")]))
+    for name in ("BLOCKCHAIN_MCP_SHARED_CACHE", "BLOCKCHAIN_MCP_HEAD_TRACKING", "BLOCKCHAIN_MCP_METRICS_PORT"):
+        env.pop(name, None)
+    try:
+        results = []
+        for workers in (int(value) for value in args.workers.split(",")):
+            result = asyncio.run(run_scenario(workers, args, env, base_url))
+            results.append(result)
+            print(
+                f"workers={workers:<3} rps={result['throughput_rps']} p50={result['p50_ms']}ms p99={result['p99_ms']}ms "
+                f"errors={result['errors']} upstream={result['upstream_requests']}",
+                file=sys.stderr
+            )
+    finally:
+        process.terminate()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "clients": args.clients,
+            "requests": args.requests,
+            "span": args.span,
+            "latency_ms": args.latency_ms,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+MCP工具负载测试
+
+在子进程中启动模拟节点（见 mock_nodes.py），把各链客户端和价格接口指向模拟节点，
+通过 ``mcp.call_tool`` 以逐级递增的并发度驱动 server.py 中的每个工具，
+输出每个 (工具, 并发度) 的吞吐、p50/p99 延迟、错误数，以及进程峰值 RSS 和上游RPC指标。
+结果为JSON，可用 --output 保存，用于跨版本对比回归。
+
+区块号、地址和交易哈希在较大范围内随机选取，结果包含缓存命中后的真实表现。
+--endpoints 大于1时启动多个模拟节点并把每条链配置为端点列表，--slow-rate/--slow-ms 只作用于第一个节点，
+用于对比路由、失败切换与对冲（--hedge）的效果；报告的 endpoints 为各端点的路由统计。
+--quota 为每个模拟节点设置每秒请求配额（超出返回 429），配合 BLOCKCHAIN_MCP_RATE_LIMITS 对比客户端限流的效果；
+报告的 ratelimits 为各提供方的排队、拒绝、429 与重试计数。
+
+用法:
+    python benchmarks/bench_load.py --concurrency 1,8,32,128 --requests 400 --latency-ms 20
+    python benchmarks/bench_load.py --endpoints 2 --slow-rate 0.02 --slow-ms 500 --hedge
+    BLOCKCHAIN_MCP_RATE_LIMITS=solana=90 python benchmarks/bench_load.py --quota 100 --tools get_balance
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from web3 import Web3
+
+from mock_nodes import (
+    BITCOIN_HEAD, ETHEREUM_HEAD, SOLANA_HEAD_SLOT, VECHAIN_HEAD, MockChains, MockConfig,
+    btc_address, eth_address, solana_address, start_mock_nodes
+)
+
+CHAINS = ("ethereum", "vechain", "solana", "bitcoin")
+HEAD_TAGS = {"ethereum": "latest", "vechain": "best", "solana": "latest"}
+# 随机选取区块的范围（链头以下），决定缓存命中率
+BLOCK_SPAN = 5000
+
+
+def configure(urls: Dict[str, str], address_index_dir: str, hedge: bool = False):
+    """在创建客户端之前把各模块的节点配置指向模拟节点（节点URL可为逗号分隔的端点列表）"""
+    # 不写入用户目录下的磁盘预热缓存（须在导入缓存模块之前设置）
+    os.environ.setdefault("BLOCKCHAIN_MCP_WARM_CACHE", "")
+    import blockchain_mcp.address_index as address_index
+    import blockchain_mcp.ethereum as ethereum
+    import blockchain_mcp.price_cache as price_cache
+    import blockchain_mcp.router as router
+
+    # 链客户端在首次使用时读取 <链名>_NODE_URL
+    os.environ.update({name: url for name, url in urls.items() if name.endswith("_NODE_URL")})
+    router.ROUTER_HEDGE = hedge
+    price_cache.COINGECKO_PRICE_URL = urls["COINGECKO_API_URL"].split(",")[0] + "/simple/price"
+    ethereum.ADDRESS_INDEX_PATH = address_index_dir
+    address_index.ADDRESS_INDEX_BACKFILL = 200
+
+
+class Workload:
+    """为每个工具生成随机参数"""
+
+    def __init__(self, mock: MockChains, seed: int = 7):
+        self.mock = mock
+        self.random = random.Random(seed)
+        self.pool = mock.config.addresses
+        self.txs = mock.config.txs_per_block
+
+    def chain(self) -> str:
+        return self.random.choice(CHAINS)
+
+    def address(self, chain: str) -> str:
+        index = self.random.randrange(self.pool)
+        if chain == "ethereum":
+            # web3 只接受校验和格式的地址
+            return Web3.to_checksum_address(eth_address(index))
+        return {"bitcoin": btc_address, "solana": solana_address}.get(chain, eth_address)(index)
+
+    def block(self, chain: str) -> int:
+        head = {"ethereum": ETHEREUM_HEAD, "vechain": VECHAIN_HEAD, "solana": SOLANA_HEAD_SLOT, "bitcoin": BITCOIN_HEAD}[chain]
+        return head - self.random.randrange(BLOCK_SPAN)
+
+    def tx_hash(self, chain: str) -> str:
+        height, index = self.block(chain), self.random.randrange(self.txs)
+        return {
+            "ethereum": self.mock.eth_tx_hash,
+            "vechain": self.mock.vet_tx_id,
+            "solana": self.mock.sol_signature,
+            "bitcoin": self.mock.btc_txid,
+        }[chain](height, index)
+
+    def arguments(self) -> Dict[str, Callable[[], dict]]:
+        def blockchain_info():
+            chain = self.chain()
+            block = HEAD_TAGS[chain] if self.random.random() < 0.1 and chain in HEAD_TAGS else self.block(chain)
+            return {"blockchain_name": chain, "block_number": block, "detail": "summary"}
+
+        def balance():
+            chain = self.chain()
+            return {"blockchain_name": chain, "address": self.address(chain)}
+
+        def transaction():
+            chain = self.chain()
+            return {"blockchain_name": chain, "tx_hash": self.tx_hash(chain)}
+
+        def balances():
+            chain = self.chain()
+            return {"blockchain_name": chain, "addresses": [self.address(chain) for _ in range(10)]}
+
+        def transactions():
+            chain = self.chain()
+            return {"blockchain_name": chain, "tx_hashes": [self.tx_hash(chain) for _ in range(10)]}
+
+        def address_transactions():
+            return {"blockchain_name": "ethereum", "address": self.address("ethereum"), "limit": 20}
+
+        def price():
+            return {"blockchain_name": self.chain()}
+
+        def scan():
+            chain = self.chain()
+            start = self.block(chain)
+            return {"blockchain_name": chain, "start": start - 19, "end": start, "fields": ["tx_count"]}
+
+        return {
+            "get_blockchain_info": blockchain_info,
+            "get_balance": balance,
+            "get_transaction": transaction,
+            "get_balances": balances,
+            "get_transactions": transactions,
+            "get_address_transactions": address_transactions,
+            "get_price": price,
+            "scan_blocks": scan,
+        }
+
+
+def is_error(text: str) -> bool:
+    from blockchain_mcp.metrics import TOOL_ERROR_PREFIXES
+    return text.startswith(TOOL_ERROR_PREFIXES) or '"success":false' in text[:200]
+
+
+async def run_level(mcp, tool: str, make_args: Callable[[], dict], concurrency: int, requests: int) -> dict:
+    """以固定并发度执行 requests 次工具调用"""
+    calls = [make_args() for _ in range(requests)]
+    latencies: List[float] = []
+    errors = 0
+    samples = {}
+    position = 0
+
+    async def worker():
+        nonlocal errors, position
+        while position < len(calls):
+            arguments = calls[position]
+            position += 1
+            started = time.perf_counter()
+            try:
+                text = (await mcp.call_tool(tool, arguments))[0].text
+            except Exception as e:
+                text = f"Error: {str(e)}"
+            latencies.append(time.perf_counter() - started)
+            if is_error(text):
+                errors += 1
+                samples.setdefault(text[:160], arguments)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "tool": tool,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+        "peak_rss_mb": peak_rss_mb(),
+        "error_samples": list(samples)[:3],
+    }
+
+
+def peak_rss_mb() -> float:
+    """进程峰值常驻内存（Linux 上 ru_maxrss 单位为 KB，macOS 为字节）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def wait_for_address_index(timeout: float = 60):
+    from blockchain_mcp.chains_factory import GetBlockChain
+    index = GetBlockChain("ethereum").address_index
+    deadline = time.monotonic() + timeout
+    while index.height is None or index.height < ETHEREUM_HEAD - 64:
+        if time.monotonic() > deadline:
+            raise TimeoutError("Address index did not catch up with the mock node")
+        await asyncio.sleep(0.1)
+
+
+async def run(args, urls: Dict[str, str], config: MockConfig) -> dict:
+    from blockchain_mcp import server
+    from blockchain_mcp.chains_factory import GetEndpointStats
+    from blockchain_mcp.metrics import METRICS
+    from blockchain_mcp.ratelimit import RATE_LIMITS
+
+    tools = Workload(MockChains(config)).arguments()
+    selected = args.tools.split(",") if args.tools else list(tools)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    if "get_address_transactions" in selected:
+        await wait_for_address_index()
+    METRICS.reset()
+
+    results = []
+    for tool in selected:
+        for concurrency in levels:
+            result = await run_level(server.mcp, tool, tools[tool], concurrency, args.requests)
+            results.append(result)
+            print(
+                f"{tool:<26} c={concurrency:<4} {result['throughput_rps']:>8} rps  "
+                f"p50={result['p50_ms']}ms p99={result['p99_ms']}ms errors={result['errors']}",
+                file=sys.stderr
+            )
+    return {
+        "meta": {
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "config": {
+            "requests": args.requests, "concurrency": levels, "endpoints": args.endpoints, "hedge": args.hedge,
+            "mock": config.as_dict(),
+        },
+        "results": results,
+        "peak_rss_mb": peak_rss_mb(),
+        "upstream": METRICS.snapshot()["rpc"],
+        "endpoints": GetEndpointStats(),
+        "ratelimits": RATE_LIMITS.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,8,32,128", help="逗号分隔的并发度")
+    parser.add_argument("--requests", type=int, default=400, help="每个 (工具, 并发度) 的调用次数")
+    parser.add_argument("--tools", default="", help="逗号分隔的工具名，默认全部")
+    parser.add_argument("--latency-ms", type=float, default=20, help="模拟节点固定延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=10, help="模拟节点随机延迟上限（毫秒）")
+    parser.add_argument("--txs-per-block", type=int, default=150, help="每个区块的交易数")
+    parser.add_argument("--tx-input-bytes", type=int, default=68, help="每笔交易的调用数据字节数")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="模拟节点返回 HTTP 503 的比例")
+    parser.add_argument("--endpoints", type=int, default=1, help="模拟节点数，每条链配置为对应的端点列表")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="第一个节点额外延迟 --slow-ms 的请求比例")
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="慢请求的额外延迟（毫秒）")
+    parser.add_argument("--hedge", action="store_true", help="开启对冲请求")
+    parser.add_argument("--quota", type=float, default=0.0, help="每个模拟节点的每秒请求配额，超出返回 429")
+    parser.add_argument("--output", help="结果JSON保存路径")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        args.latency_ms, args.jitter_ms, args.txs_per_block, args.tx_input_bytes, args.error_rate,
+        slow_rate=args.slow_rate, slow_ms=args.slow_ms, quota=args.quota
+    )
+    nodes = [start_mock_nodes(config)]
+    for index in range(1, args.endpoints):
+        healthy = MockConfig(
+            args.latency_ms, args.jitter_ms, args.txs_per_block, args.tx_input_bytes, args.error_rate, seed=index + 1,
+            quota=args.quota
+        )
+        nodes.append(start_mock_nodes(healthy))
+    urls = {name: ",".join(node_urls[name] for node_urls, _ in nodes) for name in nodes[0][0]}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            configure(urls, os.path.join(directory, "address-index"), args.hedge)
+            report = asyncio.run(run(args, urls, config))
+    finally:
+        for _, process in nodes:
+            process.terminate()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
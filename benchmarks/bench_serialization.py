@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+响应序列化：旧版多行 f-string vs 结构化模型（紧凑JSON / 文本）
+
+对每类结果（区块、交易、余额、价格）使用代表性的上游原始数据，比较：
+- legacy：旧版 f-string 格式化 + FastMCP 对 BlockchainResponse 的 json.dumps；
+- json：结构化模型经 pydantic-core 紧凑序列化（工具默认输出）；
+- text：结构化模型渲染为逐行文本。
+输出每种方式的响应字节数与单次格式化+序列化耗时（微秒）。
+
+用法:
+    python benchmarks/bench_serialization.py --iterations 20000
+"""
+import argparse
+import json
+import time
+
+import pydantic_core
+from hexbytes import HexBytes
+
+from blockchain_mcp.base import BlockchainResponse
+from blockchain_mcp.ethereum import Ethereum
+from blockchain_mcp.models import serialize
+from blockchain_mcp.solana import SolanaBlockchain
+from blockchain_mcp.vechain import Vechain
+
+
+def _h(index: int, size: int = 32) -> HexBytes:
+    return HexBytes(index.to_bytes(size, "big"))
+
+
+ETH_BLOCK = {
+    "baseFeePerGas": 3_120_482_911, "excessBlobGas": 0, "gasLimit": 30_000_000, "gasUsed": 14_212_003,
+    "hash": _h(1), "miner": "0x95222290DD7278Aa3Ddd389Cc1E1d165CC4BAfe5", "nonce": _h(0, 8), "number": 19_000_000,
+    "mixHash": _h(2), "size": 80_211, "timestamp": 1_705_000_000, "parentBeaconBlockRoot": _h(3),
+    "parentHash": _h(4), "stateRoot": _h(5), "receiptsRoot": _h(6),
+    "transactions": [_h(1000 + index) for index in range(150)],
+}
+ETH_TX = {
+    "hash": _h(7), "from": "0xd3CdA913deB6f67967B99D67aCDFa1712C293601", "to": "0x95222290DD7278Aa3Ddd389Cc1E1d165CC4BAfe5",
+    "value": 1_250_000_000_000_000_000, "gas": 21000, "gasPrice": 3_500_000_000, "nonce": 42, "blockHash": _h(1),
+    "blockNumber": 19_000_000, "transactionIndex": 17, "input": HexBytes(b""), "v": 1, "r": _h(8), "s": _h(9), "chainId": 1,
+}
+VET_TX = {
+    "id": "0x" + "ab" * 32, "chainTag": 74, "blockRef": "0x0112a2b9f0c8b7a1", "expiration": 720, "gasPriceCoef": 0,
+    "gas": 36000, "nonce": "0x1234", "origin": "0x" + "11" * 20, "delegator": None, "dependsOn": None, "size": 190,
+    "clauses": [{"to": "0x" + "22" * 20, "value": hex(10**19), "data": "0x"}],
+    "meta": {"blockID": "0x" + "cd" * 32, "blockNumber": 18_000_000, "blockTimestamp": 1_705_000_000},
+}
+VET_BALANCE = {"balance": hex(123 * 10**18), "energy": hex(45 * 10**18), "hasCode": False}
+SOL_TX = {"result": {
+    "slot": 250_000_000, "blockTime": 1_705_000_000,
+    "meta": {"err": None, "fee": 5000, "preBalances": [10**9, 0, 1], "postBalances": [10**9 - 5000, 0, 1],
+             "logMessages": ["Program 11111111111111111111111111111111 invoke [1]", "Program 11111111111111111111111111111111 success"]},
+    "transaction": {"signatures": ["5" * 88], "message": {
+        "accountKeys": ["3wf3Ttu4UhGC6ff1N7NVruXjdhsiP2CgPDMo4qhBApK9", "11111111111111111111111111111111", "Vote111111111111111111111111111111111111111"],
+        "instructions": [{"programIdIndex": 1, "accounts": [0, 2], "data": "3Bxs4h24hBtQy9rw"}],
+        "recentBlockhash": "EkSnNWid2cvwEVnVx9aBqawnmiCNiDgp3gUdkDPTKN1N"}},
+}}
+
+
+# 旧版 f-string 格式化（保持与重构前输出一致，作为对照）
+def legacy_eth_block(block_info: dict) -> str:
+    data = f"""
+            baseFeePerGas: {block_info["baseFeePerGas"]},
+            excessBlobGas: {block_info["excessBlobGas"]},
+            gasLimit: {block_info["gasLimit"]},
+            gasUsed: {block_info["gasUsed"]},
+            hash: {block_info["hash"].hex()},
+            miner: {block_info["miner"]},
+            nonce: {block_info["nonce"].hex()},
+            number: {block_info["number"]},
+            mixHash: {block_info["mixHash"].hex()},
+            size: {block_info["size"]},
+            timestamp: {block_info["timestamp"]},
+            parentBeaconBlockRoot:{block_info["parentBeaconBlockRoot"].hex()},
+            parentHash:{block_info["parentHash"].hex()},
+            stateRoot:{block_info["stateRoot"].hex()},
+            receiptsRoot:{block_info["receiptsRoot"].hex()}"""
+    data += f""",
+            transactions:{[tx_hash.hex() for tx_hash in block_info["transactions"]]}"""
+    return data + "\n        "
+
+
+def legacy_eth_tx(tx_info: dict) -> str:
+    return f"""
+            from: {tx_info["from"]},
+            to: {tx_info["to"]},
+            value: {tx_info["value"]},
+            gas: {tx_info["gas"]},
+            gasPrice: {tx_info["gasPrice"]},
+            nonce: {tx_info["nonce"]},
+            blockHash: {tx_info["blockHash"].hex()},
+            blockNumber: {tx_info["blockNumber"]},
+            transactionIndex: {tx_info["transactionIndex"]},
+            input: {tx_info["input"]},
+            v: {tx_info["v"]},
+            r: {tx_info["r"].hex()},
+            s: {tx_info["s"].hex()},
+            chainId: {tx_info["chainId"]}
+            """
+
+
+def legacy_vet_tx(transaction_info: dict) -> str:
+    return f"""
+            id: {transaction_info["id"]},
+            chainTag: {transaction_info["chainTag"]},
+            blockRef: {transaction_info["blockRef"]},
+            expiration: {transaction_info["expiration"]},
+            gasPriceCoef: {transaction_info["gasPriceCoef"]},
+            gas: {transaction_info["gas"]},
+            nonce: {transaction_info["nonce"]},
+            origin: {transaction_info["origin"]},
+            delegator: {transaction_info["delegator"]},
+            dependsOn: {transaction_info["dependsOn"]},
+            size: {transaction_info["size"]},
+            clauses: {transaction_info["clauses"]},
+            meta: {transaction_info["meta"]}
+        """
+
+
+def legacy_vet_balance(balance_info: dict) -> str:
+    return f"""
+            Balance:{Vechain.hex_to_decimal(balance_info['balance'])} VET
+            Energe:{Vechain.hex_to_decimal(balance_info['energy'])} VTHO
+            HasCode:{balance_info['hasCode']}
+        """
+
+
+def legacy_sol_tx(data: dict) -> str:
+    return f"""
+                    Transaction: {data["result"]}
+                """
+
+
+def legacy_price(price: float) -> str:
+    return f"""
+                    当前ethereum价格：{price} USD
+                    """
+
+
+def legacy_serialize(text: str) -> str:
+    """旧版工具返回 BlockchainResponse，由 FastMCP 转为 JSON 文本"""
+    return json.dumps(pydantic_core.to_jsonable_python(BlockchainResponse(success=True, data=text, error=None)))
+
+
+def measure(fn, iterations: int) -> tuple:
+    output = fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return len(output.encode()), (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000, help="每种方式的重复次数")
+    args = parser.parse_args()
+
+    eth, vet, sol = Ethereum("http://127.0.0.1:8545"), Vechain("http://127.0.0.1:8669"), SolanaBlockchain("http://127.0.0.1:8899")
+    address = ETH_TX["from"]
+    cases = {
+        "ethereum_block_full": (lambda: legacy_eth_block(ETH_BLOCK), lambda: eth._format_block(ETH_BLOCK, "full")),
+        "ethereum_transaction": (lambda: legacy_eth_tx(ETH_TX), lambda: eth._format_transaction(ETH_TX)),
+        "vechain_transaction": (lambda: legacy_vet_tx(VET_TX), lambda: vet._format_transaction(VET_TX)),
+        "vechain_balance": (lambda: legacy_vet_balance(VET_BALANCE), lambda: vet._format_balance(VET_BALANCE, address)),
+        "solana_transaction": (lambda: legacy_sol_tx(SOL_TX), lambda: sol._format_transaction(SOL_TX)),
+        "price": (lambda: legacy_price(2345.67), lambda: eth._price_response(2345.67).data),
+    }
+
+    results = {}
+    for name, (legacy, structured) in cases.items():
+        legacy_bytes, legacy_us = measure(lambda: legacy_serialize(legacy()), args.iterations)
+        json_bytes, json_us = measure(
+            lambda: serialize(BlockchainResponse(success=True, data=structured(), error=None), "json"), args.iterations
+        )
+        text_bytes, text_us = measure(
+            lambda: serialize(BlockchainResponse(success=True, data=structured(), error=None), "text"), args.iterations
+        )
+        results[name] = {
+            "legacy": {"bytes": legacy_bytes, "us": round(legacy_us, 2)},
+            "json": {"bytes": json_bytes, "us": round(json_us, 2)},
+            "text": {"bytes": text_bytes, "us": round(text_us, 2)},
+            "json_size_ratio": round(json_bytes / legacy_bytes, 2),
+        }
+    print(json.dumps({"iterations": args.iterations, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
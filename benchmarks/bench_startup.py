@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+服务启动时间
+
+对每组启用的链（BLOCKCHAIN_MCP_CHAINS）在全新子进程中测量：
+
+- 导入时间：``import blockchain_mcp.server`` 的耗时，以及导入后是否已加载 web3 等重依赖；
+- 首个工具响应时间：以 stdio 方式启动 MCP 服务进程，从启动到完成 initialize、
+  再到第一个 ``get_blockchain_info`` 调用返回的时间（节点为 mock_nodes.py 的模拟节点）。
+
+每项重复 --runs 次，报告中位数与最小值，结果为JSON，可用 --output 保存用于跨版本对比。
+
+用法:
+    python benchmarks/bench_startup.py --chains all,vechain,ethereum --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from mock_nodes import MockConfig, start_mock_nodes
+
+HEAVY_MODULES = ("web3", "eth_account", "blockchain_mcp.ethereum", "blockchain_mcp.solana", "blockchain_mcp.bitcoin")
+HEAD_TAGS = {"ethereum": "latest", "vechain": "best", "solana": "latest", "bitcoin": "latest"}
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import blockchain_mcp.server
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def measure_import(env: Dict[str, str]) -> dict:
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_PROBE % (HEAVY_MODULES,)], env=env, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+async def measure_first_response(env: Dict[str, str], chain: str) -> dict:
+    params = StdioServerParameters(
+        command=sys.executable, args=["-c", "from blockchain_mcp import main; main()"], env=env
+    )
+    start = time.perf_counter()
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            initialized = time.perf_counter() - start
+            result = await session.call_tool(
+                "get_blockchain_info", {"blockchain_name": chain, "block_number": HEAD_TAGS.get(chain, "latest")}
+            )
+            first_response = time.perf_counter() - start
+    text = result.content[0].text if result.content else ""
+    return {"initialize": initialized, "first_response": first_response, "ok": not text.startswith(("Error", "ValueError"))}
+
+
+def summarize(values: List[float]) -> dict:
+    return {"median_ms": round(statistics.median(values) * 1000, 1), "min_ms": round(min(values) * 1000, 1)}
+
+
+async def run_scenario(chains: str, base_env: Dict[str, str], runs: int) -> dict:
+    env = dict(base_env)
+    if chains != "all":
+        env["BLOCKCHAIN_MCP_CHAINS"] = chains
+    first_chain = chains.split(",")[0] if chains != "all" else "vechain"
+    imports, initializes, responses, loaded, failures = [], [], [], set(), 0
+    for _ in range(runs):
+        probe = measure_import(env)
+        imports.append(probe["seconds"])
+        loaded.update(probe["loaded"])
+        timing = await measure_first_response(env, first_chain)
+        initializes.append(timing["initialize"])
+        responses.append(timing["first_response"])
+        failures += not timing["ok"]
+    return {
+        "chains": chains,
+        "tool_chain": first_chain,
+        "import": summarize(imports),
+        "initialize": summarize(initializes),
+        "first_response": summarize(responses),
+        "loaded_on_import": sorted(loaded),
+        "failed_calls": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chains", default="all,vechain,ethereum", help="逗号分隔的场景，每个场景为 all 或以+连接的链名")
+    parser.add_argument("--runs", type=int, default=5, help="每个场景的重复次数")
+    parser.add_argument("--output", help="结果JSON保存路径")
+    args = parser.parse_args()
+
+    urls, process = start_mock_nodes(MockConfig())
+    source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    base_env = dict(os.environ, **urls, BLOCKCHAIN_MCP_LOG_LEVEL="WARNING", BLOCKCHAIN_MCP_WARM_CACHE="")
+    base_env["PYTHONPATH"] = os.pathsep.join(filter(None, [source, os.environ.get("PYTHONPATH")]))
+    base_env.pop("BLOCKCHAIN_MCP_CHAINS", None)
+    try:
+        results = []
+        for scenario in args.chains.split(","):
+            result = asyncio.run(run_scenario(scenario.replace("+", ","), base_env, args.runs))
+            results.append(result)
+            print(
+                f"{scenario:<20} import={result['import']['median_ms']}ms "
+                f"initialize={result['initialize']['median_ms']}ms first_response={result['first_response']['median_ms']}ms "
+                f"loaded={','.join(result['loaded_on_import']) or '-'}",
+                file=sys.stderr
+            )
+    finally:
+        process.terminate()
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "runs": args.runs},
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+比特币本地UTXO索引：摄入速率、余额查询延迟与重组回滚
+
+在本地启动模拟比特币节点（支持批量请求的 getblockcount/getblockhash/getblock 2），
+提供随机生成的合成链；索引从空库同步到链头，再把最后若干区块替换为分叉链并重新同步，
+最后与生成器独立计算的余额逐地址核对。
+
+用法:
+    python benchmarks/bench_utxo_index.py --blocks 2000 --txs 50 --reorg-depth 6
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from aiohttp import web
+
+from blockchain_mcp.http_pool import get_session
+from blockchain_mcp.utxo_index import UtxoIndex
+
+
+class SyntheticChain:
+    """随机合成链：每笔交易花费1~2个现有UTXO，产生2个输出"""
+
+    def __init__(self, addresses: int, txs_per_block: int, seed: int = 1):
+        self.random = random.Random(seed)
+        self.addresses = [f"bc1q{index:038d}" for index in range(addresses)]
+        self.txs_per_block = txs_per_block
+        self.blocks = []
+        self.utxos = {}  # (txid, vout) -> (address, satoshi)
+        self._undo = []
+
+    def extend(self, count: int, salt: int = 0):
+        for _ in range(count):
+            self._append_block(salt)
+
+    def fork(self, depth: int, salt: int):
+        """撤销最后 depth 个区块，并生成 depth+1 个新区块使分叉链成为最长链"""
+        for _ in range(depth):
+            self.blocks.pop()
+            spent, created = self._undo.pop()
+            for outpoint in created:
+                self.utxos.pop(outpoint, None)
+            # 同一区块内创建又花费的输出无需恢复
+            created = set(created)
+            self.utxos.update((outpoint, utxo) for outpoint, utxo in spent.items() if outpoint not in created)
+        self.extend(depth + 1, salt)
+
+    def balances(self) -> dict:
+        totals = {}
+        for address, value in self.utxos.values():
+            totals[address] = totals.get(address, 0) + value
+        return totals
+
+    def _append_block(self, salt: int):
+        height = len(self.blocks)
+        block_hash = f"{salt:08x}{height:056x}"
+        txs, spent, created = [], {}, []
+        coinbase_txid = f"{salt:08x}{height:048x}{0:08x}"
+        txs.append(self._tx(coinbase_txid, [{"coinbase": "00"}], [(self.random.choice(self.addresses), 50 * 10**8)], created))
+        for index in range(1, self.txs_per_block):
+            if len(self.utxos) < 2:
+                break
+            inputs, total = [], 0
+            for outpoint in self.random.sample(list(self.utxos), self.random.randint(1, 2)):
+                spent[outpoint] = self.utxos.pop(outpoint)
+                total += spent[outpoint][1]
+                inputs.append({"txid": outpoint[0], "vout": outpoint[1]})
+            change = total // 2
+            outputs = [(self.random.choice(self.addresses), change), (self.random.choice(self.addresses), total - change)]
+            txs.append(self._tx(f"{salt:08x}{height:048x}{index:08x}", inputs, outputs, created))
+        self.blocks.append({
+            "hash": block_hash,
+            "height": height,
+            "previousblockhash": self.blocks[-1]["hash"] if self.blocks else None,
+            "tx": txs,
+        })
+        self._undo.append((spent, created))
+
+    def _tx(self, txid: str, inputs: list, outputs: list, created: list) -> dict:
+        vout = []
+        for n, (address, value) in enumerate(outputs):
+            self.utxos[(txid, n)] = (address, value)
+            created.append((txid, n))
+            vout.append({"n": n, "value": value / 1e8, "scriptPubKey": {"address": address}})
+        return {"txid": txid, "vin": inputs, "vout": vout}
+
+
+def start_mock_bitcoind(chain: SyntheticChain) -> str:
+    """在后台线程启动模拟节点，返回RPC URL"""
+
+    def _handle(call: dict) -> dict:
+        method, params = call["method"], call.get("params", [])
+        if method == "getblockcount":
+            result = len(chain.blocks) - 1
+        elif method == "getblockhash":
+            if not 0 <= params[0] < len(chain.blocks):
+                return {"id": call["id"], "result": None, "error": {"code": -8, "message": "Block height out of range"}}
+            result = chain.blocks[params[0]]["hash"]
+        elif method == "getblock":
+            height = int(params[0][8:], 16)
+            block = chain.blocks[height] if height < len(chain.blocks) else None
+            if block is None or block["hash"] != params[0]:
+                return {"id": call["id"], "result": None, "error": {"code": -5, "message": "Block not found"}}
+            result = block
+        else:
+            return {"id": call["id"], "result": None, "error": {"code": -32601, "message": "Method not found"}}
+        return {"id": call["id"], "result": result, "error": None}
+
+    async def rpc(request):
+        body = await request.json()
+        if isinstance(body, list):
+            return web.json_response([_handle(call) for call in body])
+        return web.json_response(_handle(body))
+
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder = {}
+
+    async def _start():
+        app = web.Application(client_max_size=0)
+        app.router.add_post("/", rpc)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        holder["port"] = site._server.sockets[0].getsockname()[1]
+        ready.set()
+
+    def _run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(_start())
+        loop.run_forever()
+
+    threading.Thread(target=_run, daemon=True).start()
+    ready.wait()
+    return f"http://127.0.0.1:{holder['port']}/"
+
+
+def verify(index: UtxoIndex, chain: SyntheticChain) -> int:
+    """返回余额与生成器不一致的地址数"""
+    expected = chain.balances()
+    return sum(1 for address in chain.addresses if index.balance(address)[0] != expected.get(address, 0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=2000, help="合成链区块数")
+    parser.add_argument("--txs", type=int, default=50, help="每个区块交易数（含coinbase）")
+    parser.add_argument("--addresses", type=int, default=5000, help="地址数量")
+    parser.add_argument("--reorg-depth", type=int, default=6, help="重组深度")
+    parser.add_argument("--lookups", type=int, default=100000, help="余额查询次数")
+    args = parser.parse_args()
+
+    chain = SyntheticChain(args.addresses, args.txs)
+    chain.extend(args.blocks)
+    url = start_mock_bitcoind(chain)
+    session = get_session("bitcoin")
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = UtxoIndex(os.path.join(directory, "utxo.sqlite"))
+
+        start = time.perf_counter()
+        ingested = index.sync(session, url)
+        ingest_seconds = time.perf_counter() - start
+        transactions = index.stats()["transactions"]
+
+        latencies = []
+        for address in random.Random(2).choices(chain.addresses, k=args.lookups):
+            started = time.perf_counter()
+            index.balance(address)
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+
+        chain.fork(args.reorg_depth, salt=1)
+        start = time.perf_counter()
+        reingested = index.sync(session, url)
+        reorg_seconds = time.perf_counter() - start
+
+        result = {
+            "blocks": ingested,
+            "transactions": transactions,
+            "ingest_seconds": round(ingest_seconds, 3),
+            "blocks_per_sec": round(ingested / ingest_seconds, 1),
+            "tx_per_sec": round(transactions / ingest_seconds, 1),
+            "lookup_us": {
+                "mean": round(statistics.fmean(latencies) * 1e6, 2),
+                "p50": round(latencies[len(latencies) // 2] * 1e6, 2),
+                "p99": round(latencies[int(len(latencies) * 0.99)] * 1e6, 2),
+            },
+            "reorg": {
+                "depth": args.reorg_depth,
+                "rolled_back": index.stats()["rollbacks"],
+                "reingested": reingested,
+                "seconds": round(reorg_seconds, 3),
+            },
+            "mismatched_balances": verify(index, chain),
+            "db_bytes": os.path.getsize(index.path),
+        }
+        index.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
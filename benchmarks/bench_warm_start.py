@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+磁盘预热缓存：冷启动与热启动的首个响应时间
+
+以 stdio 方式反复启动 MCP 服务进程（节点为 mock_nodes.py 的模拟节点，--latency-ms 模拟远程节点的往返延迟），
+依次调用一组查询历史（已最终确定）数据的工具，测量：
+
+- first_response：从启动进程到第一个工具调用返回的时间；
+- all_requests：从启动到整组调用全部返回的时间；
+- upstream：模拟节点收到的上游请求数。
+
+冷启动每次使用全新的空日志文件（BLOCKCHAIN_MCP_WARM_CACHE）；热启动使用一次冷启动运行后留下的日志，
+历史区块与交易应直接从磁盘返回，上游请求只剩链头相关的调用。结果为JSON，可用 --output 保存。
+
+用法:
+    python benchmarks/bench_warm_start.py --runs 5 --latency-ms 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, List, Tuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from mock_nodes import BITCOIN_HEAD, ETHEREUM_HEAD, SOLANA_HEAD_SLOT, VECHAIN_HEAD, MockConfig, start_mock_nodes
+
+# 依次调用的工具与参数
+CALLS: List[Tuple[str, dict]] = [
+    ("get_blockchain_info", {"blockchain_name": "vechain", "block_number": VECHAIN_HEAD - 1000, "detail": "full"}),
+    ("get_block_transactions", {"blockchain_name": "vechain", "block_number": VECHAIN_HEAD - 1000, "limit": 20}),
+    ("get_blockchain_info", {"blockchain_name": "bitcoin", "block_number": BITCOIN_HEAD - 100}),
+    ("get_blockchain_info", {"blockchain_name": "solana", "block_number": SOLANA_HEAD_SLOT - 1000}),
+    ("get_blockchain_info", {"blockchain_name": "ethereum", "block_number": "finalized"}),
+    ("get_blockchain_info", {"blockchain_name": "ethereum", "block_number": ETHEREUM_HEAD - 1000, "detail": "full"}),
+    ("get_block_fees", {"blockchain_name": "ethereum", "block_number": ETHEREUM_HEAD - 1000}),
+]
+
+
+def upstream_requests(urls: Dict[str, str]) -> int:
+    base = urls["COINGECKO_API_URL"].rsplit("/", 1)[0]
+    with urllib.request.urlopen(base + "/stats") as response:
+        return sum(json.load(response)["requests"].values())
+
+
+async def measure(env: Dict[str, str], urls: Dict[str, str]) -> dict:
+    params = StdioServerParameters(command=sys.executable, args=["-c", "from blockchain_mcp import main; main()"], env=env)
+    before = upstream_requests(urls)
+    failures = 0
+    start = time.perf_counter()
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            first_response = None
+            for name, arguments in CALLS:
+                result = await session.call_tool(name, arguments)
+                text = result.content[0].text if result.content else ""
+                failures += text.startswith(("Error", "ValueError")) or '"success":false' in text
+                if first_response is None:
+                    first_response = time.perf_counter() - start
+            all_requests = time.perf_counter() - start
+    return {
+        "first_response": first_response,
+        "all_requests": all_requests,
+        "upstream": upstream_requests(urls) - before,
+        "failures": failures,
+    }
+
+
+def summarize(runs: List[dict]) -> dict:
+    summary = {}
+    for field in ("first_response", "all_requests"):
+        values = [run[field] for run in runs]
+        summary[field] = {"median_ms": round(statistics.median(values) * 1000, 1), "min_ms": round(min(values) * 1000, 1)}
+    summary["upstream"] = statistics.median(run["upstream"] for run in runs)
+    summary["failed_calls"] = sum(run["failures"] for run in runs)
+    return summary
+
+
+async def run(args, urls: Dict[str, str], base_env: Dict[str, str], directory: str) -> dict:
+    cold, warm = [], []
+    primed = os.path.join(directory, "primed.log")
+    for index in range(args.runs):
+        path = os.path.join(directory, f"cold-{index}.log")
+        cold.append(await measure(dict(base_env, BLOCKCHAIN_MCP_WARM_CACHE=path), urls))
+        if index == 0:
+            os.replace(path, primed)
+            if os.path.exists(path + ".idx"):
+                os.replace(path + ".idx", primed + ".idx")
+    for _ in range(args.runs):
+        warm.append(await measure(dict(base_env, BLOCKCHAIN_MCP_WARM_CACHE=primed), urls))
+    return {"cold": summarize(cold), "warm": summarize(warm), "log_bytes": os.path.getsize(primed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="冷启动与热启动各自的重复次数")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="模拟节点每个请求的延迟")
+    parser.add_argument("--txs-per-block", type=int, default=150, help="每个区块的交易数")
+    parser.add_argument("--output", help="结果JSON保存路径")
+    args = parser.parse_args()
+
+    urls, process = start_mock_nodes(MockConfig(latency_ms=args.latency_ms, txs_per_block=args.txs_per_block))
+    source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    base_env = dict(os.environ, **urls, BLOCKCHAIN_MCP_LOG_LEVEL="WARNING")
+    base_env["PYTHONPATH"] = os.pathsep.join(filter(None, [source, os.environ.get("PYTHONPATH")]))
+    base_env.pop("BLOCKCHAIN_MCP_CHAINS", None)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            result = asyncio.run(run(args, urls, base_env, directory))
+    finally:
+        process.terminate()
+    for mode in ("cold", "warm"):
+        print(
+            f"{mode:<5} first_response={result[mode]['first_response']['median_ms']}ms "
+            f"all_requests={result[mode]['all_requests']['median_ms']}ms upstream={result[mode]['upstream']}",
+            file=sys.stderr
+        )
+
+    report = {
+        "meta": {
+            "python": platform.python_version(), "platform": platform.platform(), "runs": args.runs,
+            "latency_ms": args.latency_ms, "txs_per_block": args.txs_per_block, "calls": len(CALLS),
+        },
+        "results": result,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
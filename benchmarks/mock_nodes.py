@@ -0,0 +1,730 @@
+# -*- coding: utf-8 -*-
+"""
+本地模拟链节点
+
+在一个 aiohttp 服务中按路径前缀提供各上游接口，数据由区块高度确定性生成：
+
+- ``/ethereum``：Ethereum JSON-RPC（eth_blockNumber/eth_getBlockByNumber/eth_getBlockByHash/
+  eth_getBalance/eth_getTransactionByHash/eth_getBlockReceipts/eth_getTransactionReceipt/eth_chainId/
+  eth_call（ERC-20 balanceOf/decimals/symbol），支持批量请求）
+- ``/vechain``：Vechain Thor REST（/blocks（支持 expanded）、/transactions、/accounts、POST /accounts/* 多 clause 调用）
+  与 ``/subscriptions/block`` websocket（逐个推送链头前的最近区块，可按间隔推送 obsolete 消息模拟分叉）
+- ``/solana``：Solana JSON-RPC（getSlot/getBlock（transactionDetails 支持 full/signatures/none）/getBalance/getMultipleAccounts/
+  getSignatureStatuses/getTransaction）
+- ``/bitcoin``：Bitcoin Core RPC（getblockcount/getblockhash/getblockheader/getblock/
+  getrawtransaction/listunspent）
+- ``/coingecko``：CoinGecko ``/simple/price``
+
+响应延迟、慢请求（长尾）比例、区块交易数、交易数据大小和错误注入比例均可配置；注入的错误为 HTTP 503。
+``/stats`` 返回每条链收到的请求数，用于统计被测服务实际发出的上游请求。
+设置配额（每条链每秒请求数）时，超出配额的请求返回 HTTP 429 和 ``Retry-After``，模拟提供方限流。
+默认在独立子进程中运行，避免模拟节点占用被测进程的CPU和内存。
+
+用法（前台运行，供各链模块的 ``__main__`` 示例使用）:
+    python benchmarks/mock_nodes.py --port 8545 --latency-ms 20
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import random
+import time
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+ETHEREUM_HEAD = 19_000_000
+SOLANA_HEAD_SLOT = 250_000_000
+VECHAIN_HEAD = 18_000_000
+BITCOIN_HEAD = 850_000
+VECHAIN_PARAMS = "0x0000000000000000000000000000506172616d73"
+VECHAIN_BASE_GAS_PRICE = 10**13
+# Params.get(bytes32) 的完整调用数据，键为左侧补零的 "base-gas-price"（与 thor 的 BytesToBytes32 一致）
+VECHAIN_BASE_GAS_PRICE_CALL = "0x8eaa6ac0" + b"base-gas-price".hex().rjust(64, "0")
+PRICES = {"ethereum": 2345.67, "bitcoin": 64321.0, "vechain": 0.0312, "solana": 145.2}
+
+
+class MockConfig:
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        txs_per_block: int = 150,
+        tx_input_bytes: int = 68,
+        error_rate: float = 0.0,
+        addresses: int = 1000,
+        seed: int = 1,
+        slow_rate: float = 0.0,
+        slow_ms: float = 0.0,
+        quota: float = 0.0,
+        block_receipts: bool = True,
+        head_blocks: int = 30,
+        head_interval_ms: float = 50.0,
+        reorg_every: int = 0
+    ):
+        """
+        :param latency_ms: 每个请求的固定延迟
+        :param jitter_ms: 在固定延迟上叠加的 [0, jitter_ms] 均匀随机延迟
+        :param txs_per_block: 每个区块的交易数（决定区块响应大小）
+        :param tx_input_bytes: 每笔交易的调用数据字节数（决定交易响应大小）
+        :param error_rate: 返回 HTTP 503 的请求比例
+        :param addresses: 交易参与方地址池大小
+        :param slow_rate: 额外延迟 slow_ms 的请求比例（模拟长尾延迟的节点）
+        :param quota: 每条链每秒处理的请求数上限，超出返回 429（0 为不限）
+        :param block_receipts: 是否支持 eth_getBlockReceipts（模拟不支持该方法的节点）
+        :param head_blocks: Vechain 区块订阅推送的区块数（推送到链头为止，之后保持连接）
+        :param head_interval_ms: 区块订阅的推送间隔
+        :param reorg_every: 每推送该数量的区块，废弃刚推送的区块并重新推送该高度（0 为不模拟分叉）
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.txs_per_block = txs_per_block
+        self.tx_input_bytes = tx_input_bytes
+        self.error_rate = error_rate
+        self.addresses = addresses
+        self.seed = seed
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.quota = quota
+        self.block_receipts = block_receipts
+        self.head_blocks = head_blocks
+        self.head_interval_ms = head_interval_ms
+        self.reorg_every = reorg_every
+
+    def as_dict(self) -> Dict:
+        return dict(vars(self))
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256(":".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _number_hash(number: int, *parts) -> str:
+    """前16位十六进制编码高度，便于按哈希反查"""
+    return f"0x{number:016x}" + _digest(number, *parts)[:48]
+
+
+def _height_of(hash_value: str) -> int:
+    return int(hash_value.removeprefix("0x")[:16], 16)
+
+
+def eth_address(index: int) -> str:
+    return "0x" + _digest("address", index)[:40]
+
+
+def btc_address(index: int) -> str:
+    return "bc1q" + _digest("btc", index)[:38]
+
+
+def solana_address(index: int) -> str:
+    return "Sol" + _digest("sol", index)[:41]
+
+
+class RpcError(Exception):
+    """JSON-RPC 处理函数抛出时作为该请求的 error 对象返回"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class MockChains:
+    """按高度确定性生成各链区块、交易与余额"""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+
+    # ---------- 合约调用（ERC-20 / VIP-180、Vechain Params） ----------
+    @staticmethod
+    def contract_call(to: str, data: str) -> str:
+        """
+        任意 0x00000000 开头以外的地址都视为代币合约：decimals 为 6 或 18，symbol 为 ABI 编码的字符串；
+        0x00000000 开头的地址视为普通账户，调用返回空数据；Vechain Params 合约的 get(bytes32) 只对 base-gas-price 键
+        返回 baseGasPrice，其他键与真实节点一样视为未设置的参数返回 0
+        """
+        token = to.lower()
+        if token == VECHAIN_PARAMS:
+            value = VECHAIN_BASE_GAS_PRICE if data.lower() == VECHAIN_BASE_GAS_PRICE_CALL else 0
+            return "0x" + format(value, "064x")
+        if token.startswith("0x00000000"):
+            return "0x"
+        selector = data[:10]
+        if selector == "0x313ce567":
+            return "0x" + format(6 if _digest(token)[0] < "8" else 18, "064x")
+        if selector == "0x95d89b41":
+            symbol = ("T" + _digest(token)[:3].upper()).encode()
+            return "0x" + format(32, "064x") + format(len(symbol), "064x") + symbol.hex().ljust(64, "0")
+        if selector == "0x70a08231":
+            return "0x" + format(int(_digest(token, data[-40:])[:12], 16) * 10**6, "064x")
+        raise ValueError(f"unknown selector {selector}")
+
+    # ---------- Ethereum ----------
+    def eth_tx_hash(self, number: int, index: int) -> str:
+        return f"0x{number:016x}{index:08x}" + _digest("ethtx", number, index)[:40]
+
+    def eth_tx(self, number: int, index: int) -> dict:
+        pool = self.config.addresses
+        return {
+            "blockHash": _number_hash(number, "eth"),
+            "blockNumber": hex(number),
+            "from": eth_address((number * 31 + index) % pool),
+            "to": eth_address((number * 17 + index * 7 + 1) % pool),
+            "gas": hex(21000 + index),
+            "gasPrice": hex(3_000_000_000 + index),
+            "hash": self.eth_tx_hash(number, index),
+            "input": "0x" + "ab" * self.config.tx_input_bytes,
+            "nonce": hex(index),
+            "transactionIndex": hex(index),
+            "value": hex((number % 1000 + index) * 10**15),
+            "type": "0x0",
+            "v": "0x25",
+            "r": "0x" + _digest("r", number, index),
+            "s": "0x" + _digest("s", number, index),
+            "chainId": "0x1",
+        }
+
+    def eth_receipt(self, number: int, index: int) -> dict:
+        """gasUsed 21000+index，单位优先费 0.1-2 gwei，每50笔中有1笔失败"""
+        base_fee = 1_000_000_000 + number % 1000
+        return {
+            "transactionHash": self.eth_tx_hash(number, index),
+            "transactionIndex": hex(index),
+            "blockHash": _number_hash(number, "eth"),
+            "blockNumber": hex(number),
+            "from": eth_address((number * 31 + index) % self.config.addresses),
+            "to": eth_address((number * 17 + index * 7 + 1) % self.config.addresses),
+            "cumulativeGasUsed": hex(21000 * (index + 1) + index * (index + 1) // 2),
+            "gasUsed": hex(21000 + index),
+            "effectiveGasPrice": hex(base_fee + (index % 20 + 1) * 10**8),
+            "contractAddress": None,
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "status": "0x0" if index % 50 == 49 else "0x1",
+            "type": "0x2",
+        }
+
+    def eth_block(self, tag, full: bool) -> Optional[dict]:
+        number = {"latest": ETHEREUM_HEAD, "safe": ETHEREUM_HEAD - 32, "finalized": ETHEREUM_HEAD - 64}.get(tag)
+        if number is None:
+            number = int(tag, 16)
+        if number > ETHEREUM_HEAD:
+            return None
+        count = self.config.txs_per_block
+        transactions = [self.eth_tx(number, i) if full else self.eth_tx_hash(number, i) for i in range(count)]
+        gas_used = 21000 * count + number % 1_000_000
+        return {
+            "number": hex(number),
+            "hash": _number_hash(number, "eth"),
+            "parentHash": _number_hash(number - 1, "eth"),
+            "nonce": "0x0000000000000000",
+            "sha3Uncles": "0x" + _digest("uncles"),
+            "logsBloom": "0x" + "00" * 256,
+            "transactionsRoot": "0x" + _digest("txroot", number),
+            "stateRoot": "0x" + _digest("state", number),
+            "receiptsRoot": "0x" + _digest("receipts", number),
+            "miner": eth_address(number % 16),
+            "difficulty": "0x0",
+            "totalDifficulty": "0xc70d815d562d3cfa955",
+            "extraData": "0x",
+            "size": hex(1000 + count * 200),
+            "gasLimit": hex(30_000_000),
+            "gasUsed": hex(min(gas_used, 30_000_000)),
+            "timestamp": hex(1_700_000_000 + number * 12),
+            "transactions": transactions,
+            "uncles": [],
+            "baseFeePerGas": hex(1_000_000_000 + number % 1000),
+            "mixHash": "0x" + _digest("mix", number),
+            "withdrawals": [],
+            "withdrawalsRoot": "0x" + _digest("withdrawals", number),
+            "blobGasUsed": "0x0",
+            "excessBlobGas": "0x0",
+            "parentBeaconBlockRoot": "0x" + _digest("beacon", number),
+        }
+
+    def eth_fee_history(self, count: int, newest, percentiles: list) -> dict:
+        """与 eth_block/eth_receipt 一致：基础费用随高度变化，区块内优先费为 (i % 20 + 1) * 0.1 gwei"""
+        newest = ETHEREUM_HEAD if newest in ("latest", "pending") else min(int(newest, 16), ETHEREUM_HEAD)
+        oldest = max(0, newest - min(count, 1024) + 1)
+        heights = range(oldest, newest + 1)
+        gas_used = 21000 * self.config.txs_per_block
+        history = {
+            "oldestBlock": hex(oldest),
+            "baseFeePerGas": [hex(1_000_000_000 + number % 1000) for number in range(oldest, newest + 2)],
+            "gasUsedRatio": [min(gas_used + number % 1_000_000, 30_000_000) / 30_000_000 for number in heights],
+        }
+        if percentiles:
+            history["reward"] = [[hex((min(int(q / 5), 19) + 1) * 10**8) for q in percentiles] for _ in heights]
+        return history
+
+    def ethereum(self, method: str, params: list):
+        if method == "eth_blockNumber":
+            return hex(ETHEREUM_HEAD)
+        if method == "eth_chainId":
+            return "0x1"
+        if method == "eth_getBlockByNumber":
+            return self.eth_block(params[0], params[1])
+        if method == "eth_getBlockByHash":
+            return self.eth_block(hex(_height_of(params[0])), params[1])
+        if method == "eth_getBalance":
+            return hex(int(_digest(params[0])[:12], 16) * 10**6)
+        if method == "eth_getBlockReceipts" and self.config.block_receipts:
+            tag = params[0]
+            number = _height_of(tag) if isinstance(tag, str) and len(tag) == 66 else int(tag, 16)
+            if number > ETHEREUM_HEAD:
+                return None
+            return [self.eth_receipt(number, i) for i in range(self.config.txs_per_block)]
+        if method == "eth_getTransactionReceipt":
+            raw = params[0].removeprefix("0x")
+            number, index = int(raw[:16], 16), int(raw[16:24], 16)
+            if number > ETHEREUM_HEAD or index >= self.config.txs_per_block:
+                return None
+            return self.eth_receipt(number, index)
+        if method == "eth_feeHistory":
+            return self.eth_fee_history(int(params[0], 16), params[1], params[2] if len(params) > 2 else [])
+        if method == "eth_call":
+            return self.contract_call(params[0]["to"], params[0]["data"])
+        if method == "eth_getTransactionByHash":
+            raw = params[0].removeprefix("0x")
+            number, index = int(raw[:16], 16), int(raw[16:24], 16)
+            if number > ETHEREUM_HEAD or index >= self.config.txs_per_block:
+                return None
+            return self.eth_tx(number, index)
+        raise KeyError(method)
+
+    # ---------- Vechain ----------
+    def vet_tx_id(self, number: int, index: int) -> str:
+        return f"0x{number:016x}{index:08x}" + _digest("vettx", number, index)[:40]
+
+    def vet_tx(self, number: int, index: int) -> dict:
+        pool = self.config.addresses
+        return {
+            "id": self.vet_tx_id(number, index),
+            "chainTag": 74,
+            "blockRef": f"0x{number:08x}00000000",
+            "expiration": 720,
+            "clauses": [{
+                "to": eth_address((number * 17 + index) % pool),
+                "value": hex((index + 1) * 10**18),
+                "data": "0x" + "ab" * self.config.tx_input_bytes,
+            }],
+            "gasPriceCoef": index * 37 % 256,
+            "gas": 36_000,
+            "origin": eth_address((number * 31 + index) % pool),
+            "delegator": None,
+            "nonce": hex(index),
+            "dependsOn": None,
+            "size": 130 + self.config.tx_input_bytes,
+        }
+
+    def vechain(self, path: str, expanded: bool = False) -> Tuple[int, Optional[dict]]:
+        """Thor REST；expanded 时区块的 transactions 为带执行结果的完整交易"""
+        parts = path.strip("/").split("/")
+        if parts[0] == "blocks":
+            tag = parts[1]
+            number = {"best": VECHAIN_HEAD, "finalized": VECHAIN_HEAD - 180}.get(tag)
+            if number is None:
+                number = _height_of(tag) if tag.startswith("0x") else int(tag)
+            if number > VECHAIN_HEAD:
+                return 200, None
+            return 200, {
+                "number": number,
+                "id": _number_hash(number, "vet"),
+                "size": 400 + self.config.txs_per_block * 150,
+                "parentID": _number_hash(number - 1, "vet"),
+                "timestamp": 1_530_000_000 + number * 10,
+                "gasLimit": 40_000_000,
+                "beneficiary": eth_address(number % 101),
+                "gasUsed": 36_000 * self.config.txs_per_block,
+                "totalScore": number * 10,
+                "txsRoot": "0x" + _digest("vettxroot", number),
+                "txsFeatures": 1,
+                "stateRoot": "0x" + _digest("vetstate", number),
+                "receiptsRoot": "0x" + _digest("vetreceipts", number),
+                "com": True,
+                "signer": eth_address(number % 101 + 1),
+                "isTrunk": True,
+                "isFinalized": number <= VECHAIN_HEAD - 180,
+                "transactions": [
+                    dict(self.vet_tx(number, i), gasUsed=36_000, gasPayer=eth_address((number * 31 + i) % self.config.addresses),
+                         paid=hex(36_000 * 10**13), reward=hex(36_000 * 3 * 10**12), reverted=False, outputs=[])
+                    if expanded else self.vet_tx_id(number, i)
+                    for i in range(self.config.txs_per_block)
+                ],
+            }
+        if parts[0] == "transactions":
+            raw = parts[1].removeprefix("0x")
+            number, index = int(raw[:16], 16), int(raw[16:24], 16)
+            if number > VECHAIN_HEAD or index >= self.config.txs_per_block:
+                return 200, None
+            transaction = self.vet_tx(number, index)
+            transaction["meta"] = {
+                "blockID": _number_hash(number, "vet"),
+                "blockNumber": number,
+                "blockTimestamp": 1_530_000_000 + number * 10,
+            }
+            return 200, transaction
+        if parts[0] == "accounts":
+            seed = int(_digest(parts[1])[:12], 16)
+            return 200, {"balance": hex(seed * 10**6), "energy": hex(seed * 10**5), "hasCode": False}
+        return 404, None
+
+    def vet_block_message(self, number: int, obsolete: bool = False) -> dict:
+        """区块订阅消息：与 /blocks 相同的区块头（交易为ID），没有 isTrunk/isFinalized，附带 obsolete"""
+        _, block = self.vechain(f"blocks/{number}")
+        block.pop("isTrunk")
+        block.pop("isFinalized")
+        block["obsolete"] = obsolete
+        return block
+
+    # ---------- Solana ----------
+    def sol_signature(self, slot: int, index: int) -> str:
+        return f"{slot:016x}{index:08x}" + _digest("solsig", slot, index)[:64]
+
+    def sol_tx(self, slot: int, index: int) -> dict:
+        pool = self.config.addresses
+        return {
+            "meta": {
+                "err": None,
+                "fee": 5000,
+                "preBalances": [10**9, 0, 1],
+                "postBalances": [10**9 - 5000, 0, 1],
+                "logMessages": ["Program 11111111111111111111111111111111 invoke [1]"],
+            },
+            "transaction": {
+                "signatures": [self.sol_signature(slot, index)],
+                "message": {
+                    "accountKeys": [
+                        solana_address((slot + index) % pool),
+                        "11111111111111111111111111111111",
+                        solana_address((slot * 7 + index + 1) % pool),
+                    ],
+                    "instructions": [{"programIdIndex": 1, "accounts": [0, 2], "data": "ab" * self.config.tx_input_bytes}],
+                    "recentBlockhash": _digest("solblock", slot - 1)[:44],
+                },
+            },
+            # 每10笔中有1笔 v0 交易，请求未声明 maxSupportedTransactionVersion 时节点拒绝返回
+            "version": 0 if index % 10 == 9 else "legacy",
+        }
+
+    def sol_status(self, signature: str) -> Optional[dict]:
+        slot, index = int(signature[:16], 16), int(signature[16:24], 16)
+        if slot > SOLANA_HEAD_SLOT or index >= self.config.txs_per_block:
+            return None
+        return {"slot": slot, "confirmations": None, "err": None, "status": {"Ok": None}, "confirmationStatus": "finalized"}
+
+    def solana(self, method: str, params: list):
+        if method == "getSlot":
+            return SOLANA_HEAD_SLOT
+        if method == "getBlock":
+            slot = params[0]
+            if slot > SOLANA_HEAD_SLOT:
+                return None
+            details = (params[1] if len(params) > 1 else {}).get("transactionDetails", "full")
+            block = {
+                "blockHeight": slot - 20_000_000,
+                "blockTime": 1_600_000_000 + slot // 2,
+                "blockhash": _digest("solblock", slot)[:44],
+                "previousBlockhash": _digest("solblock", slot - 1)[:44],
+                "parentSlot": slot - 1,
+            }
+            if details == "full":
+                block["transactions"] = [self.sol_tx(slot, i) for i in range(self.config.txs_per_block)]
+            elif details != "none":
+                block["signatures"] = [self.sol_signature(slot, i) for i in range(self.config.txs_per_block)]
+            return block
+        if method == "getBalance":
+            return {"context": {"slot": SOLANA_HEAD_SLOT}, "value": int(_digest(params[0])[:10], 16)}
+        if method == "getMultipleAccounts":
+            # dataSlice 长度为0时不返回账户数据
+            size = (params[1] if len(params) > 1 else {}).get("dataSlice", {}).get("length", 64)
+            return {"context": {"slot": SOLANA_HEAD_SLOT}, "value": [
+                {"lamports": int(_digest(address)[:10], 16), "owner": "11111111111111111111111111111111",
+                 "data": ["A" * (size * 4 // 3), "base64"], "executable": False, "rentEpoch": 0}
+                for address in params[0]
+            ]}
+        if method == "getSignatureStatuses":
+            return {"context": {"slot": SOLANA_HEAD_SLOT}, "value": [self.sol_status(sig) for sig in params[0]]}
+        if method == "getTransaction":
+            slot, index = int(params[0][:16], 16), int(params[0][16:24], 16)
+            if slot > SOLANA_HEAD_SLOT or index >= self.config.txs_per_block:
+                return None
+            tx = dict(self.sol_tx(slot, index), slot=slot, blockTime=1_600_000_000 + slot // 2)
+            if tx["version"] != "legacy" and "maxSupportedTransactionVersion" not in (params[1] if len(params) > 1 else {}):
+                raise RpcError(-32015, "Transaction version (0) is not supported by the requesting client")
+            return tx
+        raise KeyError(method)
+
+    # ---------- Bitcoin ----------
+    def btc_block_hash(self, height: int) -> str:
+        return f"{height:016x}" + _digest("btcblock", height)[:48]
+
+    def btc_txid(self, height: int, index: int) -> str:
+        return f"{height:016x}{index:08x}" + _digest("btctx", height, index)[:40]
+
+    def btc_tx(self, height: int, index: int) -> dict:
+        pool = self.config.addresses
+        return {
+            "txid": self.btc_txid(height, index),
+            "hash": self.btc_txid(height, index),
+            "size": 225,
+            "vin": [{"coinbase": "00"}] if index == 0 else [{"txid": self.btc_txid(height - 1, index), "vout": 0}],
+            "vout": [
+                {"n": 0, "value": 0.5 + index / 1000, "scriptPubKey": {"address": btc_address((height + index) % pool)}},
+                {"n": 1, "value": 0.25, "scriptPubKey": {"address": btc_address((height * 3 + index) % pool)}},
+            ],
+            "blockhash": self.btc_block_hash(height),
+            "confirmations": BITCOIN_HEAD - height + 1,
+        }
+
+    def btc_block(self, block_hash: str, verbosity) -> Optional[dict]:
+        height = _height_of(block_hash)
+        if height > BITCOIN_HEAD:
+            return None
+        count = self.config.txs_per_block
+        block = {
+            "hash": block_hash,
+            "confirmations": BITCOIN_HEAD - height + 1,
+            "height": height,
+            "version": 536870912,
+            "merkleroot": _digest("merkle", height),
+            "time": 1_231_006_505 + height * 600,
+            "nonce": height,
+            "difficulty": 8.6e13,
+            "nTx": count,
+            "previousblockhash": self.btc_block_hash(height - 1),
+        }
+        if verbosity is True:
+            return block
+        if verbosity == 2:
+            block["tx"] = [self.btc_tx(height, i) for i in range(count)]
+        else:
+            block["tx"] = [self.btc_txid(height, i) for i in range(count)]
+        block["size"] = 80 + count * 225
+        return block
+
+    def bitcoin(self, method: str, params: list):
+        if method == "getblockcount":
+            return BITCOIN_HEAD
+        if method == "getblockhash":
+            return self.btc_block_hash(params[0]) if params[0] <= BITCOIN_HEAD else None
+        if method == "getblockheader":
+            return self.btc_block(params[0], True)
+        if method == "getblock":
+            return self.btc_block(params[0], params[1] if len(params) > 1 else 1)
+        if method == "getrawtransaction":
+            height, index = int(params[0][:16], 16), int(params[0][16:24], 16)
+            return self.btc_tx(height, index) if height <= BITCOIN_HEAD else None
+        if method == "listunspent":
+            address = params[2][0]
+            count = int(_digest(address)[:1], 16) % 4
+            return [
+                {"txid": self.btc_txid(BITCOIN_HEAD - i, 1), "vout": 0, "address": address, "amount": 0.125 * (i + 1)}
+                for i in range(count)
+            ]
+        raise KeyError(method)
+
+
+def make_app(config: MockConfig) -> web.Application:
+    chains = MockChains(config)
+    rng = random.Random(config.seed)
+
+    windows: Dict[str, list] = {}
+    received: Dict[str, int] = {}
+
+    def over_quota(chain: str) -> Optional[web.Response]:
+        """统计每条链收到的请求数；按链、按整秒窗口计数，超出配额时返回 429"""
+        received[chain] = received.get(chain, 0) + 1
+        if not config.quota:
+            return None
+        second = int(time.monotonic())
+        window = windows.setdefault(chain, [second, 0])
+        if window[0] != second:
+            window[0], window[1] = second, 0
+        window[1] += 1
+        if window[1] <= config.quota:
+            return None
+        return web.Response(status=429, text="rate limited", headers={"Retry-After": "1"})
+
+    async def delay() -> bool:
+        """模拟网络延迟，返回本次是否注入错误"""
+        seconds = (config.latency_ms + rng.uniform(0, config.jitter_ms)) / 1000
+        if config.slow_rate > 0 and rng.random() < config.slow_rate:
+            seconds += config.slow_ms / 1000
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+        return config.error_rate > 0 and rng.random() < config.error_rate
+
+    def jsonrpc(chain: str, handler, version: str = "2.0"):
+        def _answer(call: dict) -> dict:
+            try:
+                result = handler(call.get("method"), call.get("params", []))
+            except RpcError as e:
+                return {"jsonrpc": version, "id": call.get("id"), "error": {"code": e.code, "message": e.message}}
+            except KeyError:
+                return {"jsonrpc": version, "id": call.get("id"), "error": {"code": -32601, "message": "Method not found"}}
+            except (AttributeError, IndexError, TypeError, ValueError):
+                return {"jsonrpc": version, "id": call.get("id"), "error": {"code": -32602, "message": "Invalid params"}}
+            return {"jsonrpc": version, "id": call.get("id"), "result": result}
+
+        async def endpoint(request):
+            # 先读取请求体：被取消的对冲请求会在延迟期间断开连接
+            body = json.loads(await request.read())
+            limited = over_quota(chain)
+            if limited is not None:
+                return limited
+            if await delay():
+                return web.Response(status=503, text="injected error")
+            if isinstance(body, list):
+                return web.json_response([_answer(call) for call in body])
+            return web.json_response(_answer(body))
+
+        return endpoint
+
+    async def vechain(request):
+        limited = over_quota("vechain")
+        if limited is not None:
+            return limited
+        if await delay():
+            return web.Response(status=503, text="injected error")
+        status, body = chains.vechain(request.match_info["path"], request.query.get("expanded") == "true")
+        if status != 200:
+            return web.Response(status=status)
+        return web.json_response(body)
+
+    async def vechain_subscription(request):
+        """/subscriptions/block：推送链头前 head_blocks 个区块，按 reorg_every 插入 obsolete 消息"""
+        limited = over_quota("vechain")
+        if limited is not None:
+            return limited
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        interval = config.head_interval_ms / 1000
+        for position, number in enumerate(range(VECHAIN_HEAD - config.head_blocks + 1, VECHAIN_HEAD + 1), 1):
+            await ws.send_json(chains.vet_block_message(number))
+            if config.reorg_every and position % config.reorg_every == 0:
+                await asyncio.sleep(interval)
+                await ws.send_json(chains.vet_block_message(number, obsolete=True))
+                await ws.send_json(chains.vet_block_message(number))
+            await asyncio.sleep(interval)
+        async for _ in ws:
+            pass
+        return ws
+
+    async def vechain_post(request):
+        """POST /accounts/*：按顺序模拟执行多个 clause"""
+        body = await request.json()
+        limited = over_quota("vechain")
+        if limited is not None:
+            return limited
+        if await delay():
+            return web.Response(status=503, text="injected error")
+        if request.match_info["path"].strip("/") != "accounts/*":
+            return web.Response(status=404)
+        return web.json_response([
+            {"data": chains.contract_call(clause["to"], clause["data"]), "events": [], "transfers": [],
+             "gasUsed": 2_500, "reverted": False, "vmError": ""}
+            for clause in body["clauses"]
+        ])
+
+    async def coingecko(request):
+        limited = over_quota("coingecko")
+        if limited is not None:
+            return limited
+        if await delay():
+            return web.Response(status=503, text="injected error")
+        ids = request.query.get("ids", "").split(",")
+        return web.json_response({coin_id: {"usd": PRICES[coin_id]} for coin_id in ids if coin_id in PRICES})
+
+    async def stats(request):
+        return web.json_response({"requests": received})
+
+    app = web.Application(client_max_size=0)
+    app.router.add_post("/ethereum", jsonrpc("ethereum", chains.ethereum))
+    app.router.add_post("/solana", jsonrpc("solana", chains.solana))
+    app.router.add_post("/bitcoin", jsonrpc("bitcoin", chains.bitcoin, "1.0"))
+    app.router.add_get("/vechain/subscriptions/block", vechain_subscription)
+    app.router.add_get("/vechain/{path:.*}", vechain)
+    app.router.add_post("/vechain/{path:.*}", vechain_post)
+    app.router.add_get("/coingecko/simple/price", coingecko)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+def node_urls(base_url: str) -> Dict[str, str]:
+    """各上游的URL，对应 chains_factory/price_cache 读取的环境变量"""
+    return {
+        "ETHEREUM_NODE_URL": f"{base_url}/ethereum",
+        "VECHAIN_NODE_URL": f"{base_url}/vechain",
+        "SOLANA_NODE_URL": f"{base_url}/solana",
+        "BITCOIN_NODE_URL": f"{base_url}/bitcoin",
+        "COINGECKO_API_URL": f"{base_url}/coingecko",
+    }
+
+
+async def _serve(config: MockConfig, host: str, port: int) -> int:
+    runner = web.AppRunner(make_app(config), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return site._server.sockets[0].getsockname()[1]
+
+
+def _run_process(config: MockConfig, host: str, port: int, conn):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    conn.send(loop.run_until_complete(_serve(config, host, port)))
+    conn.close()
+    loop.run_forever()
+
+
+def start_mock_nodes(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> Tuple[Dict[str, str], multiprocessing.Process]:
+    """
+    在子进程中启动模拟节点
+    :return: (各上游URL, 子进程)；调用方结束时 terminate 子进程
+    """
+    context = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = context.Pipe()
+    process = context.Process(target=_run_process, args=(config, host, port, child_conn), daemon=True)
+    process.start()
+    bound_port = parent_conn.recv()
+    return node_urls(f"http://{host}:{bound_port}"), process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="固定响应延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="叠加的随机延迟上限（毫秒）")
+    parser.add_argument("--txs-per-block", type=int, default=150, help="每个区块的交易数")
+    parser.add_argument("--tx-input-bytes", type=int, default=68, help="每笔交易的调用数据字节数")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 HTTP 503 的请求比例")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="额外延迟 --slow-ms 的请求比例")
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="慢请求的额外延迟（毫秒）")
+    parser.add_argument("--quota", type=float, default=0.0, help="每秒请求配额，超出返回 429")
+    parser.add_argument("--no-block-receipts", action="store_true", help="不支持 eth_getBlockReceipts")
+    parser.add_argument("--head-blocks", type=int, default=30, help="Vechain 区块订阅推送的区块数")
+    parser.add_argument("--head-interval-ms", type=float, default=50.0, help="区块订阅的推送间隔（毫秒）")
+    parser.add_argument("--reorg-every", type=int, default=0, help="每推送该数量的区块模拟一次分叉（0 为不模拟）")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        args.latency_ms, args.jitter_ms, args.txs_per_block, args.tx_input_bytes, args.error_rate,
+        slow_rate=args.slow_rate, slow_ms=args.slow_ms, quota=args.quota, block_receipts=not args.no_block_receipts,
+        head_blocks=args.head_blocks, head_interval_ms=args.head_interval_ms, reorg_every=args.reorg_every
+    )
+    loop = asyncio.new_event_loop()
+    port = loop.run_until_complete(_serve(config, args.host, args.port))
+    for name, url in node_urls(f"http://{args.host}:{port}").items():
+        print(f"export {name}={url}")
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+以太坊地址活动索引
+
+节点没有地址索引，本模块把 ``eth_getBlockByNumber(n, true)`` 的交易按地址写入本地定长记录文件：
+
+- ``records.bin``：追加写入的 64 字节定长记录（上一条同地址记录的位置、区块、交易序号、方向、交易哈希、金额），
+  通过 mmap 读取；同一地址的记录组成从新到旧的反向链表，查询只访问该地址自己的记录；
+- ``addresses.bin``：按分配顺序追加的 20 字节地址，启动时载入为 地址→编号 字典；
+- ``state.bin``：检查点（已索引高度、记录数、地址数）与每个地址最新记录位置的数组，整体原子替换。
+
+重启时记录和地址文件截断到最近一次检查点，之后的区块重新摄入，因此摄入可随时中断。
+只索引 ``finalized`` 区块，不需要处理重组。每条 (地址, 交易) 占 64 字节。
+
+多个进程打开同一目录时只有持有 ``sync.lock`` 的进程写入（见 sync_leader 模块）；
+其他进程只读，在状态文件被替换后载入新的检查点（记录与地址在检查点之前已落盘），不截断文件。
+"""
+import mmap
+import logging
+import os
+import struct
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from blockchain_mcp.jsonrpc import batch_call
+from blockchain_mcp.sync_leader import SyncLeader
+
+logger = logging.getLogger(__name__)
+
+# 索引为空时的起始高度；未设置时从 finalized 高度往前回填 ADDRESS_INDEX_BACKFILL 个区块
+ADDRESS_INDEX_START = os.getenv("ETHEREUM_ADDRESS_INDEX_START")
+ADDRESS_INDEX_BACKFILL = int(os.getenv("ETHEREUM_ADDRESS_INDEX_BACKFILL", "1000"))
+ADDRESS_INDEX_BATCH = int(os.getenv("ETHEREUM_ADDRESS_INDEX_BATCH", "10"))
+ADDRESS_INDEX_CHECKPOINT = int(os.getenv("ETHEREUM_ADDRESS_INDEX_CHECKPOINT", "100"))
+ADDRESS_INDEX_INTERVAL = float(os.getenv("ETHEREUM_ADDRESS_INDEX_INTERVAL", "12"))
+
+# prev(int64, -1 表示无) block(uint32) tx_index(uint16) direction(uint8) pad hash(32B) value(uint128 大端)
+RECORD = struct.Struct("<qIHBx32s16s")
+STATE_HEADER = struct.Struct("<qQQ")
+DIRECTIONS = {1: "out", 2: "in", 3: "self"}
+OUT, IN, SELF = 1, 2, 3
+
+
+class AddressIndexError(Exception):
+    """索引无法继续同步（节点返回错误）"""
+
+
+class AddressIndex:
+    def __init__(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self._records_path = os.path.join(path, "records.bin")
+        self._addresses_path = os.path.join(path, "addresses.bin")
+        self._state_path = os.path.join(path, "state.bin")
+        self._leader = SyncLeader(os.path.join(path, "sync.lock"))
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last_error: Optional[str] = None
+        self._stats = {"blocks": 0, "transactions": 0, "lookups": 0, "checkpoints": 0, "reloads": 0, "errors": 0}
+        # 只有同步进程打开记录/地址文件用于追加
+        self._records = self._addresses = self._map = None
+        self._load(self._leader.acquire())
+
+    @property
+    def height(self) -> Optional[int]:
+        """已索引（并持久化或待检查点）的最高区块"""
+        return self._height if self._height >= 0 else None
+
+    def lookup(self, address: str, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        按时间倒序返回地址的交易记录
+        :param cursor: 上一页返回的游标（"<地址编号>:<记录位置>"），为空时从最新记录开始；
+            记录本身不含地址，游标的地址编号与查询地址不符时拒绝，避免把其他地址的记录当作该地址返回
+        :return: (记录列表, 下一页游标；没有更多记录时为None)
+        """
+        with self._lock:
+            self._stats["lookups"] += 1
+            address_id = self._ids.get(bytes.fromhex(address[2:].lower() if address.startswith("0x") else address))
+            if cursor is None:
+                position = self._heads[address_id] if address_id is not None else -1
+            else:
+                try:
+                    cursor_id, position = (int(part) for part in cursor.split(":"))
+                except ValueError:
+                    raise ValueError(f"Invalid cursor: {cursor}") from None
+                if cursor_id != address_id or not 0 <= position < self._count:
+                    raise ValueError(f"Invalid cursor: {cursor}")
+            items = []
+            while position >= 0 and len(items) < limit:
+                prev, block, tx_index, direction, tx_hash, value = RECORD.unpack_from(self._map, position * RECORD.size)
+                items.append({
+                    "block": block,
+                    "tx_index": tx_index,
+                    "hash": "0x" + tx_hash.hex(),
+                    "direction": DIRECTIONS[direction],
+                    "value": int.from_bytes(value, "big"),
+                })
+                position = prev
+        return items, (f"{address_id}:{position}" if position >= 0 else None)
+
+    def apply_block(self, block: dict):
+        """摄入一个 eth_getBlockByNumber(n, true) 的原始JSON区块"""
+        number = int(block["number"], 16)
+        records = bytearray()
+        with self._lock:
+            if number != self._height + 1 and self._height >= 0:
+                raise AddressIndexError(f"Block {number} does not follow indexed height {self._height}")
+            position = self._count
+            for tx in block["transactions"]:
+                tx_index = int(tx["transactionIndex"], 16)
+                tx_hash = bytes.fromhex(tx["hash"][2:])
+                value = int(tx["value"], 16).to_bytes(16, "big")
+                sender, receiver = tx["from"].lower(), (tx.get("to") or "").lower()
+                parties = [(sender, SELF)] if sender == receiver else [(sender, OUT), (receiver, IN)]
+                for address, direction in parties:
+                    if not address:
+                        continue  # 合约创建交易没有接收方
+                    address_id = self._address_id(address)
+                    records += RECORD.pack(self._heads[address_id], number, tx_index, direction, tx_hash, value)
+                    self._heads[address_id] = position
+                    position += 1
+            self._records.write(records)
+            self._records.flush()
+            self._count = position
+            self._height = number
+            self._remap()
+            self._stats["blocks"] += 1
+            self._stats["transactions"] += len(block["transactions"])
+
+    def checkpoint(self):
+        """持久化记录、地址与链表头，原子替换状态文件"""
+        with self._lock:
+            for handle in (self._records, self._addresses):
+                handle.flush()
+                os.fsync(handle.fileno())
+            temp_path = self._state_path + ".tmp"
+            with open(temp_path, "wb") as handle:
+                handle.write(STATE_HEADER.pack(self._height, self._count, len(self._heads)))
+                self._heads.tofile(handle)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temp_path, self._state_path)
+            self._stats["checkpoints"] += 1
+
+    def refresh(self):
+        """只读进程：状态文件被同步进程替换后载入新的检查点"""
+        try:
+            inode = os.stat(self._state_path).st_ino
+        except FileNotFoundError:
+            return
+        if inode != self._state_inode:
+            with self._lock:
+                self._load(writable=False)
+                self._stats["reloads"] += 1
+
+    def sync(self, session: requests.Session, url: str, batch_size: int = ADDRESS_INDEX_BATCH) -> int:
+        """追到节点的 finalized 区块，返回本次摄入的区块数"""
+        if self._records is None:
+            raise AddressIndexError("Index is synced by another process")
+        with self._sync_lock:
+            finalized = self._call(session, url, [("eth_getBlockByNumber", ["finalized", False])])[0]
+            target = int(finalized["number"], 16)
+            if self._height < 0:
+                start = int(ADDRESS_INDEX_START) if ADDRESS_INDEX_START else max(0, target - ADDRESS_INDEX_BACKFILL)
+                self._height = start - 1
+            ingested = 0
+            while self._height < target:
+                numbers = range(self._height + 1, min(self._height + 1 + batch_size, target + 1))
+                blocks = self._call(session, url, [("eth_getBlockByNumber", [hex(n), True]) for n in numbers], batch_size)
+                for block in blocks:
+                    self.apply_block(block)
+                    ingested += 1
+                    if self._height % ADDRESS_INDEX_CHECKPOINT == 0:
+                        self.checkpoint()
+            if ingested:
+                self.checkpoint()
+            return ingested
+
+    def follow(self, session: requests.Session, url: str, interval: float = ADDRESS_INDEX_INTERVAL):
+        """在后台线程中持续同步；其他进程正在同步时只载入其检查点，同步进程退出后接管"""
+        if self._thread is not None:
+            return
+
+        def _run():
+            while True:
+                try:
+                    if self._records is None and self._leader.acquire():
+                        # 接管同步：丢弃原同步进程检查点之后未完成的写入
+                        with self._lock:
+                            self._load(writable=True)
+                    if self._records is None:
+                        self.refresh()
+                    else:
+                        self.sync(session, url)
+                    self._last_error = None
+                except Exception as e:
+                    logger.error(f"Address index sync error: {str(e)}")
+                    self._stats["errors"] += 1
+                    self._last_error = str(e)
+                time.sleep(interval)
+
+        self._thread = threading.Thread(target=_run, name="address-index", daemon=True)
+        self._thread.start()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["height"] = self.height
+            stats["addresses"] = len(self._heads)
+            stats["records"] = self._count
+            stats["bytes"] = self._count * RECORD.size + len(self._heads) * 28
+            stats["role"] = "writer" if self._records is not None else "reader"
+        stats["last_error"] = self._last_error
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+            for handle in (self._records, self._addresses):
+                if handle is not None:
+                    handle.close()
+        self._leader.release()
+
+    def _load(self, writable: bool):
+        """
+        读取检查点；同步进程还把记录/地址文件截断到检查点位置（丢弃未完成的摄入）并打开以追加，
+        只读进程不修改文件，只读取检查点范围内的地址
+        """
+        self._height, self._count, address_count = -1, 0, 0
+        self._heads = array("q")
+        self._state_inode = None
+        if os.path.exists(self._state_path):
+            with open(self._state_path, "rb") as handle:
+                self._state_inode = os.fstat(handle.fileno()).st_ino
+                self._height, self._count, address_count = STATE_HEADER.unpack(handle.read(STATE_HEADER.size))
+                self._heads.fromfile(handle, address_count)
+        for path, size in ((self._records_path, self._count * RECORD.size), (self._addresses_path, address_count * 20)):
+            with open(path, "ab") as handle:
+                if writable:
+                    handle.truncate(size)
+        for handle in (self._records, self._addresses):
+            if handle is not None:
+                handle.close()
+        self._records = open(self._records_path, "ab") if writable else None
+        self._addresses = open(self._addresses_path, "ab") if writable else None
+        with open(self._addresses_path, "rb") as handle:
+            raw = handle.read(address_count * 20)
+        self._ids = {raw[offset:offset + 20]: offset // 20 for offset in range(0, len(raw), 20)}
+        self._remap()
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._count:
+            with open(self._records_path, "rb") as handle:
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _address_id(self, address: str) -> int:
+        key = bytes.fromhex(address[2:])
+        address_id = self._ids.get(key)
+        if address_id is None:
+            address_id = len(self._heads)
+            self._ids[key] = address_id
+            self._heads.append(-1)
+            self._addresses.write(key)
+        return address_id
+
+    @staticmethod
+    def _call(session: requests.Session, url: str, calls: list, batch_size: Optional[int] = None) -> list:
+        results = batch_call(session, url, calls, max_batch_size=batch_size, timeout=60)
+        for result in results:
+            if result.error is not None or result.result is None:
+                raise AddressIndexError(result.error or "Block not found")
+        return [result.result for result in results]
@@ -1,14 +1,42 @@
 # -*- coding: utf-8 -*-
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 from pydantic import BaseModel, field_validator
-import requests
+import asyncio
+import logging
 import re
+import time
+from blockchain_mcp.fee_history import FEE_REFRESH_INTERVAL, FeeWindow
+from blockchain_mcp.head_tracker import HEAD_TRACKERS, HeadTracker
+from blockchain_mcp.jsonrpc import RpcCall, RpcResult
+from blockchain_mcp.erc20 import DECIMALS, SYMBOL, balance_of_data, decode_string, decode_uint
+from blockchain_mcp.models import (
+    BalanceResult, BlockFeesResult, BlockResult, BlockTransactionsResult, FeeEstimateResult, PriceResult, TokenBalance,
+    TokenBalancesResult, TransactionResult, to_units
+)
+from blockchain_mcp.price_cache import PRICE_CACHE, PriceFetchError
+from blockchain_mcp.token_metadata import TOKEN_METADATA
+
+logger = logging.getLogger(__name__)
+
+# 区块查询详细程度：header 仅区块头，summary 区块头+交易数，full 区块头+交易ID列表
+BLOCK_DETAILS = ("header", "summary", "full")
+# 内部区块形式：一次请求获取区块及全部完整交易（get_block_transactions 使用，不对 get_block_info 开放）
+TRANSACTIONS_DETAIL = "transactions"
+# get_block_transactions 每页默认与最大交易数
+BLOCK_TXS_LIMIT = 50
+BLOCK_TXS_MAX_LIMIT = 1000
+# get_token_balances 单次最多查询的代币数
+TOKEN_BALANCES_MAX = 100
+
 
 class BlockchainResponse(BaseModel):
     success: bool
-    data: Optional[Union[Dict, str]]
-    error: Optional[str]
+    data: Optional[Union[
+        BlockResult, BlockTransactionsResult, BlockFeesResult, FeeEstimateResult, TransactionResult, BalanceResult,
+        TokenBalancesResult, PriceResult, Dict, str
+    ]] = None
+    error: Optional[str] = None
 
     
 class BaseBlockchain(ABC):
@@ -17,15 +45,46 @@ class BaseBlockchain(ABC):
       self.rpc_url = rpc_url
       self.chain_id = chain_id
       self.chain_name = "base"
+      # 链头标签（latest/best），后台链头跟踪启用时由内存直接返回
+      self.head_tag = None
+      # 支持的代币标准（ERC-20/VIP-180），为空时不支持代币余额查询
+      self.token_standard = None
+      # 最近区块的手续费滚动窗口，为空时不支持费用估计
+      self.fee_window: Optional[FeeWindow] = None
       self.TX_HASH_PATTERN = re.compile(r'^(0x)?[0-9a-fA-F]{64}$')
     
+    def _cache_key(self, kind: str, identifier: Union[int, str]) -> tuple:
+        """区块/交易缓存键：(链名, 类型, 规范化后的高度或哈希)"""
+        if isinstance(identifier, str):
+            identifier = identifier.strip().lower()
+        return (self.chain_name, kind, identifier)
+
+    def _tracked_head(self, block_identifier: Union[int, str]) -> Optional[Any]:
+        """链头标签查询且后台跟踪有新鲜链头时返回内存中的区块，否则返回None"""
+        if self.head_tag is None or block_identifier != self.head_tag:
+            return None
+        return HEAD_TRACKERS.head(self.chain_name)
+
+    async def follow_head(self, tracker: HeadTracker):
+        """
+        跟随链头并持续调用 tracker.update/touch，由支持链头跟踪的子类实现；
+        在后台跟踪线程的事件循环中运行，异常退出后会被退避重启
+        """
+        raise NotImplementedError(f"{self.chain_name} does not support head tracking")
+
+    @staticmethod
+    def _validate_detail(detail: str):
+        if detail not in BLOCK_DETAILS:
+            raise ValueError(f"detail must be one of {', '.join(BLOCK_DETAILS)}")
+
     @abstractmethod
-    def get_block_info(self, block_identifier: Union[int, str])->BlockchainResponse:
+    def get_block_info(self, block_identifier: Union[int, str], detail: str = "summary")->BlockchainResponse:
         """
         获取区块元数据（支持高度或哈希）
 
         Args:
             block_identifier (Union[int, str]): 区块高度（int）或哈希（0x开头字符串）
+            detail (str): header/summary/full，各链映射到开销最小的上游请求形式
 
         Returns:
             BlockchainResponse: 包含区块哈希、时间戳、交易根等数据的标准化响应
@@ -49,37 +108,293 @@ class BaseBlockchain(ABC):
         """
         pass
     
+    async def get_block_info_async(self, block_identifier: Union[int, str], detail: str = "summary") -> BlockchainResponse:
+        """
+        get_block_info 的异步版本，子类应使用异步HTTP客户端覆盖；
+        默认实现在线程池中执行同步方法，避免阻塞事件循环
+        """
+        return await asyncio.to_thread(self.get_block_info, block_identifier, detail)
+
+    def get_address_transactions(self, address: str, limit: int = 20, cursor: Optional[str] = None) -> BlockchainResponse:
+        """
+        按时间倒序分页查询地址的交易，需要链实现本地地址索引
+        :param cursor: 上一页返回的 next_cursor，为空时从最新交易开始
+        """
+        return BlockchainResponse(success=False, error=f"{self.chain_name} does not support address transaction queries")
+
+    async def get_address_transactions_async(self, address: str, limit: int = 20, cursor: Optional[str] = None) -> BlockchainResponse:
+        """get_address_transactions 的异步版本，默认在线程池中执行同步方法"""
+        return await asyncio.to_thread(self.get_address_transactions, address, limit, cursor)
+
+    async def get_token_balances_async(self, address: str, tokens: List[str]) -> BlockchainResponse:
+        """
+        查询地址持有的多个代币余额（ERC-20 / VIP-180）
+        所有 balanceOf 与缺少元数据的 decimals/symbol 调用在一次上游请求中完成；元数据持久缓存，每个代币只查询一次
+        :param tokens: 代币合约地址列表（最多100个）
+        """
+        if self.token_standard is None:
+            return BlockchainResponse(success=False, error=f"{self.chain_name} does not support token balance queries")
+        try:
+            self._validate_address(address)
+            if not 1 <= len(tokens) <= TOKEN_BALANCES_MAX:
+                raise ValueError(f"tokens must contain between 1 and {TOKEN_BALANCES_MAX} addresses")
+            for token in tokens:
+                self._validate_address(token)
+            metadata = {token: TOKEN_METADATA.get(self.chain_name, token) for token in tokens}
+            missing = [token for token in dict.fromkeys(tokens) if metadata[token] is None]
+            calls = [(token, balance_of_data(address)) for token in tokens]
+            calls += [(token, DECIMALS) for token in missing] + [(token, SYMBOL) for token in missing]
+            results = await self._call_contracts_async(calls)
+        except Exception as e:
+            logger.error(f"Get token balances error: {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+        errors = {}
+        for index, token in enumerate(missing):
+            decimals, symbol = results[len(tokens) + index], results[len(tokens) + len(missing) + index]
+            try:
+                if decimals.error:
+                    raise ValueError(decimals.error)
+                metadata[token] = (decode_uint(decimals.result), None if symbol.error else decode_string(symbol.result))
+                TOKEN_METADATA.put(self.chain_name, token, *metadata[token])
+            except ValueError as e:
+                errors[token] = f"decimals() failed: {str(e)}"
+        balances = []
+        for token, result in zip(tokens, results):
+            try:
+                if token in errors:
+                    raise ValueError(errors[token])
+                if result.error:
+                    raise ValueError(f"balanceOf() failed: {result.error}")
+                decimals, symbol = metadata[token]
+                balances.append(TokenBalance(
+                    token=token, balance=to_units(decode_uint(result.result), decimals), symbol=symbol, decimals=decimals
+                ))
+            except ValueError as e:
+                balances.append(TokenBalance(token=token, error=str(e)))
+        data = TokenBalancesResult(chain=self.chain_name, address=address, tokens=balances)
+        return BlockchainResponse(success=True, data=data, error=None)
+
+    async def _call_contracts_async(self, calls: List[Tuple[str, str]]) -> List[RpcResult]:
+        """
+        在同一状态下执行一组只读合约调用，由支持代币查询的子类实现
+        :param calls: [(合约地址, 调用数据), ...]
+        :return: 与 calls 顺序一致的 RpcResult，result 为十六进制返回数据
+        """
+        raise NotImplementedError(f"{self.chain_name} does not support token balance queries")
+
+    def get_signature_statuses(self, signatures: List[str]) -> BlockchainResponse:
+        """
+        批量查询交易签名的确认状态（不下载交易本身），由支持的子类实现
+        :return: data["results"] 为逐项结果
+        """
+        return BlockchainResponse(success=False, error=f"{self.chain_name} does not support signature status queries")
+
+    async def get_signature_statuses_async(self, signatures: List[str]) -> BlockchainResponse:
+        """get_signature_statuses 的异步版本，默认在线程池中执行同步方法"""
+        return await asyncio.to_thread(self.get_signature_statuses, signatures)
+
+    async def get_block_transactions_async(
+        self, block_identifier: Union[int, str], offset: int = 0, limit: int = BLOCK_TXS_LIMIT
+    ) -> BlockchainResponse:
+        """
+        分页获取区块中的完整交易：整个区块（含全部交易）一次上游请求获取并按区块缓存，翻页不再请求上游
+        :param offset: 从区块内第几笔交易开始
+        :param limit: 每页交易数（1-1000）
+        """
+        try:
+            if offset < 0:
+                raise ValueError("offset must be a non-negative integer")
+            if not 1 <= limit <= BLOCK_TXS_MAX_LIMIT:
+                raise ValueError(f"limit must be between 1 and {BLOCK_TXS_MAX_LIMIT}")
+            block_info = await self._fetch_block_async(block_identifier, TRANSACTIONS_DETAIL)
+            if block_info is None:
+                return BlockchainResponse(success=True, data="Block not found", error=None)
+            block = self._format_block(block_info, "header")
+            transactions = self._block_transactions(block_info)
+            page = transactions[offset:offset + limit]
+            next_offset = offset + len(page)
+            data = BlockTransactionsResult(
+                chain=self.chain_name,
+                number=block.number,
+                hash=block.hash,
+                tx_count=len(transactions),
+                offset=offset,
+                transactions=[self._format_block_transaction(block_info, tx) for tx in page],
+                next_offset=next_offset if next_offset < len(transactions) else None,
+            )
+            return BlockchainResponse(success=True, data=data, error=None)
+        except NotImplementedError as e:
+            return BlockchainResponse(success=False, data=None, error=str(e))
+        except Exception as e:
+            logger.error(f"Get block transactions error: {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+    def _block_transactions(self, block_info: Any) -> List[Any]:
+        """以 TRANSACTIONS_DETAIL 形式获取的原始区块中的完整交易列表，由支持的子类实现"""
+        raise NotImplementedError(f"{self.chain_name} does not support block transaction queries")
+
+    def _format_block_transaction(self, block_info: Any, tx: Any) -> TransactionResult:
+        """格式化区块中的一笔完整交易（补全区块高度、哈希等交易对象中缺少的字段），由支持的子类实现"""
+        raise NotImplementedError(f"{self.chain_name} does not support block transaction queries")
+
+    async def get_block_fees_async(self, block_identifier: Union[int, str], transactions: bool = False) -> BlockchainResponse:
+        """
+        区块手续费分析（总额、燃烧、优先费分位数），由支持的子类实现
+        :param transactions: 是否附带逐笔交易的手续费
+        """
+        return BlockchainResponse(success=False, error=f"{self.chain_name} does not support block fee analysis")
+
+    async def get_block_fee_fields_async(self, block_identifier: Union[int, str]) -> Dict[str, float]:
+        """区块手续费的数值字段，供区块范围扫描聚合使用，由支持的子类实现"""
+        raise NotImplementedError(f"{self.chain_name} does not support block fee analysis")
+
+    async def estimate_fees_async(self) -> BlockchainResponse:
+        """
+        基于最近 N 个区块的费用估计（基础费用趋势、三档优先费建议）
+        链头前进时只获取窗口中缺少的新区块；刷新间隔内直接由窗口的累计值回答，不请求上游
+        """
+        window = self.fee_window
+        if window is None:
+            return BlockchainResponse(success=False, error=f"{self.chain_name} does not support fee estimation")
+        try:
+            if not window.count or time.monotonic() - window.checked_at >= FEE_REFRESH_INTERVAL:
+                head = await self._fetch_block_async(self.head_tag)
+                count = window.missing(head["number"])
+                if count:
+                    await self._extend_fee_window_async(window, head["number"], count)
+                window.checked_at = time.monotonic()
+            return BlockchainResponse(success=True, data=self._format_fee_estimate(window.summary()), error=None)
+        except Exception as e:
+            logger.error(f"Estimate fees error: {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+    async def _extend_fee_window_async(self, window: FeeWindow, head_number: int, count: int):
+        """获取以 head_number 结尾的 count 个区块的费用数据并按高度顺序追加到窗口，由支持费用估计的子类实现"""
+        raise NotImplementedError(f"{self.chain_name} does not support fee estimation")
+
+    def _format_fee_estimate(self, summary: Dict) -> FeeEstimateResult:
+        """由窗口统计（FeeWindow.summary）构造结果，由支持费用估计的子类实现"""
+        raise NotImplementedError(f"{self.chain_name} does not support fee estimation")
+
+    async def get_block_fields_async(self, block_identifier: Union[int, str]) -> Dict[str, float]:
+        """
+        获取区块的数值字段（高度、时间戳、交易数、gas等），供区块范围扫描聚合使用
+        :raises ValueError: 区块不存在或上游返回错误
+        """
+        block_info = await self._fetch_block_async(block_identifier, "summary")
+        if block_info is None:
+            raise ValueError(f"Block not found: {block_identifier}")
+        return self._block_fields(block_info)
+
+    async def _fetch_block_async(self, block_identifier: Union[int, str], detail: str = "summary") -> Any:
+        """经缓存获取原始区块数据，由支持区块扫描的子类实现"""
+        raise NotImplementedError(f"{self.chain_name} does not support block scanning")
+
+    def _block_fields(self, block_info: Any) -> Dict[str, float]:
+        """从原始区块数据中提取数值字段，由支持区块扫描的子类实现"""
+        raise NotImplementedError(f"{self.chain_name} does not support block scanning")
+
+    async def get_balance_async(self, address: str) -> BlockchainResponse:
+        """get_balance 的异步版本"""
+        return await asyncio.to_thread(self.get_balance, address)
+
+    async def get_transaction_async(self, tx_hash: str) -> BlockchainResponse:
+        """get_transaction 的异步版本"""
+        return await asyncio.to_thread(self.get_transaction, tx_hash)
+
+    def get_balances(self, addresses: List[str]) -> BlockchainResponse:
+        """
+        批量查询地址余额，支持JSON-RPC批量请求的子类应覆盖为单次往返实现
+        :param addresses: 地址列表
+        :return: data["results"] 为逐项结果，单项失败不影响其他项
+        """
+        return self._bulk_response("address", addresses, [self.get_balance(a) for a in addresses])
+
+    def get_transactions(self, tx_hashes: List[str]) -> BlockchainResponse:
+        """
+        批量获取交易详情
+        :param tx_hashes: 交易哈希列表
+        :return: data["results"] 为逐项结果
+        """
+        return self._bulk_response("tx_hash", tx_hashes, [self.get_transaction(h) for h in tx_hashes])
+
+    async def get_balances_async(self, addresses: List[str]) -> BlockchainResponse:
+        """get_balances 的异步版本，默认并发执行单项查询"""
+        responses = await asyncio.gather(*(self.get_balance_async(a) for a in addresses))
+        return self._bulk_response("address", addresses, responses)
+
+    async def get_transactions_async(self, tx_hashes: List[str]) -> BlockchainResponse:
+        """get_transactions 的异步版本，默认并发执行单项查询"""
+        responses = await asyncio.gather(*(self.get_transaction_async(h) for h in tx_hashes))
+        return self._bulk_response("tx_hash", tx_hashes, responses)
+
+    @staticmethod
+    def _bulk_response(key: str, items: List[str], responses: List[BlockchainResponse]) -> BlockchainResponse:
+        results = [{key: item, **response.model_dump()} for item, response in zip(items, responses)]
+        return BlockchainResponse(success=True, data={"results": results}, error=None)
+
+    @staticmethod
+    def _bulk_rpc_calls(items: List[str], to_call: Callable[[str], RpcCall]) -> Tuple[List[RpcCall], Dict[int, str]]:
+        """
+        为批量查询生成JSON-RPC调用，校验失败的项不发送，记录为逐项错误
+        :return: (调用列表, {项序号: 错误信息})
+        """
+        calls, errors = [], {}
+        for index, item in enumerate(items):
+            try:
+                calls.append(to_call(item))
+            except ValueError as e:
+                errors[index] = str(e)
+        return calls, errors
+
+    def _bulk_rpc_response(
+        self,
+        key: str,
+        items: List[str],
+        errors: Dict[int, str],
+        rpc_results: Sequence[RpcResult],
+        formatter: Callable[[str, Any], Union[Dict, str]],
+    ) -> BlockchainResponse:
+        """将批量调用结果按项格式化，与 _bulk_rpc_calls 配合使用"""
+        responses = []
+        pending = iter(rpc_results)
+        for index, item in enumerate(items):
+            if index in errors:
+                responses.append(BlockchainResponse(success=False, data=None, error=errors[index]))
+                continue
+            rpc_result = next(pending)
+            if rpc_result.error:
+                responses.append(BlockchainResponse(success=False, data=None, error=rpc_result.error))
+            elif rpc_result.result is None:
+                responses.append(BlockchainResponse(success=False, data="Not found", error="Not found"))
+            else:
+                try:
+                    data = formatter(item, rpc_result.result)
+                    responses.append(BlockchainResponse(success=True, data=data, error=None))
+                except (KeyError, TypeError, AttributeError, ValueError) as e:
+                    responses.append(BlockchainResponse(success=False, data=None, error=str(e)))
+        return self._bulk_response(key, items, responses)
+
     def get_price(self) -> BlockchainResponse:
         """
-        获取当前链的价格（主网代币）
+        获取当前链的价格（主网代币），由进程级价格缓存提供
         :return: 包含价格信息的标准化响应
         """
-     
-        url = "https://api.coingecko.com/api/v3/simple/price"
-        params = {
-            "ids": self.chain_name,
-            "vs_currencies": "usd"
-        }
-    
         try:
-            response = requests.get(url, params=params, timeout=5)
-            if response.status_code == 200:
-                json = response.json()
-                data = f"""
-                    当前{self.chain_name}价格：{json[self.chain_name]['usd']} USD
-                    """
-                print(f"{data}")
-            
-                return BlockchainResponse(success=True, data=data, error=None)
-            else:
-                print(f"API请求失败，状态码：{response.status_code}")
-                return BlockchainResponse(success=False, data=None, error="API请求失败")
-        except requests.exceptions.RequestException as e:
-            print(f"网络连接异常：{str(e)}")
-            return BlockchainResponse(success=False, data=None, error="网络连接异常")
-        except KeyError:
-            print("API响应数据结构异常")
-            return BlockchainResponse(success=False, data=None, error="API响应数据结构异常")
+            return self._price_response(PRICE_CACHE.get(self.chain_name))
+        except PriceFetchError as e:
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+    async def get_price_async(self) -> BlockchainResponse:
+        """get_price 的异步版本，缓存命中时不离开事件循环"""
+        price = PRICE_CACHE.peek(self.chain_name)
+        if price is not None:
+            return self._price_response(price)
+        return await asyncio.to_thread(self.get_price)
+
+    def _price_response(self, price: float) -> BlockchainResponse:
+        return BlockchainResponse(success=True, data=PriceResult(chain=self.chain_name, price=price), error=None)
 
     
     @field_validator('rpc_url')
@@ -1,30 +1,51 @@
+import os
 import re
-import requests
+import aiohttp
+from decimal import Decimal
 from abc import abstractmethod
-from typing import Union
+from typing import Dict, List, Union
 from pydantic import field_validator
-from blockchain_mcp.base import BaseBlockchain, BlockchainResponse
+from blockchain_mcp.base import TRANSACTIONS_DETAIL, BaseBlockchain, BlockchainResponse
+from blockchain_mcp.block_cache import BLOCK_CACHE
+from blockchain_mcp.http_pool import get_async_session, get_session
+from blockchain_mcp.jsonrpc import RpcCall, RpcResult, batch_call, batch_call_async
+from blockchain_mcp.models import BalanceResult, BlockResult, TransactionResult, to_units
+from blockchain_mcp.utxo_index import UtxoIndex, output_address
+
+# 确认数达到该阈值的区块和交易视为已最终确定
+FINALITY_CONFIRMATIONS = int(os.getenv("BITCOIN_FINALITY_CONFIRMATIONS", "6"))
+# 本地UTXO索引的SQLite文件路径；设置后在后台摄入区块，余额查询不再依赖节点钱包
+UTXO_INDEX_PATH = os.getenv("BITCOIN_UTXO_INDEX_PATH")
+# 索引落后节点链头不超过该区块数时才用于余额查询（初始同步或同步中断期间查询节点）
+UTXO_INDEX_MAX_LAG = int(os.getenv("BITCOIN_UTXO_INDEX_MAX_LAG", "2"))
 
 
 class BitcoinBlockchain(BaseBlockchain):
     def __init__(self, rpc_url: str, chain_id: int=0):
         super().__init__(rpc_url, chain_id)
         self.chain_name = "bitcoin"
+        self.session = get_session("bitcoin")
         self.BTC_ADDRESS_PATTERN = re.compile(
             r'^(bc1|[13])[a-zA-HJ-NP-Z0-9]{25,39}$'  # 支持Legacy/SegWit/Bech32地址
         )
+        self.utxo_index = UtxoIndex(UTXO_INDEX_PATH) if UTXO_INDEX_PATH else None
+        if self.utxo_index is not None:
+            self.utxo_index.follow(self.session, rpc_url)
         
-    def _rpc_call(self, method: str, params: list = []):
-        """比特币核心JSON-RPC调用"""
-        headers = {'content-type': 'application/json'}
-        payload = {
+    def _rpc_payload(self, method: str, params: list) -> dict:
+        return {
             "jsonrpc": "1.0",
             "id": "curiosity",
             "method": method,
             "params": params
         }
+
+    def _rpc_call(self, method: str, params: list = []):
+        """比特币核心JSON-RPC调用"""
+        headers = {'content-type': 'application/json'}
+        payload = self._rpc_payload(method, params)
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.rpc_url, 
                 json=payload, 
                 headers=headers,
@@ -34,30 +55,43 @@ class BitcoinBlockchain(BaseBlockchain):
         except Exception as e:
             return {"error": str(e)}
 
-    def get_block_info(self, block_identifier: Union[int, str]) -> BlockchainResponse:
+    async def _rpc_call_async(self, method: str, params: list = []):
+        """比特币核心JSON-RPC异步调用"""
+        headers = {'content-type': 'application/json'}
+        payload = self._rpc_payload(method, params)
+        try:
+            session = get_async_session("bitcoin")
+            async with session.post(
+                self.rpc_url,
+                json=payload,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                return (await response.json(content_type=None)).get('result')
+        except Exception as e:
+            return {"error": str(e)}
+
+    def get_block_info(self, block_identifier: Union[int, str], detail: str = "summary") -> BlockchainResponse:
         """
         获取比特币区块信息[3,6](@ref)
         - 支持区块高度或哈希查询
-        - 包含交易数量和Merkle根
+        - header/summary 使用 getblockheader（含 nTx），full 使用 getblock verbosity=1（含交易ID）
         """
         try:
-            if isinstance(block_identifier, int):
-                block_hash = self._rpc_call("getblockhash", [block_identifier])
+            self._validate_detail(detail)
+            form = self._block_form(detail)
+            block_info = BLOCK_CACHE.get(self._cache_key(f"block:{form}", block_identifier))
+            if block_info is not None:
+                block_info = self._with_confirmations(block_info, "height", self._head_height())
             else:
-                block_hash = block_identifier
-            
-            block_info = self._rpc_call("getblock", [block_hash, 2])  # verbosity=2包含交易详情
-            
-            structured_data = {
-                "hash": block_info["hash"],
-                "height": block_info["height"],
-                "timestamp": block_info["time"],
-                "transaction_count": len(block_info["tx"]),
-                "merkle_root": block_info["merkleroot"],
-                "difficulty": block_info["difficulty"],
-                "confirmations": block_info["confirmations"]
-            }
-            return BlockchainResponse(success=True, data=structured_data)
+                if isinstance(block_identifier, int):
+                    block_hash = self._rpc_call("getblockhash", [block_identifier])
+                else:
+                    block_hash = block_identifier
+
+                block_info = self._rpc_call(*self._block_call(block_hash, form))
+                self._cache_block(block_info, form)
+            return BlockchainResponse(success=True, data=self._format_block(block_info, detail))
         except Exception as e:
             return BlockchainResponse(success=False, error=str(e))
 
@@ -68,34 +102,45 @@ class BitcoinBlockchain(BaseBlockchain):
         - 包含交易状态和确认数
         """
         try:
-            tx_info = self._rpc_call("getrawtransaction", [tx_hash, True])
-            block_hash = tx_info.get("blockhash", "")
-            confirmations = tx_info.get("confirmations", 0)
-            
-            # 解析输入输出
-            inputs = [{
-                "address": inp.get("prevout", {}).get("scriptPubKey", {}).get("address"),
-                "value": inp.get("prevout", {}).get("value")
-            } for inp in tx_info.get("vin", [])]
-            
-            outputs = [{
-                "address": out["scriptPubKey"]["addresses"][0],
-                "value": out["value"]
-            } for out in tx_info.get("vout", [])]
-            
-            structured_data = {
-                "txid": tx_info["txid"],
-                "inputs": inputs,
-                "outputs": outputs,
-                "fee": sum(inp["value"] for inp in inputs) - sum(out["value"] for out in outputs),
-                "block_hash": block_hash,
-                "confirmations": confirmations,
-                "status": "confirmed" if confirmations > 6 else "pending"
-            }
-            return BlockchainResponse(success=True, data=structured_data)
+            tx_info = BLOCK_CACHE.get(self._cache_key("tx", tx_hash))
+            if tx_info is not None:
+                tx_info = self._with_confirmations(tx_info, "blockheight", self._head_height())
+            else:
+                rpc_results = batch_call(self.session, self.rpc_url, self._transaction_with_head_calls(tx_hash), version="1.0")
+                tx_info = self._cache_transaction(tx_hash, *rpc_results)
+            return BlockchainResponse(success=True, data=self._format_transaction(tx_info))
         except Exception as e:
             return BlockchainResponse(success=False, error=str(e))
 
+    def _format_transaction(self, tx_info: dict) -> TransactionResult:
+        confirmations = tx_info.get("confirmations", 0)
+        
+        # 解析输入输出
+        inputs = [{
+            "address": inp.get("prevout", {}).get("scriptPubKey", {}).get("address"),
+            "value": inp.get("prevout", {}).get("value")
+        } for inp in tx_info.get("vin", [])]
+        
+        outputs = [{
+            "address": output_address(out),
+            "value": out["value"]
+        } for out in tx_info.get("vout", [])]
+
+        # 只有 getrawtransaction 返回了 prevout（verbosity 2）时才能计算手续费；getblock verbosity 2 直接给出 fee
+        fee = Decimal(str(tx_info["fee"])) if "fee" in tx_info else None
+        if fee is None and inputs and all(inp["value"] is not None for inp in inputs):
+            fee = Decimal(str(sum(inp["value"] for inp in inputs) - sum(out["value"] for out in outputs)))
+        return TransactionResult(
+            chain=self.chain_name,
+            hash=tx_info["txid"],
+            block_hash=tx_info.get("blockhash"),
+            value=Decimal(str(sum(out["value"] for out in outputs))),
+            fee=fee,
+            status="confirmed" if confirmations >= FINALITY_CONFIRMATIONS else "pending",
+            symbol="BTC",
+            extra={"inputs": inputs, "outputs": outputs, "confirmations": confirmations}
+        )
+
     def get_balance(self, address: str) -> BlockchainResponse:
         """
         查询比特币地址余额[3,9](@ref)
@@ -108,22 +153,268 @@ class BitcoinBlockchain(BaseBlockchain):
                 error="Invalid Bitcoin address format"
             )
         
+        if self._index_ready():
+            return BlockchainResponse(success=True, data=self._format_indexed_balance(address))
+
         try:
             # 获取未花费交易输出
             utxos = self._rpc_call("listunspent", [0, 9999999, [address]])
-            total_balance = sum(utxo["amount"] for utxo in utxos) * 1e8  # 转成satoshi单位
+            return BlockchainResponse(success=True, data=self._format_balance(address, utxos))
+        except Exception as e:
+            return BlockchainResponse(success=False, error=str(e))
+
+    async def get_block_info_async(self, block_identifier: Union[int, str], detail: str = "summary") -> BlockchainResponse:
+        """get_block_info 的异步版本"""
+        try:
+            self._validate_detail(detail)
+            block_info = await self._fetch_block_async(block_identifier, detail)
+            return BlockchainResponse(success=True, data=self._format_block(block_info, detail))
+        except Exception as e:
+            return BlockchainResponse(success=False, error=str(e))
+
+    async def get_transaction_async(self, tx_hash: str) -> BlockchainResponse:
+        """get_transaction 的异步版本"""
+        try:
+            tx_info = BLOCK_CACHE.get(self._cache_key("tx", tx_hash))
+            if tx_info is not None:
+                tx_info = self._with_confirmations(tx_info, "blockheight", await self._head_height_async())
+            else:
+                rpc_results = await batch_call_async(
+                    get_async_session("bitcoin"), self.rpc_url, self._transaction_with_head_calls(tx_hash), version="1.0"
+                )
+                tx_info = self._cache_transaction(tx_hash, *rpc_results)
+            return BlockchainResponse(success=True, data=self._format_transaction(tx_info))
+        except Exception as e:
+            return BlockchainResponse(success=False, error=str(e))
+
+    async def get_balance_async(self, address: str) -> BlockchainResponse:
+        """get_balance 的异步版本"""
+        if not self.BTC_ADDRESS_PATTERN.match(address):
             return BlockchainResponse(
-                success=True,
-                data={
-                    "address": address,
-                    "confirmed": total_balance,
-                    "unconfirmed": 0,  # 比特币需要单独处理未确认余额
-                    "unit": "satoshi"
-                }
+                success=False,
+                error="Invalid Bitcoin address format"
             )
+
+        if await self._index_ready_async():
+            return BlockchainResponse(success=True, data=self._format_indexed_balance(address))
+
+        try:
+            utxos = await self._rpc_call_async("listunspent", [0, 9999999, [address]])
+            return BlockchainResponse(success=True, data=self._format_balance(address, utxos))
         except Exception as e:
             return BlockchainResponse(success=False, error=str(e))
 
+    def get_balances(self, addresses: List[str]) -> BlockchainResponse:
+        """批量查询余额，所有 listunspent 合并为一次JSON-RPC批量请求；本地索引可用时直接查询索引"""
+        if self._index_ready():
+            return self._indexed_balances(addresses)
+        calls, errors = self._bulk_rpc_calls(addresses, self._balance_call)
+        rpc_results = batch_call(self.session, self.rpc_url, calls, version="1.0")
+        return self._bulk_rpc_response("address", addresses, errors, rpc_results, self._format_balance)
+
+    def get_transactions(self, tx_hashes: List[str]) -> BlockchainResponse:
+        """批量获取交易，所有 getrawtransaction 合并为一次JSON-RPC批量请求"""
+        calls, errors = self._bulk_rpc_calls(tx_hashes, self._transaction_call)
+        rpc_results = batch_call(self.session, self.rpc_url, calls, version="1.0")
+        return self._bulk_rpc_response("tx_hash", tx_hashes, errors, rpc_results, self._format_raw_transaction)
+
+    async def get_balances_async(self, addresses: List[str]) -> BlockchainResponse:
+        """get_balances 的异步版本"""
+        if await self._index_ready_async():
+            return self._indexed_balances(addresses)
+        calls, errors = self._bulk_rpc_calls(addresses, self._balance_call)
+        rpc_results = await batch_call_async(get_async_session("bitcoin"), self.rpc_url, calls, version="1.0")
+        return self._bulk_rpc_response("address", addresses, errors, rpc_results, self._format_balance)
+
+    async def get_transactions_async(self, tx_hashes: List[str]) -> BlockchainResponse:
+        """get_transactions 的异步版本"""
+        calls, errors = self._bulk_rpc_calls(tx_hashes, self._transaction_call)
+        rpc_results = await batch_call_async(get_async_session("bitcoin"), self.rpc_url, calls, version="1.0")
+        return self._bulk_rpc_response("tx_hash", tx_hashes, errors, rpc_results, self._format_raw_transaction)
+
+    def _index_ready(self) -> bool:
+        """本地索引已追到节点链头附近（UTXO_INDEX_MAX_LAG 个区块以内）"""
+        tip = self.utxo_index.tip() if self.utxo_index is not None else None
+        if tip is None:
+            return False
+        try:
+            return self._head_height() - tip[0] <= UTXO_INDEX_MAX_LAG
+        except ValueError:
+            return False
+
+    async def _index_ready_async(self) -> bool:
+        """_index_ready 的异步版本"""
+        tip = self.utxo_index.tip() if self.utxo_index is not None else None
+        if tip is None:
+            return False
+        try:
+            return await self._head_height_async() - tip[0] <= UTXO_INDEX_MAX_LAG
+        except ValueError:
+            return False
+
+    def _indexed_balances(self, addresses: List[str]) -> BlockchainResponse:
+        responses = []
+        for address in addresses:
+            if self.BTC_ADDRESS_PATTERN.match(address):
+                responses.append(BlockchainResponse(success=True, data=self._format_indexed_balance(address)))
+            else:
+                responses.append(BlockchainResponse(success=False, error="Invalid Bitcoin address format"))
+        return self._bulk_response("address", addresses, responses)
+
+    def _balance_call(self, address: str) -> RpcCall:
+        if not self.BTC_ADDRESS_PATTERN.match(address):
+            raise ValueError("Invalid Bitcoin address format")
+        return "listunspent", [0, 9999999, [address]]
+
+    def _transaction_call(self, tx_hash: str) -> RpcCall:
+        return "getrawtransaction", [tx_hash, True]
+
+    def _format_raw_transaction(self, tx_hash: str, tx_info: dict) -> TransactionResult:
+        return self._format_transaction(tx_info)
+
+    async def _fetch_block_async(self, block_identifier: Union[int, str], detail: str = "summary") -> dict:
+        """经缓存获取原始区块头或区块"""
+        form = self._block_form(detail)
+        block_info = BLOCK_CACHE.get(self._cache_key(f"block:{form}", block_identifier))
+        if block_info is not None:
+            block_info = self._with_confirmations(block_info, "height", await self._head_height_async())
+        else:
+            if isinstance(block_identifier, int):
+                block_hash = await self._rpc_call_async("getblockhash", [block_identifier])
+            else:
+                block_hash = block_identifier
+
+            block_info = await self._rpc_call_async(*self._block_call(block_hash, form))
+            if not isinstance(block_info, dict) or "hash" not in block_info:
+                raise ValueError(f"Block not found: {block_info}")
+            self._cache_block(block_info, form)
+        return block_info
+
+    def _block_fields(self, block_info: dict) -> Dict[str, float]:
+        return {
+            "number": block_info["height"],
+            "timestamp": block_info["time"],
+            "tx_count": block_info["nTx"],
+            "difficulty": block_info["difficulty"],
+        }
+
+    def _block_transactions(self, block_info: dict) -> list:
+        return block_info["tx"]
+
+    def _format_block_transaction(self, block_info: dict, tx: dict) -> TransactionResult:
+        """verbosity 2 的交易不含所在区块信息，由区块补全"""
+        return self._format_transaction(dict(tx, blockhash=block_info["hash"], confirmations=block_info["confirmations"]))
+
+    @staticmethod
+    def _block_form(detail: str) -> str:
+        """区块头已包含交易数（nTx），只有 full 需要下载交易ID列表，TRANSACTIONS_DETAIL 下载完整交易"""
+        if detail == TRANSACTIONS_DETAIL:
+            return "txs"
+        return "block" if detail == "full" else "header"
+
+    @staticmethod
+    def _block_call(block_hash: str, form: str) -> RpcCall:
+        if form == "header":
+            return "getblockheader", [block_hash, True]
+        return "getblock", [block_hash, 2 if form == "txs" else 1]
+
+    def _cache_block(self, block_info: dict, form: str):
+        """确认数达到阈值的区块按高度和哈希永久缓存；确认数随链头增长，不写入缓存，读取时按链头高度重新计算"""
+        if not isinstance(block_info, dict) or block_info.get("confirmations", 0) < FINALITY_CONFIRMATIONS:
+            return
+        stored = {key: value for key, value in block_info.items() if key != "confirmations"}
+        BLOCK_CACHE.put(self._cache_key(f"block:{form}", block_info["height"]), stored, final=True)
+        BLOCK_CACHE.put(self._cache_key(f"block:{form}", block_info["hash"]), stored, final=True)
+
+    def _cache_transaction(self, tx_hash: str, tx_result: RpcResult, count_result: RpcResult) -> dict:
+        """
+        缓存 getrawtransaction 结果并返回；已最终确定的交易由同一批次的链头高度换算出所在高度（blockheight），
+        缓存中不保存确认数
+        """
+        tx_info = tx_result.result
+        if tx_result.error or not isinstance(tx_info, dict) or "txid" not in tx_info:
+            raise ValueError(tx_result.error or f"Transaction not found: {tx_hash}")
+        confirmations = tx_info.get("confirmations", 0)
+        if confirmations >= FINALITY_CONFIRMATIONS and isinstance(count_result.result, int):
+            self._cache_head_height(count_result.result)
+            stored = {key: value for key, value in tx_info.items() if key != "confirmations"}
+            stored["blockheight"] = count_result.result - confirmations + 1
+            BLOCK_CACHE.put(self._cache_key("tx", tx_hash), stored, final=True)
+        else:
+            BLOCK_CACHE.put(self._cache_key("tx", tx_hash), tx_info, final=False)
+        return tx_info
+
+    @staticmethod
+    def _transaction_with_head_calls(tx_hash: str) -> List[RpcCall]:
+        return [("getrawtransaction", [tx_hash, True]), ("getblockcount", [])]
+
+    @staticmethod
+    def _with_confirmations(info: dict, height_field: str, head_height: int) -> dict:
+        """缓存中的区块/交易不含确认数时按当前链头高度补上"""
+        if "confirmations" in info:
+            return info
+        return dict(info, confirmations=max(head_height - info[height_field] + 1, 0))
+
+    def _head_height(self) -> int:
+        """链头高度（getblockcount），按链头TTL缓存"""
+        height = BLOCK_CACHE.get(self._cache_key("head", "height"))
+        if height is None:
+            height = self._cache_head_height(self._rpc_call("getblockcount"))
+        return height
+
+    async def _head_height_async(self) -> int:
+        """_head_height 的异步版本"""
+        height = BLOCK_CACHE.get(self._cache_key("head", "height"))
+        if height is None:
+            height = self._cache_head_height(await self._rpc_call_async("getblockcount"))
+        return height
+
+    def _cache_head_height(self, height: int) -> int:
+        if not isinstance(height, int):
+            raise ValueError(f"getblockcount failed: {height}")
+        BLOCK_CACHE.put_head(self._cache_key("head", "height"), height)
+        return height
+
+    def _format_block(self, block_info: dict, detail: str = "summary") -> BlockResult:
+        result = BlockResult(
+            chain=self.chain_name,
+            number=block_info["height"],
+            hash=block_info["hash"],
+            parent_hash=block_info.get("previousblockhash"),
+            timestamp=block_info["time"],
+            extra={
+                "merkle_root": block_info["merkleroot"],
+                "difficulty": block_info["difficulty"],
+                "confirmations": block_info["confirmations"],
+            }
+        )
+        if detail != "header":
+            result.tx_count = block_info["nTx"]
+        if detail == "full":
+            result.transactions = block_info["tx"]
+        return result
+
+    def _format_balance(self, address: str, utxos: list) -> BalanceResult:
+        satoshi = sum(int(round(utxo["amount"] * 1e8)) for utxo in utxos)
+        return BalanceResult(
+            chain=self.chain_name,
+            address=address,
+            balance=to_units(satoshi, 8),
+            symbol="BTC",
+            extra={"satoshi": satoshi, "utxo_count": len(utxos)}
+        )
+
+    def _format_indexed_balance(self, address: str) -> BalanceResult:
+        """本地索引余额，只包含已摄入区块中的输出（indexed_height 为索引高度）"""
+        satoshi, utxo_count = self.utxo_index.balance(address)
+        return BalanceResult(
+            chain=self.chain_name,
+            address=address,
+            balance=to_units(satoshi, 8),
+            symbol="BTC",
+            extra={"satoshi": satoshi, "utxo_count": utxo_count, "indexed_height": self.utxo_index.tip()[0]}
+        )
+
     @field_validator('chain_id')
     def validate_chain_id(cls, v):
         """比特币主网chain_id固定为0"""
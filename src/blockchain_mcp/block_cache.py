@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+区块/交易缓存
+
+按 (链, 类型, 高度或哈希) 缓存上游原始结果，按内存预算做LRU淘汰。
+只有已最终确定（不会再变化）的结果才会被永久缓存；
+``latest``/``best`` 等链头查询只保留很短的TTL。
+配置了跨进程共享缓存时，已最终确定的结果同时写入共享缓存，进程内未命中时从中读取；
+磁盘预热缓存（见 warm_cache 模块）在其下再保存一份，服务重启后历史区块/交易直接从磁盘返回。
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from blockchain_mcp.shared_cache import SHARED_CACHE, SharedCache
+from blockchain_mcp.warm_cache import WARM_CACHE, WarmCache
+
+CACHE_MAX_BYTES = int(os.getenv("BLOCKCHAIN_MCP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+HEAD_TTL = float(os.getenv("BLOCKCHAIN_MCP_HEAD_TTL", "2"))
+
+
+def estimate_size(value: Any) -> int:
+    """粗略估算对象占用的内存字节数（递归统计容器内容）"""
+    size = sys.getsizeof(value)
+    if isinstance(value, Mapping):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class BlockCache:
+    def __init__(
+        self,
+        max_bytes: int = CACHE_MAX_BYTES,
+        head_ttl: float = HEAD_TTL,
+        shared: Optional[SharedCache] = None,
+        disk: Optional[WarmCache] = None
+    ):
+        self.max_bytes = max_bytes
+        self.head_ttl = head_ttl
+        # 跨进程共享的第二层缓存，只保存已最终确定的结果（链头结果与重组失效仍只在进程内处理）
+        self.shared = shared
+        # 跨重启保留的第三层磁盘缓存，同样只保存已最终确定的结果
+        self.disk = disk
+        # key -> (value, size, expires_at)；expires_at 为 None 表示已最终确定
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "admitted": 0, "rejected": 0, "evictions": 0, "expired": 0}
+        if shared is not None:
+            self._stats["shared_hits"] = 0
+        if disk is not None:
+            self._stats["disk_hits"] = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, size, expires_at = entry
+                if expires_at is None or expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                self._remove(key)
+                self._stats["expired"] += 1
+            if self.shared is None and self.disk is None:
+                self._stats["misses"] += 1
+                return None
+        value, source = None, "misses"
+        if self.shared is not None:
+            value = self.shared.get(repr(key))
+            source = "shared_hits" if value is not None else source
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            source = "disk_hits" if value is not None else source
+        with self._lock:
+            self._stats[source] += 1
+        if value is not None:
+            self._admit(key, value, None)
+        return value
+
+    def put(self, key: Hashable, value: Any, final: bool, ttl: Optional[float] = None):
+        """
+        写入缓存
+        :param final: 结果已最终确定时永久缓存（仅受LRU淘汰影响）
+        :param ttl: 非最终结果的存活秒数，为空时不缓存
+        """
+        if value is None or (not final and not ttl):
+            with self._lock:
+                self._stats["rejected"] += 1
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            with self._lock:
+                self._stats["rejected"] += 1
+            return
+        self._admit(key, value, None if final else time.monotonic() + ttl, size)
+        if final and self.shared is not None:
+            self.shared.set(repr(key), value)
+        if final and self.disk is not None:
+            self.disk.set(key, value)
+
+    def _admit(self, key: Hashable, value: Any, expires_at: Optional[float], size: Optional[int] = None):
+        if size is None:
+            size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            self._stats["admitted"] += 1
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def put_head(self, key: Hashable, value: Any):
+        """缓存链头查询结果（latest/best），使用短TTL"""
+        self.put(key, value, final=False, ttl=self.head_ttl)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """删除满足条件的缓存项，返回删除数量"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+BLOCK_CACHE = BlockCache(shared=SHARED_CACHE, disk=WARM_CACHE)
@@ -1,18 +1,136 @@
+import importlib
+import logging
 import os
+import threading
+from importlib.metadata import EntryPoint, entry_points
+from typing import Callable, Dict, List, Optional, Union
 from blockchain_mcp.base import BaseBlockchain
-from blockchain_mcp.ethereum import Ethereum
-from blockchain_mcp.vechain import Vechain
-from blockchain_mcp.solana import SolanaBlockchain
-ETHEREUM_NODE_URL = os.getenv("ETHEREUM_NODE_URL")
-VECHAIN_NODE_URL = os.getenv("VECHAIN_NODE_URL")
-SOLANA_NODE_URL = os.getenv("SOLANA_NODE_URL")
+from blockchain_mcp.head_tracker import HEAD_TRACKERS, HEAD_TRACKING
+from blockchain_mcp.http_pool import connection_stats
+from blockchain_mcp.router import configure_endpoints, router_stats
+
+logger = logging.getLogger(__name__)
+
+# 内置链后端：名称 -> "模块:类"，模块在首次使用该链时才导入（web3 等依赖不拖慢启动）
+BUILTIN_CHAINS = {
+    "ethereum": "blockchain_mcp.ethereum:Ethereum",
+    "vechain": "blockchain_mcp.vechain:Vechain",
+    "solana": "blockchain_mcp.solana:SolanaBlockchain",
+    "bitcoin": "blockchain_mcp.bitcoin:BitcoinBlockchain",
+}
+# 第三方链后端通过该入口点组注册：<名称> = "包.模块:工厂"，工厂以节点URL为参数返回 BaseBlockchain
+ENTRY_POINT_GROUP = "blockchain_mcp.chains"
+# 启用的链（逗号分隔），为空时启用全部已注册的链
+ENABLED_CHAINS = os.getenv("BLOCKCHAIN_MCP_CHAINS", "")
+# 节点URL在创建客户端时读取环境变量 <名称>_NODE_URL（如 ETHEREUM_NODE_URL）；
+# 每条链可配置多个URL（逗号分隔），由 router 模块按健康度路由与失败切换
+
+ChainFactory = Union[str, EntryPoint, Callable[[Optional[str]], BaseBlockchain]]
+
+_registry: Optional[Dict[str, ChainFactory]] = None
+_registry_lock = threading.Lock()
+# 进程级链客户端注册表：每条链只构建一次客户端
+_clients: Dict[str, BaseBlockchain] = {}
+_clients_lock = threading.Lock()
+
+
+def _chain_registry() -> Dict[str, ChainFactory]:
+    """内置链与入口点注册的链，首次访问时构建（只读取入口点元数据，不导入模块）"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry: Dict[str, ChainFactory] = dict(BUILTIN_CHAINS)
+                for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+                    registry[entry_point.name.strip().lower()] = entry_point
+                _registry = registry
+    return _registry
+
+
+def RegisterChain(name: str, factory: ChainFactory):
+    """
+    注册（或替换）链后端
+    :param factory: "模块:属性" 字符串、入口点或可调用对象，以节点URL为参数返回 BaseBlockchain
+    """
+    formatted_name = name.strip().lower()
+    _chain_registry()[formatted_name] = factory
+    _clients.pop(formatted_name, None)
+
+
+def ListChains() -> List[str]:
+    """已注册且启用的链名"""
+    enabled = {name.strip().lower() for name in ENABLED_CHAINS.split(",") if name.strip()}
+    return [name for name in _chain_registry() if not enabled or name in enabled]
+
+
+def _load_factory(factory: ChainFactory) -> Callable[[Optional[str]], BaseBlockchain]:
+    if isinstance(factory, EntryPoint):
+        return factory.load()
+    if isinstance(factory, str):
+        module_name, _, attribute = factory.partition(":")
+        return getattr(importlib.import_module(module_name), attribute)
+    return factory
+
+
+def _create_blockchain(formatted_name: str) -> BaseBlockchain:
+    factory = _chain_registry().get(formatted_name)
+    if factory is None:
+        raise ValueError(f"Unsupported blockchain: {formatted_name}")
+    if formatted_name not in ListChains():
+        raise ValueError(f"Blockchain {formatted_name} is not enabled (BLOCKCHAIN_MCP_CHAINS={ENABLED_CHAINS})")
+    url = configure_endpoints(formatted_name, os.getenv(f"{formatted_name.upper()}_NODE_URL"))
+    return _load_factory(factory)(url)
+
+
 def GetBlockChain(name:str) -> BaseBlockchain:
     formatted_name = name.strip().lower()
-    if formatted_name == 'ethereum':
-        return Ethereum(url=ETHEREUM_NODE_URL)
-    if formatted_name == 'vechain':
-        return Vechain(url=VECHAIN_NODE_URL)
-    if formatted_name == 'solana':
-        return SolanaBlockchain(url=SOLANA_NODE_URL)
-    else:
-        raise ValueError(f"Unsupported blockchain: {name}")   
\ No newline at end of file
+    client = _clients.get(formatted_name)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(formatted_name)
+        if client is None:
+            client = _create_blockchain(formatted_name)
+            _clients[formatted_name] = client
+        return client
+
+
+def GetConnectionStats() -> Dict[str, Dict[str, int]]:
+    """返回各链共享会话的连接复用计数"""
+    return connection_stats()
+
+
+def GetEndpointStats() -> Dict[str, Dict]:
+    """返回多端点链各节点的 EWMA 延迟、错误率、p95 与失败切换/对冲计数"""
+    return router_stats()
+
+
+def StartHeadTracking(names: Optional[List[str]] = None) -> List[str]:
+    """
+    启动后台链头跟踪
+    :param names: 链名列表，为空时读取 BLOCKCHAIN_MCP_HEAD_TRACKING（逗号分隔，或 all 表示启用的链中支持跟踪的全部链）
+    :return: 成功启动跟踪的链名
+    """
+    track_all = False
+    if names is None:
+        if HEAD_TRACKING.strip().lower() == "all":
+            names, track_all = ListChains(), True
+        else:
+            names = [name for name in HEAD_TRACKING.split(",") if name.strip()]
+    chains = []
+    for name in names:
+        try:
+            bc = GetBlockChain(name)
+        except Exception as e:
+            logger.warning(f"Head tracking disabled for {name}: {str(e)}")
+            continue
+        if track_all and type(bc).follow_head is BaseBlockchain.follow_head:
+            continue
+        chains.append(bc)
+    HEAD_TRACKERS.start(chains)
+    return [bc.chain_name for bc in chains]
+
+
+def GetHeadStats() -> Dict[str, Dict]:
+    """返回各链链头跟踪状态：高度、链头年龄、更新与重组计数"""
+    return HEAD_TRACKERS.stats()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+ERC-20 / VIP-180 只读调用的 ABI 编解码
+
+Ethereum（eth_call）与 Vechain（POST /accounts/* 的 clause）使用相同的调用数据，这里只实现
+balanceOf/decimals/symbol 三个方法所需的最小编解码，不依赖合约 ABI 文件。
+"""
+from typing import Optional
+
+BALANCE_OF = "0x70a08231"
+DECIMALS = "0x313ce567"
+SYMBOL = "0x95d89b41"
+
+
+def balance_of_data(owner: str) -> str:
+    """balanceOf(address) 的调用数据"""
+    return BALANCE_OF + owner.lower().removeprefix("0x").rjust(64, "0")
+
+
+def decode_uint(data: str) -> int:
+    """解码单个 uint256 返回值；空返回（调用了非合约地址）视为错误"""
+    raw = (data or "").removeprefix("0x")
+    if len(raw) < 64:
+        raise ValueError("Empty or short return data, not an ERC-20 contract")
+    return int(raw[:64], 16)
+
+
+def decode_string(data: str) -> Optional[str]:
+    """
+    解码 string 返回值；部分早期代币（如 MKR）返回 bytes32，按去掉末尾零字节的 UTF-8 处理
+    :return: 无法解码时为 None
+    """
+    raw = bytes.fromhex((data or "").removeprefix("0x"))
+    try:
+        if len(raw) >= 64 and int.from_bytes(raw[:32], "big") == 32:
+            length = int.from_bytes(raw[32:64], "big")
+            if 64 + length <= len(raw):
+                return raw[64:64 + length].decode("utf-8")
+        if len(raw) == 32:
+            return raw.rstrip(b"\x00").decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+    return None
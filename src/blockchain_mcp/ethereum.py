@@ -1,52 +1,111 @@
 from argparse import ArgumentError
-from web3 import Web3
+from web3 import AsyncWeb3, Web3
+from web3.types import RPCEndpoint, RPCResponse
+import aiohttp
+import logging
 import os
-from web3.exceptions import Web3Exception, TransactionNotFound, BlockNotFound
-from typing import Union
-from blockchain_mcp.base import BaseBlockchain, BlockchainResponse
+from web3.exceptions import Web3Exception, Web3RPCError, TransactionNotFound, BlockNotFound
+from hexbytes import HexBytes
+from typing import Dict, List, Optional, Tuple, Union
+from blockchain_mcp.address_index import AddressIndex
+from blockchain_mcp.base import TRANSACTIONS_DETAIL, BaseBlockchain, BlockchainResponse
+from blockchain_mcp.block_cache import BLOCK_CACHE
+from blockchain_mcp.fee_history import REWARD_PERCENTILES, FeeWindow, rewards_of
+from blockchain_mcp.fees import ReceiptColumns, block_fee_summary, priority_fees_per_gas, receipt_columns
+from blockchain_mcp.head_tracker import HEAD_POLL_INTERVAL, HeadTracker
+from blockchain_mcp.http_pool import get_async_session, get_session
+from blockchain_mcp.models import (
+    BalanceResult, BlockFeesResult, BlockResult, FeeEstimateResult, TransactionFee, TransactionResult, to_hex, to_units
+)
+from blockchain_mcp.jsonrpc import RpcCall, RpcResult, batch_call, batch_call_async
+import asyncio
 import re
 
+logger = logging.getLogger(__name__)
+
+# 低于链头该深度的区块视为已最终确定
+FINALITY_DEPTH = int(os.getenv("ETHEREUM_FINALITY_DEPTH", "64"))
+BLOCK_TAGS = ("latest", "safe", "finalized")
+# 本地地址活动索引目录；设置后在后台摄入 finalized 区块，支持按地址查询交易
+ADDRESS_INDEX_PATH = os.getenv("ETHEREUM_ADDRESS_INDEX_PATH")
+# AsyncWeb3 请求的超时秒数（与 web3 默认值相同）
+ASYNC_RPC_TIMEOUT = 30
+
+
+class RoutedHTTPProvider(AsyncWeb3.AsyncHTTPProvider):
+    """经当前事件循环的共享会话（http_pool.RoutedSession：限流、重试、多端点路由与对冲）发送请求的 AsyncWeb3 provider"""
+
+    def __init__(self, endpoint_uri: str, session_name: str):
+        super().__init__(endpoint_uri)
+        self.session_name = session_name
+
+    async def make_request(self, method: RPCEndpoint, params) -> RPCResponse:
+        return self.decode_rpc_response(await self._post(self.encode_rpc_request(method, params)))
+
+    async def make_batch_request(self, batch_requests: List[Tuple[RPCEndpoint, object]]):
+        response = self.decode_rpc_response(await self._post(self.encode_batch_rpc_request(batch_requests)))
+        # 节点出错时只返回一个错误对象
+        return sorted(response, key=lambda item: item.get("id", 0)) if isinstance(response, list) else response
+
+    async def _post(self, request_data: bytes) -> bytes:
+        kwargs = dict(self.get_request_kwargs())
+        kwargs.setdefault("timeout", aiohttp.ClientTimeout(total=ASYNC_RPC_TIMEOUT))
+        async with get_async_session(self.session_name).post(self.endpoint_uri, data=request_data, **kwargs) as response:
+            response.raise_for_status()
+            return await response.read()
+
+
 class Ethereum(BaseBlockchain):
     def __init__(self, url):
         super().__init__(rpc_url=url, chain_id=1)
         self.network_id = 1
-        self.w3 = Web3(Web3.HTTPProvider(url))
+        self.session = get_session("ethereum")
+        self.w3 = Web3(Web3.HTTPProvider(url, session=self.session))
         self.chain_name = "ethereum"
+        self.head_tag = "latest"
+        self.token_standard = "ERC-20"
+        self.aw3 = AsyncWeb3(RoutedHTTPProvider(url, "ethereum"))
+        self._head_number = None
+        self._finalized_number = None
+        # 节点是否支持 finalized 标签，不支持时（合并前的链、部分节点）按 latest 减确认深度判断最终确定
+        self._finalized_supported = None
+        # 节点是否支持 eth_getBlockReceipts，未知时为 None；不支持时直接批量获取单笔收据
+        self._block_receipts_supported = None
+        self.fee_window = FeeWindow()
+        self.address_index = AddressIndex(ADDRESS_INDEX_PATH) if ADDRESS_INDEX_PATH else None
+        if self.address_index is not None:
+            self.address_index.follow(self.session, url)
 
-    def get_block_info(self, block_identifier: Union[int, str])->BlockchainResponse:
+    async def _async_w3(self) -> AsyncWeb3:
+        """返回经当前事件循环共享会话发送请求的 AsyncWeb3 实例"""
+        return self.aw3
+
+    def get_block_info(self, block_identifier: Union[int, str], detail: str = "summary")->BlockchainResponse:
         """Get latest Ethereum block information
 
+        Args:
+            detail: header/summary/full, all served by get_block(full_transactions=False)
+
         Returns:
             dict: A dictionary of block information
         """
         try:
             self._validate_block_identifier(block_identifier)
-            block_info = self.w3.eth.get_block(block_identifier).__dict__
-            data =  f"""
-                baseFeePerGas: {block_info["baseFeePerGas"]},
-                excessBlobGas: {block_info["excessBlobGas"]},
-                gasLimit: {block_info["gasLimit"]},
-                gasUsed: {block_info["gasUsed"]},
-                hash: {block_info["hash"].hex()},
-                miner: {block_info["miner"]},
-                nonce: {block_info["nonce"].hex()},
-                number: {block_info["number"]},
-                mixHash: {block_info["mixHash"].hex()},
-                size: {block_info["size"]},
-                timestamp: {block_info["timestamp"]},
-                parentBeaconBlockRoot:{block_info["parentBeaconBlockRoot"].hex()},
-                parentHash:{block_info["parentHash"].hex()},
-                stateRoot:{block_info["stateRoot"].hex()},
-                receiptsRoot:{block_info["receiptsRoot"].hex()},
-                transactions:{len(block_info["transactions"])}
-            """
+            self._validate_detail(detail)
+            block_info = self._tracked_head(block_identifier) or BLOCK_CACHE.get(self._cache_key("block", block_identifier))
+            if block_info is None:
+                block_info = self.w3.eth.get_block(block_identifier, full_transactions=False).__dict__
+                if block_identifier not in BLOCK_TAGS:
+                    self._refresh_final_height(block_info["number"])
+                self._cache_block(block_identifier, block_info)
+            data = self._format_block(block_info, detail)
             return BlockchainResponse(success=True, data=data, error=None)
         except BlockNotFound as e:
-            print(f"Get block info {str(e)}")
+            logger.error(f"Get block info {str(e)}")
             return BlockchainResponse(success=False, data="Block not found", error=str(e))    
         except Web3Exception as e:
-            print(f"Get block info {str(e)}")
-            return BlockchainResponse(success=False, data=None, error=e)
+            logger.error(f"Get block info {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
         
     def get_balance(self, address: str) -> BlockchainResponse:
         """Get balance of address
@@ -61,56 +120,478 @@ class Ethereum(BaseBlockchain):
         try:
             self._validate_address(address=address)
             wei_balance = self.w3.eth.get_balance(address)
-            balance = round(wei_balance / (10**18), 5)
-            data = f"""
-                Balance:{balance} Ether
-            """
+            data = self._format_balance(wei_balance, address)
             return BlockchainResponse(success=True, data=data, error=None)
         except (ValueError, TypeError) as e:
-            print(f"Error: {str(e)}")
+            logger.error(f"Error: {str(e)}")
             return BlockchainResponse(success=False, data=None, error=str(e))
         except Web3Exception as e:
-            print(f"Error: {str(e)}")
+            logger.error(f"Error: {str(e)}")
             return BlockchainResponse(success=False, data=None, error=str(e))
         
     def get_transaction(self, tx_hash: str) -> BlockchainResponse:
         try:
             self._validate_tx_hash(tx_hash=tx_hash)
-            tx_info = self.w3.eth.get_transaction(transaction_hash=tx_hash).__dict__
-            print(f"Transaction: {tx_info}")
-            data = f"""
-                from: {tx_info["from"]},
-                to: {tx_info["to"]},
-                value: {tx_info["value"]},
-                gas: {tx_info["gas"]},
-                gasPrice: {tx_info["gasPrice"]},
-                nonce: {tx_info["nonce"]},
-                blockHash: {tx_info["blockHash"].hex()},
-                blockNumber: {tx_info["blockNumber"]},
-                transactionIndex: {tx_info["transactionIndex"]},
-                input: {tx_info["input"]},
-                v: {tx_info["v"]},
-                r: {tx_info["r"].hex()},
-                s: {tx_info["s"].hex()},
-                chainId: {tx_info["chainId"]}
-                """
+            tx_info = BLOCK_CACHE.get(self._cache_key("tx", tx_hash))
+            if tx_info is None:
+                tx_info = self.w3.eth.get_transaction(transaction_hash=tx_hash).__dict__
+                logger.debug(f"Transaction: {tx_info}")
+                self._refresh_final_height(tx_info.get("blockNumber"))
+                self._cache_transaction(tx_hash, tx_info)
+            data = self._format_transaction(tx_info)
             return BlockchainResponse(success=True, data=data, error=None)
         except ValueError as e:
-            print(f"Value Error Get transaction {str(e)}")
+            logger.error(f"Value Error Get transaction {str(e)}")
             return BlockchainResponse(success=False, data=None, error=str(e))
         except TransactionNotFound as e:
-            print(f"TransactionNotFound Get transaction {str(e)}")
+            logger.error(f"TransactionNotFound Get transaction {str(e)}")
             return BlockchainResponse(success=False, data="Block not found", error=str(e))
         except Web3Exception as e:
-            print(f"Web3Exception Get transaction {str(e)}")
-            return BlockchainResponse(success=False, data=None, error=e)
+            logger.error(f"Web3Exception Get transaction {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
         
+    def get_address_transactions(self, address: str, limit: int = 20, cursor: Optional[str] = None) -> BlockchainResponse:
+        """
+        从本地地址索引按时间倒序查询地址的交易（仅包含已索引的 finalized 区块中的外部交易）
+        :param cursor: 上一页返回的 next_cursor
+        """
+        try:
+            if self.address_index is None or self.address_index.height is None:
+                raise ValueError("Address index is not enabled, set ETHEREUM_ADDRESS_INDEX_PATH")
+            self._validate_address(address=address)
+            if not 1 <= limit <= 1000:
+                raise ValueError("limit must be between 1 and 1000")
+            items, next_cursor = self.address_index.lookup(address, limit, cursor or None)
+            for item in items:
+                item["value"] = str(Web3.from_wei(item["value"], "ether"))
+            data = {
+                "address": address,
+                "indexed_height": self.address_index.height,
+                "transactions": items,
+                "next_cursor": next_cursor
+            }
+            return BlockchainResponse(success=True, data=data, error=None)
+        except ValueError as e:
+            logger.error(f"Get address transactions {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+    async def get_block_info_async(self, block_identifier: Union[int, str], detail: str = "summary") -> BlockchainResponse:
+        """get_block_info 的异步版本（AsyncWeb3）"""
+        try:
+            self._validate_detail(detail)
+            block_info = await self._fetch_block_async(block_identifier)
+            data = self._format_block(block_info, detail)
+            return BlockchainResponse(success=True, data=data, error=None)
+        except BlockNotFound as e:
+            logger.error(f"Get block info {str(e)}")
+            return BlockchainResponse(success=False, data="Block not found", error=str(e))
+        except Web3Exception as e:
+            logger.error(f"Get block info {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+    async def get_balance_async(self, address: str) -> BlockchainResponse:
+        """get_balance 的异步版本（AsyncWeb3）"""
+        try:
+            self._validate_address(address=address)
+            aw3 = await self._async_w3()
+            wei_balance = await aw3.eth.get_balance(address)
+            data = self._format_balance(wei_balance, address)
+            return BlockchainResponse(success=True, data=data, error=None)
+        except (ValueError, TypeError) as e:
+            logger.error(f"Error: {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+        except Web3Exception as e:
+            logger.error(f"Error: {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+    async def get_transaction_async(self, tx_hash: str) -> BlockchainResponse:
+        """get_transaction 的异步版本（AsyncWeb3）"""
+        try:
+            self._validate_tx_hash(tx_hash=tx_hash)
+            tx_info = BLOCK_CACHE.get(self._cache_key("tx", tx_hash))
+            if tx_info is None:
+                aw3 = await self._async_w3()
+                tx_info = (await aw3.eth.get_transaction(transaction_hash=tx_hash)).__dict__
+                await self._refresh_final_height_async(tx_info.get("blockNumber"))
+                self._cache_transaction(tx_hash, tx_info)
+            data = self._format_transaction(tx_info)
+            return BlockchainResponse(success=True, data=data, error=None)
+        except ValueError as e:
+            logger.error(f"Value Error Get transaction {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+        except TransactionNotFound as e:
+            logger.error(f"TransactionNotFound Get transaction {str(e)}")
+            return BlockchainResponse(success=False, data="Block not found", error=str(e))
+        except Web3Exception as e:
+            logger.error(f"Web3Exception Get transaction {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+    def get_balances(self, addresses: List[str]) -> BlockchainResponse:
+        """批量查询余额，所有 eth_getBalance 合并为JSON-RPC批量请求"""
+        calls, errors = self._bulk_rpc_calls(addresses, self._balance_call)
+        rpc_results = batch_call(self.session, self.rpc_url, calls)
+        return self._bulk_rpc_response("address", addresses, errors, rpc_results, self._format_raw_balance)
+
+    def get_transactions(self, tx_hashes: List[str]) -> BlockchainResponse:
+        """批量获取交易，所有 eth_getTransactionByHash 合并为JSON-RPC批量请求"""
+        calls, errors = self._bulk_rpc_calls(tx_hashes, self._transaction_call)
+        rpc_results = batch_call(self.session, self.rpc_url, calls)
+        return self._bulk_rpc_response("tx_hash", tx_hashes, errors, rpc_results, self._format_raw_transaction)
+
+    async def get_balances_async(self, addresses: List[str]) -> BlockchainResponse:
+        """get_balances 的异步版本"""
+        calls, errors = self._bulk_rpc_calls(addresses, self._balance_call)
+        rpc_results = await batch_call_async(get_async_session("ethereum"), self.rpc_url, calls)
+        return self._bulk_rpc_response("address", addresses, errors, rpc_results, self._format_raw_balance)
+
+    async def get_transactions_async(self, tx_hashes: List[str]) -> BlockchainResponse:
+        """get_transactions 的异步版本"""
+        calls, errors = self._bulk_rpc_calls(tx_hashes, self._transaction_call)
+        rpc_results = await batch_call_async(get_async_session("ethereum"), self.rpc_url, calls)
+        return self._bulk_rpc_response("tx_hash", tx_hashes, errors, rpc_results, self._format_raw_transaction)
+
+    async def get_block_fees_async(self, block_identifier: Union[int, str], transactions: bool = False) -> BlockchainResponse:
+        """区块手续费分析，全部收据通过一次 eth_getBlockReceipts 获取（节点不支持时退回批量 eth_getTransactionReceipt）"""
+        try:
+            block_info, columns, source = await self._fetch_receipt_columns_async(block_identifier)
+            data = self._format_block_fees(block_info, columns, source, transactions)
+            return BlockchainResponse(success=True, data=data, error=None)
+        except BlockNotFound as e:
+            logger.error(f"Get block fees {str(e)}")
+            return BlockchainResponse(success=False, data="Block not found", error=str(e))
+        except (Web3Exception, ValueError) as e:
+            logger.error(f"Get block fees {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+    async def get_block_fee_fields_async(self, block_identifier: Union[int, str]) -> Dict[str, float]:
+        block_info, columns, _ = await self._fetch_receipt_columns_async(block_identifier)
+        base_fee = block_info.get("baseFeePerGas") or 0
+        summary = block_fee_summary(columns, base_fee)
+        return {
+            "tx_count": summary["tx_count"],
+            "failed_tx_count": summary["failed_tx_count"],
+            "gas_used": summary["gas_used"],
+            "total_fees": float(to_units(summary["total_fees"], 18)),
+            "burned_fees": float(to_units(summary["burned_fees"], 18)),
+            "priority_fees": float(to_units(summary["priority_fees"], 18)),
+            "base_fee_gwei": float(to_units(base_fee, 9)),
+            "priority_fee_p50_gwei": float(to_units(summary["priority_fee_percentiles"]["p50"], 9)),
+        }
+
+    async def _fetch_receipt_columns_async(self, block_identifier: Union[int, str]) -> Tuple[dict, ReceiptColumns, str]:
+        """
+        经缓存获取区块与其收据列；收据按区块哈希缓存（同一哈希的收据不会改变，无需等待最终确定）
+        :return: (区块, 收据列, 收据来源方法)
+        """
+        block_info = await self._fetch_block_async(block_identifier)
+        block_hash = to_hex(block_info["hash"])
+        key = self._cache_key("receipts", block_hash)
+        cached = BLOCK_CACHE.get(key)
+        if cached is not None:
+            return (block_info,) + cached
+        receipts, source = await self._fetch_receipts_async(block_hash, block_info["transactions"])
+        if len(receipts) != len(block_info["transactions"]):
+            raise ValueError(f"Got {len(receipts)} receipts for {len(block_info['transactions'])} transactions")
+        columns = receipt_columns(receipts)
+        BLOCK_CACHE.put(key, (columns, source), final=True)
+        return block_info, columns, source
+
+    async def _fetch_receipts_async(self, block_hash: str, tx_hashes: list) -> Tuple[list, str]:
+        session = get_async_session("ethereum")
+        if self._block_receipts_supported is not False:
+            (result,) = await batch_call_async(session, self.rpc_url, [("eth_getBlockReceipts", [block_hash])])
+            if result.error is None and result.result is not None:
+                self._block_receipts_supported = True
+                return result.result, "eth_getBlockReceipts"
+            if result.error and ("-32601" in result.error or "not supported" in result.error.lower()):
+                logger.info("Node does not support eth_getBlockReceipts, falling back to batched receipts")
+                self._block_receipts_supported = False
+            else:
+                logger.warning(f"eth_getBlockReceipts failed for {block_hash}: {result.error or 'no result'}")
+        results = await batch_call_async(
+            session, self.rpc_url, [("eth_getTransactionReceipt", [to_hex(tx_hash)]) for tx_hash in tx_hashes]
+        )
+        failed = next((result.error or "Receipt not found" for result in results if result.error or result.result is None), None)
+        if failed is not None:
+            raise ValueError(f"Get receipts failed: {failed}")
+        return [result.result for result in results], "eth_getTransactionReceipt"
+
+    async def _extend_fee_window_async(self, window: FeeWindow, head_number: int, count: int):
+        """一次 eth_feeHistory 获取缺少的区块（基础费用、gas 使用率与 p10/p50/p90 优先费）"""
+        call = ("eth_feeHistory", [hex(count), hex(head_number), list(REWARD_PERCENTILES)])
+        (result,) = await batch_call_async(get_async_session("ethereum"), self.rpc_url, [call])
+        if result.error or not result.result:
+            raise ValueError(f"eth_feeHistory failed: {result.error or 'no result'}")
+        history = result.result
+        oldest = int(history["oldestBlock"], 16)
+        base_fees = history["baseFeePerGas"]
+        rewards = history.get("reward") or []
+        for index, ratio in enumerate(history["gasUsedRatio"]):
+            window.append(oldest + index, int(base_fees[index], 16), ratio, rewards_of(rewards[index] if index < len(rewards) else None))
+        # baseFeePerGas 比区块数多一项：最新区块之后下一个区块的基础费用
+        window.next_base_fee = int(base_fees[-1], 16)
+
+    def _format_fee_estimate(self, summary: Dict) -> FeeEstimateResult:
+        return FeeEstimateResult(chain=self.chain_name, symbol="ETH", extra={"source": "eth_feeHistory"}, **summary)
+
+    async def _call_contracts_async(self, calls: List[Tuple[str, str]]) -> List[RpcResult]:
+        """所有 eth_call 合并为JSON-RPC批量请求"""
+        rpc_calls = [("eth_call", [{"to": to, "data": data}, "latest"]) for to, data in calls]
+        return await batch_call_async(get_async_session("ethereum"), self.rpc_url, rpc_calls)
+
+    async def _fetch_block_async(self, block_identifier: Union[int, str], detail: str = "summary") -> dict:
+        """经缓存获取原始区块：TRANSACTIONS_DETAIL 时含完整交易对象（full_transactions=True），否则交易仅含哈希"""
+        self._validate_block_identifier(block_identifier)
+        full = detail == TRANSACTIONS_DETAIL
+        kind = "block:txs" if full else "block"
+        block_info = (None if full else self._tracked_head(block_identifier)) or BLOCK_CACHE.get(self._cache_key(kind, block_identifier))
+        if block_info is None:
+            aw3 = await self._async_w3()
+            block_info = (await aw3.eth.get_block(block_identifier, full_transactions=full)).__dict__
+            if block_identifier not in BLOCK_TAGS:
+                await self._refresh_final_height_async(block_info["number"])
+            self._cache_block(block_identifier, block_info, kind)
+        return block_info
+
+    def _block_transactions(self, block_info: dict) -> list:
+        return block_info["transactions"]
+
+    def _format_block_transaction(self, block_info: dict, tx: dict) -> TransactionResult:
+        return self._format_transaction(tx)
+
+    def _block_fields(self, block_info: dict) -> Dict[str, float]:
+        return {
+            "number": block_info["number"],
+            "timestamp": block_info["timestamp"],
+            "tx_count": len(block_info["transactions"]),
+            "size": block_info["size"],
+            "gas_used": block_info["gasUsed"],
+            "gas_limit": block_info["gasLimit"],
+            "gas_utilization": block_info["gasUsed"] / block_info["gasLimit"] if block_info["gasLimit"] else 0.0,
+            "base_fee_per_gas": block_info.get("baseFeePerGas", 0),
+        }
+
+    async def follow_head(self, tracker: HeadTracker):
+        """轮询 eth_blockNumber，高度变化时获取新链头区块"""
+        # 跟踪线程使用独立的 AsyncWeb3，避免与请求事件循环争用同一 provider 会话
+        aw3 = AsyncWeb3(RoutedHTTPProvider(self.rpc_url, "ethereum"))
+        while True:
+            number = await aw3.eth.block_number
+            if number == tracker.number:
+                tracker.touch()
+            else:
+                block_info = (await aw3.eth.get_block(number, full_transactions=False)).__dict__
+                if tracker.update(number, block_info["hash"], block_info["parentHash"], block_info):
+                    logger.warning(f"Ethereum reorg detected at block {number}")
+                    self._head_number = number
+                else:
+                    self._head_number = max(number, self._head_number or 0)
+            await asyncio.sleep(HEAD_POLL_INTERVAL)
+
+    def _final_height(self) -> int:
+        """已知的最终确定高度（finalized 标签或链头深度），未知时为 -1"""
+        heights = [-1]
+        if self._finalized_number is not None:
+            heights.append(self._finalized_number)
+        if self._head_number is not None:
+            heights.append(self._head_number - FINALITY_DEPTH)
+        return max(heights)
+
+    def _final_height_tag(self, number: Optional[int]) -> Optional[str]:
+        """
+        number 高于已知的最终确定高度时，返回需要向节点查询的标签（finalized，节点不支持时为 latest）；
+        已知足够高度、或该标签的短TTL缓存仍有效（高度已据此更新）时返回 None
+        """
+        if number is None or number <= self._final_height():
+            return None
+        tag = "latest" if self._finalized_supported is False else "finalized"
+        cached = BLOCK_CACHE.get(self._cache_key("block", tag))
+        if cached is not None:
+            self._observe_tag(tag, cached["number"])
+            return None
+        return tag
+
+    def _final_height_failed(self, tag: str, e: Exception):
+        if tag == "finalized" and isinstance(e, (BlockNotFound, Web3RPCError)):
+            logger.info(f"Node does not support the finalized tag, using latest minus {FINALITY_DEPTH} blocks: {str(e)}")
+            self._finalized_supported = False
+        else:
+            logger.warning(f"Get {tag} block for finality failed: {str(e)}")
+
+    def _refresh_final_height(self, number: Optional[int]):
+        """
+        判断 number 是否已最终确定前，按需查询一次 finalized 区块并短TTL缓存，
+        默认未开启链头跟踪时，历史区块/交易也能在第一次查询后永久缓存；查询失败时按未最终确定处理
+        """
+        tag = self._final_height_tag(number)
+        if tag is None:
+            return
+        try:
+            block_info = self.w3.eth.get_block(tag, full_transactions=False).__dict__
+        except Exception as e:
+            self._final_height_failed(tag, e)
+            return
+        self._cache_block(tag, block_info)
+
+    async def _refresh_final_height_async(self, number: Optional[int]):
+        """_refresh_final_height 的异步版本"""
+        tag = self._final_height_tag(number)
+        if tag is None:
+            return
+        try:
+            aw3 = await self._async_w3()
+            block_info = (await aw3.eth.get_block(tag, full_transactions=False)).__dict__
+        except Exception as e:
+            self._final_height_failed(tag, e)
+            return
+        self._cache_block(tag, block_info)
+
+    def _observe_tag(self, tag: str, number: int):
+        """由 latest/finalized 区块更新已知的链头与最终确定高度"""
+        if tag == "latest":
+            self._head_number = max(number, self._head_number or 0)
+        elif tag == "finalized":
+            self._finalized_number = max(number, self._finalized_number or 0)
+
+    def _cache_block(self, block_identifier: Union[int, str], block_info: dict, kind: str = "block"):
+        """
+        链头标签只做短TTL缓存；区块哈希对应的内容不会变化，按哈希永久缓存；
+        高度只在已最终确定时才永久对应该区块（按哈希取到的近期或孤块区块不占用其高度）
+        """
+        number = block_info.get("number")
+        if block_identifier in BLOCK_TAGS:
+            self._observe_tag(block_identifier, number)
+            BLOCK_CACHE.put_head(self._cache_key(kind, block_identifier), block_info)
+        final = number <= self._final_height()
+        if final:
+            BLOCK_CACHE.put(self._cache_key(kind, number), block_info, final=True)
+        if final or (isinstance(block_identifier, str) and block_identifier not in BLOCK_TAGS):
+            BLOCK_CACHE.put(self._cache_key(kind, "0x" + block_info["hash"].hex().removeprefix("0x")), block_info, final=True)
+
+    def _cache_transaction(self, tx_hash: str, tx_info: dict):
+        block_number = tx_info.get("blockNumber")
+        final = block_number is not None and block_number <= self._final_height()
+        BLOCK_CACHE.put(self._cache_key("tx", tx_hash), tx_info, final=final)
+
+    def _balance_call(self, address: str) -> RpcCall:
+        self._validate_address(address=address)
+        return "eth_getBalance", [address, "latest"]
+
+    def _transaction_call(self, tx_hash: str) -> RpcCall:
+        self._validate_tx_hash(tx_hash=tx_hash)
+        return "eth_getTransactionByHash", [tx_hash]
+
+    def _format_raw_balance(self, address: str, result: str) -> BalanceResult:
+        return self._format_balance(int(result, 16), address)
+
+    def _format_raw_transaction(self, tx_hash: str, result: dict) -> TransactionResult:
+        """将原始JSON-RPC交易（十六进制字符串）转换为与web3一致的类型后格式化"""
+        tx_info = dict(result)
+        for field in ("value", "gas", "gasPrice", "nonce", "blockNumber", "transactionIndex", "v", "chainId"):
+            if tx_info.get(field) is not None:
+                tx_info[field] = int(tx_info[field], 16)
+        for field in ("blockHash", "input", "r", "s"):
+            if tx_info.get(field) is not None:
+                tx_info[field] = HexBytes(tx_info[field])
+        for field in ("from", "to"):
+            if tx_info.get(field):
+                tx_info[field] = Web3.to_checksum_address(tx_info[field])
+        return self._format_transaction(tx_info)
+
+    def _format_block(self, block_info: dict, detail: str = "summary") -> BlockResult:
+        result = BlockResult(
+            chain=self.chain_name,
+            number=block_info["number"],
+            hash=to_hex(block_info["hash"]),
+            parent_hash=to_hex(block_info["parentHash"]),
+            timestamp=block_info["timestamp"],
+            size=block_info["size"],
+            gas_used=block_info["gasUsed"],
+            gas_limit=block_info["gasLimit"],
+            base_fee_per_gas=block_info.get("baseFeePerGas"),
+            extra={
+                "miner": block_info["miner"],
+                "nonce": to_hex(block_info["nonce"]),
+                "mix_hash": to_hex(block_info["mixHash"]),
+                "state_root": to_hex(block_info["stateRoot"]),
+                "receipts_root": to_hex(block_info["receiptsRoot"]),
+                "excess_blob_gas": block_info.get("excessBlobGas"),
+                "parent_beacon_block_root": to_hex(block_info.get("parentBeaconBlockRoot")),
+            }
+        )
+        if detail != "header":
+            result.tx_count = len(block_info["transactions"])
+        if detail == "full":
+            result.transactions = [to_hex(tx_hash) for tx_hash in block_info["transactions"]]
+        return result
+
+    def _format_block_fees(self, block_info: dict, columns: ReceiptColumns, source: str, transactions: bool) -> BlockFeesResult:
+        base_fee = block_info.get("baseFeePerGas")
+        summary = block_fee_summary(columns, base_fee)
+        result = BlockFeesResult(
+            chain=self.chain_name,
+            number=block_info["number"],
+            hash=to_hex(block_info["hash"]),
+            tx_count=summary["tx_count"],
+            failed_tx_count=summary["failed_tx_count"],
+            gas_used=summary["gas_used"],
+            base_fee_per_gas=base_fee,
+            total_fees=to_units(summary["total_fees"], 18),
+            burned_fees=to_units(summary["burned_fees"], 18),
+            priority_fees=to_units(summary["priority_fees"], 18),
+            priority_fee_percentiles=summary["priority_fee_percentiles"],
+            symbol="ETH",
+            receipts_source=source,
+        )
+        if transactions:
+            result.transactions = [
+                TransactionFee(
+                    hash=tx_hash,
+                    gas_used=gas_used,
+                    effective_gas_price=gas_price,
+                    priority_fee_per_gas=priority,
+                    fee=to_units(gas_used * gas_price, 18),
+                    status="failed" if failed else "success",
+                )
+                for tx_hash, gas_used, gas_price, priority, failed in zip(
+                    columns.hashes, columns.gas_used, columns.gas_price,
+                    priority_fees_per_gas(columns, base_fee or 0), columns.failed
+                )
+            ]
+        return result
+
+    def _format_balance(self, wei_balance: int, address: Optional[str] = None) -> BalanceResult:
+        return BalanceResult(chain=self.chain_name, address=address, balance=to_units(wei_balance, 18), symbol="ETH")
+
+    def _format_transaction(self, tx_info: dict) -> TransactionResult:
+        return TransactionResult(
+            chain=self.chain_name,
+            hash=to_hex(tx_info["hash"]),
+            block_number=tx_info["blockNumber"],
+            block_hash=to_hex(tx_info["blockHash"]),
+            from_address=tx_info["from"],
+            to_address=tx_info["to"],
+            value=to_units(tx_info["value"], 18),
+            symbol="ETH",
+            extra={
+                "gas": tx_info["gas"],
+                "gas_price": tx_info.get("gasPrice"),
+                "nonce": tx_info["nonce"],
+                "transaction_index": tx_info["transactionIndex"],
+                "input": to_hex(tx_info["input"]),
+                "v": tx_info.get("v"),
+                "r": to_hex(tx_info.get("r")),
+                "s": to_hex(tx_info.get("s")),
+                "chain_id": tx_info.get("chainId"),
+            }
+        )
+
     def _validate_block_identifier(self, block_identifier: Union[int, str]):
         if isinstance(block_identifier, int):
             if block_identifier < 0:
                 raise ValueError("Block number must be a positive integer")
         elif isinstance(block_identifier, str):
-            if block_identifier == "latest":
+            if block_identifier in BLOCK_TAGS:
                 return
             elif not block_identifier.startswith("0x") or len(block_identifier) != 66:
                 raise ValueError("Block hash must start with '0x' and be 66 characters long")
@@ -120,10 +601,10 @@ class Ethereum(BaseBlockchain):
     def _validate_tx_hash(self, tx_hash: str):
         """Validate transaction hash format"""
         if not isinstance(tx_hash, str):
-            print("Tx hash must be a string")
+            logger.warning("Tx hash must be a string")
             raise ValueError("Tx hash must be string")
         if not re.match(r'^(0x)?[0-9a-fA-F]{64}$', tx_hash):
-            print("Invalid Ethereum tx_hash format")
+            logger.warning("Invalid Ethereum tx_hash format")
             raise ValueError("Invalid Ethereum tx_hash format")
     
     def _validate_address(self, address:str):
@@ -135,10 +616,10 @@ class Ethereum(BaseBlockchain):
         
     
 if __name__ == "__main__":
+    # 本地调试可先运行 python benchmarks/mock_nodes.py 并按其输出设置环境变量，避免访问主网
     ETHEREUM_NODE_URL = os.getenv("ETHEREUM_NODE_URL")
     if not ETHEREUM_NODE_URL:
         raise ValueError("ETHEREUM_NODE_URL environment variable is not set")
     eth = Ethereum(ETHEREUM_NODE_URL)
-    #print(eth.get_block_info("latest"))
-    #print(eth.get_balance("0xd3CdA913deB6f67967B99D67aCDFa1712C293601"))
-    print(eth.get_transaction("0x1c31133a632433cd4896c6303a562926eb84378356dee33484ebf6b72391daed"))
\ No newline at end of file
+    print(eth.get_block_info("latest"))
+    print(eth.get_balance("0xd3CdA913deB6f67967B99D67aCDFa1712C293601"))
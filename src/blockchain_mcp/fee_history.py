@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+手续费滚动窗口
+
+保存最近 N 个区块的基础费用、gas 使用率和三档（p10/p50/p90）单位优先费，数据放在定长环形数组中，
+并维护各列的累计和：链头前进时只追加新区块（覆盖最旧的槽位并更新累计和），
+费用建议（均值、趋势）由累计和与首尾两个槽位直接得出，与窗口大小无关。
+
+窗口只接受连续的区块；出现缺口（长时间未查询、链头回退）时清空后重新填充。
+"""
+import os
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+FEE_HISTORY_BLOCKS = int(os.getenv("BLOCKCHAIN_MCP_FEE_HISTORY_BLOCKS", "20"))
+# 两次检查链头之间的最短间隔（秒），间隔内的查询直接由窗口回答
+FEE_REFRESH_INTERVAL = float(os.getenv("BLOCKCHAIN_MCP_FEE_REFRESH_INTERVAL", "2"))
+# 慢/标准/快三档对应的区块内优先费分位数
+REWARD_PERCENTILES = (10, 50, 90)
+TIERS = ("slow", "standard", "fast")
+# 最新基础费用相对窗口均值的变化超过该比例时判定为上升/下降
+TREND_THRESHOLD = 0.02
+
+
+class FeeWindow:
+    def __init__(self, size: int = FEE_HISTORY_BLOCKS):
+        self.size = max(1, size)
+        self.base_fee = array("q", bytes(8 * self.size))
+        self.gas_used_ratio = array("d", bytes(8 * self.size))
+        self.rewards = [array("q", bytes(8 * self.size)) for _ in REWARD_PERCENTILES]
+        self.checked_at = 0.0
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.newest: Optional[int] = None
+        self.next_base_fee: Optional[int] = None
+        self._base_fee_sum = 0
+        self._ratio_sum = 0.0
+        self._reward_sums = [0] * len(REWARD_PERCENTILES)
+
+    @property
+    def oldest(self) -> Optional[int]:
+        return None if self.newest is None else self.newest - self.count + 1
+
+    def missing(self, head: int) -> int:
+        """到 head 为止需要获取的新区块数（不超过窗口大小）"""
+        if self.newest is None or head - self.newest >= self.size:
+            return self.size
+        return max(0, head - self.newest)
+
+    def append(self, height: int, base_fee: int, gas_used_ratio: float, rewards: Sequence[int]):
+        if self.newest is not None and height != self.newest + 1:
+            if height <= self.newest:
+                return
+            self.reset()
+        slot = height % self.size
+        if self.count == self.size:
+            self._base_fee_sum -= self.base_fee[slot]
+            self._ratio_sum -= self.gas_used_ratio[slot]
+            for index, column in enumerate(self.rewards):
+                self._reward_sums[index] -= column[slot]
+        else:
+            self.count += 1
+        self.base_fee[slot] = base_fee
+        self.gas_used_ratio[slot] = gas_used_ratio
+        self._base_fee_sum += base_fee
+        self._ratio_sum += gas_used_ratio
+        for index, (column, reward) in enumerate(zip(self.rewards, rewards)):
+            column[slot] = reward
+            self._reward_sums[index] += reward
+        self.newest = height
+
+    def summary(self) -> Dict:
+        """
+        窗口统计与费用建议
+        :return: 最新/下一区块基础费用、窗口均值与趋势、平均使用率、三档优先费与最高费用（wei）
+        """
+        if not self.count:
+            raise ValueError("Fee window is empty")
+        latest = self.base_fee[self.newest % self.size]
+        first = self.base_fee[self.oldest % self.size]
+        next_base_fee = self.next_base_fee if self.next_base_fee is not None else latest
+        mean = self._base_fee_sum / self.count
+        change = (next_base_fee - mean) / mean if mean else 0.0
+        trend = "rising" if change > TREND_THRESHOLD else "falling" if change < -TREND_THRESHOLD else "stable"
+        priority = {tier: round(total / self.count) for tier, total in zip(TIERS, self._reward_sums)}
+        return {
+            "newest_block": self.newest,
+            "blocks": self.count,
+            "base_fee": latest,
+            "next_base_fee": next_base_fee,
+            "mean_base_fee": round(mean),
+            "base_fee_change": (latest - first) / first if first else 0.0,
+            "base_fee_trend": trend,
+            "gas_used_ratio": self._ratio_sum / self.count,
+            "priority_fee": priority,
+            # 常用的 EIP-1559 上限：可承受基础费用连续上涨数个区块
+            "max_fee": {tier: 2 * next_base_fee + value for tier, value in priority.items()},
+        }
+
+
+def rewards_of(values: Optional[List[str]]) -> List[int]:
+    """把节点返回的十六进制 reward 列表转换为整数，缺失时补0"""
+    return [int(value, 16) for value in values] if values else [0] * len(REWARD_PERCENTILES)
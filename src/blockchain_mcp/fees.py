@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+区块手续费分析（EIP-1559）
+
+区块全部收据只在提取时逐条读取一次，转换为定长数组列（gasUsed、effectiveGasPrice、status）；
+手续费总额、燃烧的基础费用与优先费分位数都在整列上计算（map/sum/sorted/accumulate，循环在 C 层完成），
+不再逐个处理收据字典。列占用约每笔交易17字节加交易哈希，可直接放入区块缓存。
+
+优先费分位数与 eth_feeHistory 的 reward 一致按 gas 加权：交易按单位优先费排序后，
+取累计 gasUsed 首次达到区块总 gas 的 q% 的那笔交易。
+"""
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, repeat
+from operator import mul, sub
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+PRIORITY_FEE_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class ReceiptColumns(NamedTuple):
+    """一个区块全部收据的列式表示，顺序与区块内交易顺序一致"""
+    hashes: List[str]
+    gas_used: array
+    gas_price: array
+    failed: array
+
+
+def receipt_columns(receipts: Sequence[dict]) -> ReceiptColumns:
+    """从原始 JSON-RPC 收据（十六进制字符串字段）提取列"""
+    return ReceiptColumns(
+        hashes=[receipt["transactionHash"] for receipt in receipts],
+        gas_used=array("q", [int(receipt["gasUsed"], 16) for receipt in receipts]),
+        gas_price=array("q", [int(receipt["effectiveGasPrice"], 16) for receipt in receipts]),
+        failed=array("b", [receipt.get("status") == "0x0" for receipt in receipts]),
+    )
+
+
+def priority_fees_per_gas(columns: ReceiptColumns, base_fee: int) -> array:
+    return array("q", map(sub, columns.gas_price, repeat(base_fee, len(columns.gas_price))))
+
+
+def weighted_percentiles(values: Sequence[int], weights: Sequence[int], percentiles: Sequence[float]) -> List[int]:
+    """按权重的分位数（eth_feeHistory 的算法）；没有数据时返回0"""
+    if not values:
+        return [0] * len(percentiles)
+    order = sorted(range(len(values)), key=values.__getitem__)
+    cumulative = list(accumulate(map(weights.__getitem__, order)))
+    total = cumulative[-1]
+    last = len(order) - 1
+    return [values[order[min(bisect_left(cumulative, total * q / 100), last)]] for q in percentiles]
+
+
+def block_fee_summary(columns: ReceiptColumns, base_fee: Optional[int]) -> Dict:
+    """
+    区块级手续费汇总
+    :param base_fee: 区块 baseFeePerGas，伦敦升级前的区块为空（全部手续费归出块者）
+    :return: 手续费金额为 wei 整数，分位数为每单位 gas 的 wei
+    """
+    base_fee = base_fee or 0
+    gas_used = sum(columns.gas_used)
+    total_fees = sum(map(mul, columns.gas_used, columns.gas_price))
+    burned = base_fee * gas_used
+    priority = priority_fees_per_gas(columns, base_fee)
+    return {
+        "tx_count": len(columns.hashes),
+        "failed_tx_count": sum(columns.failed),
+        "gas_used": gas_used,
+        "total_fees": total_fees,
+        "burned_fees": burned,
+        "priority_fees": total_fees - burned,
+        "priority_fee_percentiles": dict(zip(
+            (f"p{q}" for q in PRIORITY_FEE_PERCENTILES),
+            weighted_percentiles(priority, columns.gas_used, PRIORITY_FEE_PERCENTILES)
+        )),
+    }
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+后台链头跟踪
+
+每条启用的链在独立的后台事件循环线程中跟随链头（以太坊轮询 ``eth_blockNumber``，
+Vechain 订阅 ``/subscriptions/block`` websocket，Solana 轮询 ``getSlot``），
+``latest``/``best`` 查询直接返回内存中的链头区块，无需访问节点。
+检测到重组时清除缓存中的链头标签，链头在下一次更新前回退为直接查询节点。
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+from blockchain_mcp.block_cache import BLOCK_CACHE
+
+logger = logging.getLogger(__name__)
+
+# 启用跟踪的链：逗号分隔的链名，或 all；为空时不启动
+HEAD_TRACKING = os.getenv("BLOCKCHAIN_MCP_HEAD_TRACKING", "")
+HEAD_POLL_INTERVAL = float(os.getenv("BLOCKCHAIN_MCP_HEAD_POLL_INTERVAL", "1"))
+# 超过该秒数未得到节点确认的链头不再使用
+HEAD_MAX_AGE = float(os.getenv("BLOCKCHAIN_MCP_HEAD_MAX_AGE", "30"))
+MAX_RETRY_DELAY = 30.0
+
+
+class HeadTracker:
+    """单条链的链头状态，由后台跟随协程更新，可从任意线程读取"""
+
+    def __init__(self, chain_name: str, head_tags: Iterable[str], max_age: float = HEAD_MAX_AGE):
+        self.chain_name = chain_name
+        self.head_tags = tuple(head_tags)
+        self.max_age = max_age
+        self.number: Optional[int] = None
+        self.block_hash: Optional[Hashable] = None
+        self._block: Optional[Any] = None
+        self._updated_at: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stats = {"updates": 0, "reorgs": 0, "errors": 0, "hits": 0, "misses": 0}
+
+    def head(self) -> Optional[Any]:
+        """返回最近确认过的链头区块，未知或已过期时返回None"""
+        with self._lock:
+            fresh = self._checked_at is not None and time.monotonic() - self._checked_at <= self.max_age
+            if self._block is None or not fresh:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            return self._block
+
+    def touch(self):
+        """节点确认链头未变化"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+
+    def update(self, number: int, block_hash: Hashable, parent_hash: Hashable, block: Any) -> bool:
+        """
+        记录新的链头，返回是否检测到重组：
+        新链头的父哈希与当前链头不符，或高度未增加但哈希变化
+        """
+        with self._lock:
+            reorg = self.number is not None and (
+                (number == self.number + 1 and parent_hash != self.block_hash)
+                or (number <= self.number and block_hash != self.block_hash)
+            )
+            now = time.monotonic()
+            self.number = number
+            self.block_hash = block_hash
+            self._block = block
+            self._updated_at = now
+            self._checked_at = now
+            self._stats["updates"] += 1
+        if reorg:
+            self._invalidate()
+        return reorg
+
+    def reorg(self):
+        """链头被节点标记为废弃：丢弃内存链头，等待下一次更新"""
+        with self._lock:
+            self.number = None
+            self.block_hash = None
+            self._block = None
+        self._invalidate()
+
+    def error(self, e: Exception):
+        with self._lock:
+            self._stats["errors"] += 1
+            self._last_error = str(e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            stats = dict(self._stats)
+            stats["number"] = self.number
+            stats["age_seconds"] = round(now - self._updated_at, 3) if self._updated_at else None
+            stats["checked_seconds_ago"] = round(now - self._checked_at, 3) if self._checked_at else None
+            stats["last_error"] = self._last_error
+        return stats
+
+    def _invalidate(self):
+        with self._lock:
+            self._stats["reorgs"] += 1
+        BLOCK_CACHE.invalidate(
+            lambda key: key[0] == self.chain_name and key[1].startswith("block") and key[2] in self.head_tags
+        )
+
+
+class HeadTrackerService:
+    """在后台线程的事件循环中运行各链的链头跟随协程"""
+
+    def __init__(self):
+        self._trackers: Dict[str, HeadTracker] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self, chains: Iterable):
+        """启动给定链实例的链头跟随，已在跟随的链会被忽略"""
+        chains = list(chains)
+        if not chains:
+            return
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="head-tracker", daemon=True)
+                self._thread.start()
+            for bc in chains:
+                if bc.chain_name in self._trackers:
+                    continue
+                tracker = HeadTracker(bc.chain_name, [bc.head_tag])
+                self._trackers[bc.chain_name] = tracker
+                asyncio.run_coroutine_threadsafe(self._follow(bc, tracker), self._loop)
+                logger.info(f"Head tracking started for {bc.chain_name}")
+
+    def head(self, chain_name: str) -> Optional[Any]:
+        tracker = self._trackers.get(chain_name)
+        return tracker.head() if tracker is not None else None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: tracker.stats() for name, tracker in self._trackers.items()}
+
+    def stop(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            loop = self._loop
+            for task in asyncio.all_tasks(loop):
+                loop.call_soon_threadsafe(task.cancel)
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+            self._thread = None
+            self._trackers.clear()
+
+    async def _follow(self, bc, tracker: HeadTracker):
+        """跟随协程异常退出（断线、节点错误）时按指数退避重启"""
+        delay = HEAD_POLL_INTERVAL
+        while True:
+            try:
+                await bc.follow_head(tracker)
+                delay = HEAD_POLL_INTERVAL
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Head tracking error on {bc.chain_name}: {str(e)}")
+                tracker.error(e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+
+
+HEAD_TRACKERS = HeadTrackerService()
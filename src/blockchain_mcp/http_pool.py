@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+"""
+进程级HTTP连接池
+
+每条链共用一个长连接 ``requests.Session``，通过 urllib3 连接池复用 TCP/TLS 连接，
+避免每次工具调用都重新握手。异步路径为每个事件循环维护对应的 ``RoutedSession``（包装普通的 ``aiohttp.ClientSession``）。
+两种会话都记录每个上游请求的延迟、错误与字节数（见 metrics 模块），按 ratelimit 模块限流并退避重试，
+并在链配置了多个节点时按 router 模块的健康度选择端点、失败切换（异步请求可对冲）。
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Coroutine, Dict, List, Optional, Set
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from blockchain_mcp.metrics import METRICS, rpc_name
+from blockchain_mcp.ratelimit import (
+    RATE_LIMITS, RETRY_MAX, RETRYABLE_STATUSES, RateLimitExceeded, TokenBucket, parse_retry_after, retry_delay
+)
+from blockchain_mcp.router import RETRY_STATUSES, Endpoint, EndpointRouter, get_router
+
+logger = logging.getLogger(__name__)
+
+POOL_CONNECTIONS = int(os.getenv("BLOCKCHAIN_MCP_POOL_CONNECTIONS", "10"))
+POOL_MAXSIZE = int(os.getenv("BLOCKCHAIN_MCP_POOL_MAXSIZE", "32"))
+
+_sessions: Dict[str, requests.Session] = {}
+# 事件循环 -> {名称: 会话}：以循环对象为键（持有引用，不会像 id() 那样被新循环复用），
+# 循环关闭后其会话在下次创建会话时关闭并移除
+_async_sessions: Dict[asyncio.AbstractEventLoop, Dict[str, "RoutedSession"]] = {}
+_closing: Set[asyncio.Task] = set()
+_async_counters: Dict[str, Dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """
+    记录每个请求的延迟（非流式请求包含读取响应体）、HTTP/连接错误与收发字节数；
+    发送前按提供方令牌桶限流，429/502/503/504 与连接错误按指数退避重试；
+    发往多端点链主URL的请求按健康度改写到选中的端点，连接错误、超时、限流与 429/5xx 时切换到下一个端点
+    """
+
+    def __init__(self, name: str, **kwargs):
+        super().__init__(**kwargs)
+        self.name = name
+
+    def send(self, request, stream=False, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                response = self._route(request, stream, **kwargs)
+            except requests.ConnectionError:
+                delay = retry_delay(attempt) if attempt < RETRY_MAX else None
+                if delay is None:
+                    raise
+            else:
+                if response.status_code not in RETRYABLE_STATUSES or attempt >= RETRY_MAX:
+                    return response
+                delay = retry_delay(attempt, parse_retry_after(response.headers.get("Retry-After")))
+                if delay is None:
+                    return response
+                response.close()
+            RATE_LIMITS.bucket(self.name, request.url).retries += 1
+            attempt += 1
+            time.sleep(delay)
+
+    def _route(self, request, stream=False, **kwargs):
+        router = get_router(self.name)
+        if router is None or not router.routes(request.url):
+            return self._dispatch(self._acquire(request.url), request, stream, **kwargs)
+        candidates = router.candidates()
+        for position, endpoint in enumerate(candidates):
+            last = position == len(candidates) - 1
+            routed = request.copy()
+            routed.url = router.rewrite(request.url, endpoint)
+            # 限流排队时间不计入端点延迟；超过等待上限时直接切换端点，不记为端点错误
+            try:
+                bucket = self._acquire(routed.url)
+            except RateLimitExceeded:
+                if last:
+                    raise
+                router.failovers += 1
+                continue
+            start = time.perf_counter()
+            try:
+                response = self._dispatch(bucket, routed, stream, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                router.record(endpoint, time.perf_counter() - start, ok=False)
+                if last:
+                    raise
+                router.failovers += 1
+                continue
+            ok = response.status_code not in RETRY_STATUSES
+            router.record(endpoint, time.perf_counter() - start, ok)
+            if ok or last:
+                return response
+            router.failovers += 1
+            response.close()
+
+    def _acquire(self, url: str) -> TokenBucket:
+        bucket = RATE_LIMITS.bucket(self.name, url)
+        delay = bucket.reserve()
+        if delay:
+            time.sleep(delay)
+        return bucket
+
+    def _dispatch(self, bucket: TokenBucket, request, stream=False, **kwargs):
+        body = request.body.encode() if isinstance(request.body, str) else request.body
+        label = rpc_name(request.method, request.url, body)
+        bytes_out = len(body) if isinstance(body, bytes) else 0
+        start = time.perf_counter()
+        try:
+            response = super().send(request, stream=stream, **kwargs)
+            # Session.send 随后也会读取响应体，这里提前读取以计入完整延迟
+            bytes_in = len(response.content) if not stream else 0
+        except Exception:
+            METRICS.observe("rpc", self.name, label, time.perf_counter() - start, error=True, bytes_out=bytes_out)
+            raise
+        METRICS.observe(
+            "rpc", self.name, label, time.perf_counter() - start, response.status_code >= 400, bytes_in, bytes_out
+        )
+        bucket.observe(response.status_code, response.headers.get("Retry-After"))
+        return response
+
+
+class _RequestContext:
+    """与 aiohttp 的请求上下文用法相同：await 得到响应，或 async with 在退出时释放连接"""
+
+    def __init__(self, coro: Coroutine[Any, Any, aiohttp.ClientResponse]):
+        self._coro = coro
+        self._response: Optional[aiohttp.ClientResponse] = None
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        self._response = await self._coro
+        return self._response
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._response.release()
+        await self._response.wait_for_close()
+
+
+class _WebSocketContext:
+    """与 aiohttp 的 ws_connect 上下文用法相同：await 得到连接，或 async with 在退出时关闭连接"""
+
+    def __init__(self, coro: Coroutine[Any, Any, aiohttp.ClientWebSocketResponse]):
+        self._coro = coro
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self) -> aiohttp.ClientWebSocketResponse:
+        self._ws = await self._coro
+        return self._ws
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._ws.close()
+
+
+class RoutedSession:
+    """
+    共享异步会话，包装一个普通的 aiohttp.ClientSession（只使用其公开的 request 接口）：
+    发送前按提供方令牌桶限流，429/502/503/504 与连接错误按指数退避重试；
+    多端点链按健康度选择端点，失败时切换到下一个端点；
+    开启对冲时，首选端点超过其 p95 延迟仍未返回响应头，则向下一个端点发送相同请求，取先成功者。
+    request/get/post/ws_connect 的参数与返回值用法与 aiohttp.ClientSession 相同
+    """
+
+    def __init__(self, name: str, session: aiohttp.ClientSession):
+        self.name = name
+        self.session = session
+
+    @property
+    def closed(self) -> bool:
+        return self.session.closed
+
+    async def close(self):
+        await self.session.close()
+
+    def request(self, method: str, url, **kwargs) -> _RequestContext:
+        return _RequestContext(self._request(method, str(url), kwargs))
+
+    def get(self, url, **kwargs) -> _RequestContext:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs) -> _RequestContext:
+        return self.request("POST", url, **kwargs)
+
+    def ws_connect(self, url, **kwargs) -> _WebSocketContext:
+        """建立 websocket 连接：握手按令牌桶限流，不重试、不切换端点（订阅断开后由调用方重连）"""
+        return _WebSocketContext(self._ws_connect(str(url), kwargs))
+
+    async def _ws_connect(self, url: str, kwargs: dict) -> aiohttp.ClientWebSocketResponse:
+        await self._acquire(url)
+        return await self.session.ws_connect(url, **kwargs)
+
+    async def _request(self, method: str, url: str, kwargs: dict) -> aiohttp.ClientResponse:
+        attempt = 0
+        while True:
+            try:
+                response = await self._route(method, url, kwargs)
+            except aiohttp.ClientConnectionError as e:
+                # 读超时不重试，避免成倍放大等待时间
+                delay = retry_delay(attempt) if attempt < RETRY_MAX and not isinstance(e, asyncio.TimeoutError) else None
+                if delay is None:
+                    raise
+            else:
+                if response.status not in RETRYABLE_STATUSES or attempt >= RETRY_MAX:
+                    return response
+                delay = retry_delay(attempt, parse_retry_after(response.headers.get("Retry-After")))
+                if delay is None:
+                    return response
+                response.release()
+            RATE_LIMITS.bucket(self.name, url).retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _route(self, method: str, url: str, kwargs: dict):
+        router = get_router(self.name)
+        if router is None or not router.routes(url):
+            return await self._send(method, url, kwargs)
+
+        candidates = router.candidates()
+        hedge_delay = router.hedge_delay(candidates[0])
+        first = asyncio.ensure_future(self._attempt(router, candidates[0], method, url, kwargs))
+        pending = {first}
+        remaining = candidates[1:]
+        hedged = False
+        failed_response: Optional[aiohttp.ClientResponse] = None
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                timeout = hedge_delay if hedge_delay is not None and not hedged and remaining else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # 首选端点超过 p95 延迟仍未返回，向下一个端点发送对冲请求
+                    hedged = True
+                    router.hedges += 1
+                    pending.add(asyncio.ensure_future(self._attempt(router, remaining.pop(0), method, url, kwargs)))
+                    continue
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    response = task.result()
+                    if response.status not in RETRY_STATUSES:
+                        if hedged and task is not first:
+                            router.hedge_wins += 1
+                        if failed_response is not None:
+                            failed_response.release()
+                        return response
+                    if failed_response is not None:
+                        failed_response.release()
+                    failed_response = response
+                if not pending and remaining:
+                    router.failovers += 1
+                    pending.add(asyncio.ensure_future(self._attempt(router, remaining.pop(0), method, url, kwargs)))
+        finally:
+            for task in pending:
+                _discard(task)
+        if failed_response is not None:
+            return failed_response
+        raise error
+
+    async def _attempt(self, router: EndpointRouter, endpoint: Endpoint, method: str, url: str, kwargs: dict):
+        routed = router.rewrite(url, endpoint)
+        # 限流排队时间不计入端点延迟；超过等待上限时直接切换端点，不记为端点错误
+        bucket = await self._acquire(routed)
+        start = time.perf_counter()
+        try:
+            response = await self._dispatch(bucket, method, routed, kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            router.record(endpoint, time.perf_counter() - start, ok=False)
+            raise
+        router.record(endpoint, time.perf_counter() - start, response.status not in RETRY_STATUSES)
+        return response
+
+    async def _send(self, method: str, url: str, kwargs: dict):
+        return await self._dispatch(await self._acquire(url), method, url, kwargs)
+
+    async def _acquire(self, url: str) -> TokenBucket:
+        bucket = RATE_LIMITS.bucket(self.name, url)
+        delay = bucket.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        return bucket
+
+    async def _dispatch(self, bucket: TokenBucket, method: str, url: str, kwargs: dict):
+        response = await self.session.request(method, url, **kwargs)
+        bucket.observe(response.status, response.headers.get("Retry-After"))
+        return response
+
+
+def _discard(task: asyncio.Future):
+    """取消落败的对冲请求；已返回的响应释放回连接池"""
+    if not task.done():
+        task.cancel()
+        task.add_done_callback(_discard)
+    elif not task.cancelled() and task.exception() is None:
+        task.result().release()
+
+
+def _new_session(name: str) -> requests.Session:
+    # requests>=2.32 在 verify=True 时共享预加载的 SSLContext，
+    # 连接保持 keep-alive 即可复用 TLS 会话，无需重新握手
+    session = requests.Session()
+    adapter = InstrumentedAdapter(name, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_session(name: str) -> requests.Session:
+    """
+    获取指定名称（通常为链名）的共享会话，首次调用时创建
+    :param name: 会话名称，如 "ethereum"、"coingecko"
+    """
+    session = _sessions.get(name)
+    if session is not None:
+        return session
+    with _lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = _new_session(name)
+            _sessions[name] = session
+        return session
+
+
+def _async_trace_config(name: str) -> aiohttp.TraceConfig:
+    counters = _async_counters.setdefault(name, {"requests": 0, "connections": 0})
+
+    async def on_request_start(session, context, params):
+        counters["requests"] += 1
+        context.start = time.perf_counter()
+        context.method = params.method
+        context.url = str(params.url)
+        context.label = None
+        context.bytes_out = 0
+
+    async def on_request_chunk_sent(session, context, params):
+        # JSON-RPC 请求体在首个分块中，据此取得方法名
+        if context.label is None:
+            context.label = rpc_name(context.method, context.url, params.chunk)
+        context.bytes_out += len(params.chunk)
+
+    async def on_request_end(session, context, params):
+        label = context.label or rpc_name(context.method, context.url, None)
+        METRICS.observe(
+            "rpc", name, label, time.perf_counter() - context.start, params.response.status >= 400,
+            bytes_out=context.bytes_out
+        )
+        context.label = label
+
+    async def on_request_exception(session, context, params):
+        label = context.label or rpc_name(context.method, context.url, None)
+        METRICS.observe("rpc", name, label, time.perf_counter() - context.start, error=True, bytes_out=context.bytes_out)
+
+    async def on_response_chunk_received(session, context, params):
+        METRICS.add_bytes("rpc", name, context.label, bytes_in=len(params.chunk))
+
+    async def on_connection_create_end(session, context, params):
+        counters["connections"] += 1
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    trace_config.on_response_chunk_received.append(on_response_chunk_received)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    return trace_config
+
+
+def get_async_session(name: str) -> RoutedSession:
+    """
+    获取当前事件循环中指定名称的共享异步会话，首次调用时创建
+    :param name: 会话名称，如 "ethereum"、"coingecko"
+    """
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop, {}).get(name)
+    if session is not None and not session.closed:
+        return session
+    with _lock:
+        stale = [_async_sessions.pop(closed) for closed in [key for key in _async_sessions if key.is_closed()]]
+        sessions = _async_sessions.setdefault(loop, {})
+        session = sessions.get(name)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=POOL_MAXSIZE, limit_per_host=POOL_MAXSIZE)
+            session = RoutedSession(
+                name,
+                aiohttp.ClientSession(connector=connector, trace_configs=[_async_trace_config(name)]),
+            )
+            sessions[name] = session
+    if stale:
+        task = loop.create_task(_close_sessions([item for entry in stale for item in entry.values()]))
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+    return session
+
+
+async def _close_sessions(sessions: List[RoutedSession]):
+    """关闭已关闭事件循环留下的会话，释放其连接器"""
+    for session in sessions:
+        try:
+            await session.close()
+        except Exception as e:
+            logger.debug(f"Closing stale async session {session.name} failed: {str(e)}")
+
+
+def connection_stats() -> Dict[str, Dict[str, int]]:
+    """
+    统计各会话的连接复用情况
+    :return: {名称: {"requests": 请求数, "connections": 新建连接数, "reused": 复用次数}}
+    """
+    stats = {}
+    with _lock:
+        items = list(_sessions.items())
+    for name, session in items:
+        requests_count = 0
+        connections = 0
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_count += pool.num_requests
+                connections += pool.num_connections
+        stats[name] = {
+            "requests": requests_count,
+            "connections": connections,
+            "reused": max(requests_count - connections, 0),
+        }
+    for name, counters in list(_async_counters.items()):
+        entry = stats.setdefault(name, {"requests": 0, "connections": 0, "reused": 0})
+        entry["requests"] += counters["requests"]
+        entry["connections"] += counters["connections"]
+        entry["reused"] = max(entry["requests"] - entry["connections"], 0)
+    return stats
+
+
+def close_all():
+    """关闭所有同步共享会话"""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+async def close_all_async():
+    """关闭当前事件循环（以及已关闭的事件循环）中的异步共享会话"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        loops = [key for key in _async_sessions if key is loop or key.is_closed()]
+        sessions = [session for key in loops for session in _async_sessions.pop(key).values()]
+    await _close_sessions(sessions)
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP/SSE 传输与多进程部署
+
+``BLOCKCHAIN_MCP_TRANSPORT=sse`` 时由 uvicorn 提供 MCP SSE 端点（``GET /sse`` 建立会话，
+``POST /messages/<工作进程>/?session_id=...`` 发送消息），``BLOCKCHAIN_MCP_HTTP_WORKERS`` 个工作进程共享同一端口。
+
+SSE 会话保存在建立连接的工作进程内，而后续 POST 可能被内核分配给任意工作进程：
+消息端点路径带有会话所在工作进程的 pid，其他进程收到时经运行目录中该进程的 Unix 套接字转发过去。
+多进程时各进程通过 shared_cache 共享已最终确定的区块/交易与价格快照。
+"""
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+import aiohttp
+import anyio
+import uvicorn
+from aiohttp import web
+from mcp.server.sse import SseServerTransport
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+from blockchain_mcp.chains_factory import StartHeadTracking
+from blockchain_mcp.metrics import start_metrics_server
+from blockchain_mcp.server import LOG_LEVEL, configure_logging, mcp
+
+logger = logging.getLogger(__name__)
+
+HTTP_HOST = os.getenv("BLOCKCHAIN_MCP_HTTP_HOST", "127.0.0.1")
+HTTP_PORT = int(os.getenv("BLOCKCHAIN_MCP_HTTP_PORT", "8000"))
+HTTP_WORKERS = int(os.getenv("BLOCKCHAIN_MCP_HTTP_WORKERS", "1"))
+# 工作进程的 Unix 套接字与共享缓存所在目录，由主进程创建并通过环境变量传给工作进程
+RUN_DIR_ENV = "BLOCKCHAIN_MCP_RUN_DIR"
+FORWARD_TIMEOUT = 30
+# 停止服务时等待仍连接的 SSE 客户端断开的秒数
+SHUTDOWN_TIMEOUT = 5
+
+
+def _socket_path(worker_id: str) -> str:
+    return os.path.join(os.environ[RUN_DIR_ENV], f"worker-{worker_id}.sock")
+
+
+class _SseEndpoint:
+    """GET /sse：在本进程建立会话并运行 MCP 服务直到连接关闭"""
+
+    def __init__(self, transport: SseServerTransport):
+        self.transport = transport
+
+    async def __call__(self, scope, receive, send):
+        server = mcp._mcp_server
+        disconnected = anyio.Event()
+
+        async def receive_or_disconnect():
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            return message
+
+        async def cancel_on_disconnect(scope: anyio.CancelScope):
+            await disconnected.wait()
+            scope.cancel()
+
+        # 客户端断开后 connect_sse 不会关闭读取流，需在断开时取消会话，否则会话任务一直驻留
+        async with self.transport.connect_sse(scope, receive_or_disconnect, send) as (read_stream, write_stream):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(cancel_on_disconnect, tg.cancel_scope)
+                await server.run(read_stream, write_stream, server.create_initialization_options())
+                tg.cancel_scope.cancel()
+
+
+class _MessageEndpoint:
+    """POST /messages/<工作进程>/：本进程的会话直接处理，其他进程的会话经 Unix 套接字转发"""
+
+    def __init__(self, transport: SseServerTransport, worker_id: str):
+        self.transport = transport
+        self.worker_id = worker_id
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+
+    async def __call__(self, scope, receive, send):
+        worker_id = scope["path_params"]["worker"]
+        if worker_id == self.worker_id:
+            await self.transport.handle_post_message(scope, receive, send)
+            return
+        response = await self._forward(worker_id, scope, receive)
+        await response(scope, receive, send)
+
+    async def _forward(self, worker_id: str, scope, receive) -> Response:
+        if not worker_id.isdigit() or not os.path.exists(_socket_path(worker_id)):
+            return Response("Could not find session", status_code=404)
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        logger.debug(f"Forwarding message from worker {self.worker_id} to worker {worker_id}")
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        url = f"http://worker{scope['path']}?{scope['query_string'].decode('latin-1')}"
+        try:
+            async with self._session(worker_id).post(url, data=body, headers={"Content-Type": headers.get("content-type", "")}) as upstream:
+                return Response(await upstream.read(), status_code=upstream.status)
+        except aiohttp.ClientError as e:
+            logger.warning(f"Forwarding message to worker {worker_id} failed: {str(e)}")
+            self._sessions.pop(worker_id, None)
+            return Response("Could not find session", status_code=404)
+
+    def _session(self, worker_id: str) -> aiohttp.ClientSession:
+        session = self._sessions.get(worker_id)
+        if session is None or session.closed:
+            connector = aiohttp.UnixConnector(path=_socket_path(worker_id))
+            session = self._sessions[worker_id] = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=FORWARD_TIMEOUT)
+            )
+        return session
+
+    async def close(self):
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+
+
+def _internal_app(transport: SseServerTransport) -> web.Application:
+    """接收其他工作进程转发来的消息，交给本进程的 SSE 传输处理"""
+
+    async def handle(request: web.Request) -> web.Response:
+        body = await request.read()
+        scope = {
+            "type": "http",
+            "method": request.method,
+            "path": request.path,
+            "raw_path": request.raw_path.encode(),
+            "query_string": request.query_string.encode(),
+            "headers": [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in request.headers.items()],
+            "http_version": "1.1",
+            "scheme": "http",
+            "root_path": "",
+            "server": None,
+            "client": None,
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        result = {"status": 500, "body": b""}
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                result["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                result["body"] += message.get("body", b"")
+
+        await transport.handle_post_message(scope, receive, send)
+        return web.Response(body=result["body"], status=result["status"])
+
+    app = web.Application()
+    app.router.add_post("/messages/{worker}/", handle)
+    return app
+
+
+def create_app() -> Starlette:
+    """uvicorn 应用工厂，每个工作进程调用一次"""
+    configure_logging()
+    worker_id = str(os.getpid())
+    transport = SseServerTransport(f"/messages/{worker_id}/")
+    messages = _MessageEndpoint(transport, worker_id)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        runner = web.AppRunner(_internal_app(transport), access_log=None)
+        await runner.setup()
+        await web.UnixSite(runner, _socket_path(worker_id)).start()
+        try:
+            start_metrics_server()
+        except OSError as e:
+            # 多进程时只有第一个绑定成功的进程提供 Prometheus 端点
+            logger.info(f"Metrics endpoint not started in worker {worker_id}: {str(e)}")
+        StartHeadTracking()
+        logger.info(f"Worker {worker_id} ready")
+        try:
+            yield
+        finally:
+            await messages.close()
+            await runner.cleanup()
+            if os.path.exists(_socket_path(worker_id)):
+                os.remove(_socket_path(worker_id))
+
+    return Starlette(
+        routes=[
+            Route("/sse", endpoint=_SseEndpoint(transport), methods=["GET"]),
+            Route("/messages/{worker}/", endpoint=messages, methods=["POST"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def run_http(host: str = HTTP_HOST, port: int = HTTP_PORT, workers: int = HTTP_WORKERS, run_dir: Optional[str] = None):
+    """
+    启动 HTTP/SSE 服务（阻塞），workers > 1 时由 uvicorn 派生多个工作进程
+    :param run_dir: 工作进程套接字与共享缓存目录，为空时创建临时目录并在退出时删除
+    """
+    owned = run_dir is None
+    run_dir = run_dir or tempfile.mkdtemp(prefix="blockchain-mcp-")
+    os.environ[RUN_DIR_ENV] = run_dir
+    if workers > 1:
+        os.environ.setdefault("BLOCKCHAIN_MCP_SHARED_CACHE", os.path.join(run_dir, "shared-cache.sqlite"))
+    logger.info(f"Serving MCP over SSE at http://{host}:{port}/sse with {workers} worker(s)")
+    try:
+        uvicorn.run(
+            "blockchain_mcp.http_server:create_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+            log_level=LOG_LEVEL.lower(),
+            timeout_graceful_shutdown=SHUTDOWN_TIMEOUT,
+        )
+    finally:
+        if owned:
+            shutil.rmtree(run_dir, ignore_errors=True)
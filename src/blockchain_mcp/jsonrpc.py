@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+JSON-RPC 批量调用
+
+将多个调用打包为一个 JSON-RPC 批量请求（一次HTTP往返），超过最大批量时自动拆分。
+结果按调用顺序返回，单项错误不会影响其他项。
+"""
+import asyncio
+import json
+import os
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import aiohttp
+import requests
+
+from blockchain_mcp.http_pool import RoutedSession
+
+MAX_BATCH_SIZE = int(os.getenv("BLOCKCHAIN_MCP_RPC_MAX_BATCH", "100"))
+
+RpcCall = Tuple[str, list]
+
+
+class RpcResult(NamedTuple):
+    result: Any
+    error: Optional[str]
+
+
+def _chunks(calls: Sequence[RpcCall], max_batch_size: Optional[int]) -> List[Sequence[RpcCall]]:
+    size = max(1, max_batch_size or MAX_BATCH_SIZE)
+    return [calls[i:i + size] for i in range(0, len(calls), size)]
+
+
+def _build_payload(calls: Sequence[RpcCall], version: str) -> list:
+    return [
+        {"jsonrpc": version, "id": index, "method": method, "params": params}
+        for index, (method, params) in enumerate(calls)
+    ]
+
+
+def _parse_response(body: Any, count: int) -> List[RpcResult]:
+    """按请求id将批量响应映射回调用顺序"""
+    if not isinstance(body, list):
+        # 节点不支持批量请求时通常返回单个错误对象
+        error = body.get("error") if isinstance(body, dict) else None
+        message = str(error) if error else "Invalid batch response"
+        return [RpcResult(None, message)] * count
+
+    results = [RpcResult(None, "Missing response")] * count
+    for item in body:
+        index = item.get("id")
+        if not isinstance(index, int) or not 0 <= index < count:
+            continue
+        if item.get("error"):
+            results[index] = RpcResult(None, str(item["error"]))
+        else:
+            results[index] = RpcResult(item.get("result"), None)
+    return results
+
+
+def batch_call(
+    session: requests.Session,
+    url: str,
+    calls: Sequence[RpcCall],
+    max_batch_size: Optional[int] = None,
+    version: str = "2.0",
+    timeout: float = 10,
+) -> List[RpcResult]:
+    """
+    同步批量调用
+    :param calls: [(method, params), ...]
+    :param max_batch_size: 单个HTTP请求最多包含的调用数，默认读取 BLOCKCHAIN_MCP_RPC_MAX_BATCH
+    :param version: JSON-RPC版本号（比特币核心为 "1.0"）
+    :return: 与 calls 顺序一致的 RpcResult 列表
+    """
+    results: List[RpcResult] = []
+    for chunk in _chunks(calls, max_batch_size):
+        try:
+            response = session.post(
+                url,
+                headers={"Content-Type": "application/json"},
+                data=json.dumps(_build_payload(chunk, version)),
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            results.extend(_parse_response(response.json(), len(chunk)))
+        except (requests.RequestException, ValueError) as e:
+            results.extend([RpcResult(None, str(e))] * len(chunk))
+    return results
+
+
+async def batch_call_async(
+    session: Union[RoutedSession, aiohttp.ClientSession],
+    url: str,
+    calls: Sequence[RpcCall],
+    max_batch_size: Optional[int] = None,
+    version: str = "2.0",
+    timeout: float = 10,
+) -> List[RpcResult]:
+    """batch_call 的异步版本，拆分后的各批并发发送"""
+
+    async def _send(chunk: Sequence[RpcCall]) -> List[RpcResult]:
+        try:
+            async with session.post(
+                url,
+                headers={"Content-Type": "application/json"},
+                data=json.dumps(_build_payload(chunk, version)),
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                response.raise_for_status()
+                return _parse_response(await response.json(content_type=None), len(chunk))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            return [RpcResult(None, str(e))] * len(chunk)
+
+    chunk_results = await asyncio.gather(*(_send(chunk) for chunk in _chunks(calls, max_batch_size)))
+    return [result for chunk in chunk_results for result in chunk]
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+工具与上游RPC的延迟指标
+
+按 (类别, 链, 名称) 记录固定分桶的延迟直方图、调用数、错误数与收发字节数：
+
+- ``tool``：每个MCP工具调用，名称为工具名；
+- ``rpc``：每个上游HTTP请求，名称为 JSON-RPC 方法（批量请求为 ``batch:方法``）或 REST 路径模板。
+
+同步请求由 http_pool 的 ``InstrumentedAdapter`` 记录（含响应体读取时间），
+异步请求由 aiohttp ``TraceConfig`` 记录（到收到响应头为止，响应体字节随读取累加）。
+快照作为MCP资源提供；设置 ``BLOCKCHAIN_MCP_METRICS_PORT`` 时另启动 Prometheus 文本格式端点。
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = os.getenv("BLOCKCHAIN_MCP_METRICS_PORT")
+METRICS_HOST = os.getenv("BLOCKCHAIN_MCP_METRICS_HOST", "127.0.0.1")
+# 直方图上界（秒），最后一个桶为 +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 序列数上限（链名来自工具参数），超出后新序列合并到 other
+MAX_SERIES = int(os.getenv("BLOCKCHAIN_MCP_METRICS_MAX_SERIES", "1000"))
+# 工具返回以下前缀视为失败（工具把异常转换为错误文本返回）
+TOOL_ERROR_PREFIXES = ("ValueError:", "TypeError:", "Error:", '{"success":false', "success: False")
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按桶内线性插值估算分位数，并限制在实际观测到的最小/最大值之间"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        estimate = self.max
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                estimate = lower + (upper - lower) * (rank - cumulative) / bucket_count
+                break
+            cumulative += bucket_count
+        return min(max(estimate, self.min), self.max)
+
+
+class Series:
+    __slots__ = ("latency", "errors", "bytes_in", "bytes_out")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.errors = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def summary(self) -> Dict:
+        count = self.latency.count
+        return {
+            "count": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "mean_ms": round(self.latency.sum / count * 1000, 2) if count else None,
+            "max_ms": _ms(self.latency.max) if count else None,
+            "p50_ms": _ms(self.latency.quantile(0.5)),
+            "p90_ms": _ms(self.latency.quantile(0.9)),
+            "p99_ms": _ms(self.latency.quantile(0.99)),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+class Metrics:
+    def __init__(self):
+        self._series: Dict[Tuple[str, str, str], Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, kind: str, chain: str, name: str, seconds: float, error: bool = False,
+                bytes_in: int = 0, bytes_out: int = 0):
+        with self._lock:
+            series = self._get(kind, chain, name)
+            series.latency.observe(seconds)
+            series.errors += error
+            series.bytes_in += bytes_in
+            series.bytes_out += bytes_out
+
+    def add_bytes(self, kind: str, chain: str, name: str, bytes_in: int = 0, bytes_out: int = 0):
+        """只累加字节数（异步响应体在延迟记录之后才读取）"""
+        with self._lock:
+            series = self._get(kind, chain, name)
+            series.bytes_in += bytes_in
+            series.bytes_out += bytes_out
+
+    def snapshot(self) -> Dict:
+        """{类别: {链: {名称: 统计}}}，每条链内按 p99 从高到低排列"""
+        with self._lock:
+            items = [(key, series.summary()) for key, series in self._series.items()]
+        result: Dict[str, Dict[str, Dict]] = {"tool": {}, "rpc": {}}
+        for (kind, chain, name), summary in sorted(items, key=lambda item: -(item[1]["p99_ms"] or 0)):
+            result.setdefault(kind, {}).setdefault(chain, {})[name] = summary
+        return result
+
+    def render_prometheus(self) -> str:
+        """Prometheus 文本暴露格式"""
+        with self._lock:
+            items = [
+                (key, list(series.latency.counts), series.latency.sum, series.latency.count,
+                 series.errors, series.bytes_in, series.bytes_out)
+                for key, series in sorted(self._series.items())
+            ]
+        lines = [
+            "# HELP blockchain_mcp_latency_seconds Latency of MCP tool calls and upstream RPC requests",
+            "# TYPE blockchain_mcp_latency_seconds histogram",
+        ]
+        for (kind, chain, name), counts, total, count, *_ in items:
+            labels = f'kind="{kind}",chain="{_escape(chain)}",name="{_escape(name)}"'
+            cumulative = 0
+            for bucket, bucket_count in zip(LATENCY_BUCKETS + (float("inf"),), counts):
+                cumulative += bucket_count
+                upper = "+Inf" if bucket == float("inf") else repr(bucket)
+                lines.append(f'blockchain_mcp_latency_seconds_bucket{{{labels},le="{upper}"}} {cumulative}')
+            lines.append(f"blockchain_mcp_latency_seconds_sum{{{labels}}} {total}")
+            lines.append(f"blockchain_mcp_latency_seconds_count{{{labels}}} {count}")
+        for metric, index, help_text in (
+            ("blockchain_mcp_errors_total", 4, "Failed MCP tool calls and upstream RPC requests"),
+            ("blockchain_mcp_bytes_in_total", 5, "Bytes received (tool arguments, RPC response bodies)"),
+            ("blockchain_mcp_bytes_out_total", 6, "Bytes sent (tool results, RPC request bodies)"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for item in items:
+                kind, chain, name = item[0]
+                lines.append(f'{metric}{{kind="{kind}",chain="{_escape(chain)}",name="{_escape(name)}"}} {item[index]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def _get(self, kind: str, chain: str, name: str) -> Series:
+        key = (kind, chain, name)
+        series = self._series.get(key)
+        if series is None:
+            if len(self._series) >= MAX_SERIES:
+                key = (kind, "other", "other")
+                series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = Series()
+        return series
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = Metrics()
+
+
+def rpc_name(method: str, url: str, body: Optional[bytes]) -> str:
+    """
+    上游请求的指标名称：JSON-RPC 请求取方法名，批量请求为 ``batch:方法``（多种方法用+连接），
+    其他请求为 ``HTTP方法 路径模板``（哈希、地址、数字等路径段替换为 ``{}``，避免标签基数膨胀）
+    """
+    if body and body[:1] in (b"{", b"["):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict) and "method" in payload:
+            return str(payload["method"])
+        if isinstance(payload, list) and payload:
+            methods = sorted({str(call.get("method")) for call in payload if isinstance(call, dict)})
+            return "batch:" + "+".join(methods)
+    segments = [
+        "{}" if segment.isdigit() or segment.startswith("0x") or len(segment) >= 16 else segment
+        for segment in urlsplit(url).path.split("/")
+    ]
+    return f"{method} {'/'.join(segments) or '/'}"
+
+
+def instrument_tool(fn):
+    """记录MCP工具调用的延迟、错误与字节数，链名取自 blockchain_name 参数"""
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        chain = str(kwargs.get("blockchain_name", "")).lower() or "-"
+        arguments = {key: value for key, value in kwargs.items() if key != "ctx"}
+        bytes_in = len(json.dumps(arguments, default=str, ensure_ascii=False).encode())
+        start = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException:
+            METRICS.observe("tool", chain, fn.__name__, time.perf_counter() - start, error=True, bytes_in=bytes_in)
+            raise
+        error = isinstance(result, str) and result.startswith(TOOL_ERROR_PREFIXES)
+        bytes_out = len(result.encode()) if isinstance(result, str) else 0
+        METRICS.observe("tool", chain, fn.__name__, time.perf_counter() - start, error, bytes_in, bytes_out)
+        return result
+
+    return wrapper
+
+
+class _PrometheusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = METRICS.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("Metrics endpoint: " + format, *args)
+
+
+def start_metrics_server(port: Optional[int] = None, host: str = METRICS_HOST) -> Optional[ThreadingHTTPServer]:
+    """
+    在后台线程启动 Prometheus ``/metrics`` 端点
+    :param port: 未指定时读取 BLOCKCHAIN_MCP_METRICS_PORT，均未设置则不启动
+    """
+    if port is None:
+        if not METRICS_PORT:
+            return None
+        port = int(METRICS_PORT)
+    server = ThreadingHTTPServer((host, port), _PrometheusHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("Prometheus metrics available at http://%s:%d/metrics", host, server.server_address[1])
+    return server
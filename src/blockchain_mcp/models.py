@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+结构化结果模型与序列化
+
+各链把上游原始结果转换为统一的类型化模型（区块、交易、余额、价格），放在
+``BlockchainResponse.data`` 中；链特有字段放在 ``extra``。
+工具按调用方选择输出紧凑JSON（pydantic-core 直接序列化，无多余空白）或便于阅读的文本；
+超出响应预算的结果分页输出（见 paging 模块）。
+金额使用 Decimal 以原生单位精确表示，JSON 中为字符串。
+"""
+import os
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import pydantic_core
+from pydantic import BaseModel
+
+from blockchain_mcp.paging import RESPONSE_PAGES
+
+RESPONSE_FORMATS = ("json", "text")
+DEFAULT_RESPONSE_FORMAT = os.getenv("BLOCKCHAIN_MCP_RESPONSE_FORMAT", "json")
+
+
+class BlockResult(BaseModel):
+    chain: str
+    number: int
+    hash: str
+    parent_hash: Optional[str] = None
+    timestamp: Optional[int] = None
+    size: Optional[int] = None
+    gas_used: Optional[int] = None
+    gas_limit: Optional[int] = None
+    base_fee_per_gas: Optional[int] = None
+    # summary/full 时为交易数；full 时附带交易ID列表
+    tx_count: Optional[int] = None
+    transactions: Optional[List[str]] = None
+    extra: Dict[str, Any] = {}
+
+
+class TransactionResult(BaseModel):
+    chain: str
+    hash: str
+    block_number: Optional[int] = None
+    block_hash: Optional[str] = None
+    from_address: Optional[str] = None
+    to_address: Optional[str] = None
+    value: Optional[Decimal] = None
+    fee: Optional[Decimal] = None
+    status: Optional[str] = None
+    symbol: Optional[str] = None
+    extra: Dict[str, Any] = {}
+
+
+class BlockTransactionsResult(BaseModel):
+    """区块中一页完整交易，next_offset 为下一页的 offset（最后一页为空）"""
+    chain: str
+    number: int
+    hash: str
+    tx_count: int
+    offset: int
+    transactions: List[TransactionResult]
+    next_offset: Optional[int] = None
+
+
+class TransactionFee(BaseModel):
+    hash: str
+    gas_used: int
+    effective_gas_price: int
+    priority_fee_per_gas: int
+    fee: Decimal
+    status: str
+
+
+class BlockFeesResult(BaseModel):
+    """区块手续费汇总：金额为原生单位，每单位 gas 的价格（base fee、优先费分位数）为 wei"""
+    chain: str
+    number: int
+    hash: str
+    tx_count: int
+    failed_tx_count: int
+    gas_used: int
+    base_fee_per_gas: Optional[int] = None
+    total_fees: Decimal
+    burned_fees: Decimal
+    priority_fees: Decimal
+    # 按 gas 加权的单位优先费分位数（与 eth_feeHistory 的 reward 一致）
+    priority_fee_percentiles: Dict[str, int]
+    symbol: str
+    receipts_source: str
+    transactions: Optional[List[TransactionFee]] = None
+
+
+class FeeEstimateResult(BaseModel):
+    """最近区块窗口的费用估计：单位 gas 价格均为 wei，三档为 slow/standard/fast"""
+    chain: str
+    newest_block: int
+    blocks: int
+    base_fee: int
+    next_base_fee: int
+    mean_base_fee: int
+    # 窗口内最旧到最新区块基础费用的相对变化
+    base_fee_change: float
+    base_fee_trend: str
+    gas_used_ratio: float
+    priority_fee: Dict[str, int]
+    max_fee: Dict[str, int]
+    symbol: str
+    extra: Dict[str, Any] = {}
+
+
+class BalanceResult(BaseModel):
+    chain: str
+    address: Optional[str] = None
+    balance: Decimal
+    symbol: str
+    extra: Dict[str, Any] = {}
+
+
+class TokenBalance(BaseModel):
+    """单个代币的余额；该代币查询失败时只有 token 与 error"""
+    token: str
+    balance: Optional[Decimal] = None
+    symbol: Optional[str] = None
+    decimals: Optional[int] = None
+    error: Optional[str] = None
+
+
+class TokenBalancesResult(BaseModel):
+    chain: str
+    address: str
+    tokens: List[TokenBalance]
+
+
+class PriceResult(BaseModel):
+    chain: str
+    price: float
+    currency: str = "USD"
+
+
+def to_hex(value: Any) -> Optional[str]:
+    """bytes/HexBytes 转为 0x 前缀十六进制字符串，其他值原样返回"""
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    return value
+
+
+def to_units(amount: int, decimals: int) -> Decimal:
+    """最小单位整数（wei、lamports、satoshi）精确转换为原生单位"""
+    return Decimal(amount).scaleb(-decimals)
+
+
+def validate_format(format: str):
+    if format not in RESPONSE_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(RESPONSE_FORMATS)}")
+
+
+def serialize(result: Any, format: str = DEFAULT_RESPONSE_FORMAT, budget: bool = True) -> str:
+    """
+    序列化工具结果，超出响应预算时只输出第一页（page.next_cursor 用于 get_next_page 续页）
+    :param format: json 紧凑JSON（省略空字段）；text 逐行 key: value 文本
+    :param budget: 是否应用响应预算（续页结果已按预算切分，不再检查）
+    """
+    if isinstance(result, str):
+        return result
+    encoded = pydantic_core.to_json(result, exclude_none=True)
+    if budget and not RESPONSE_PAGES.within_budget(result, len(encoded)):
+        result = RESPONSE_PAGES.first_page(result)
+        encoded = None
+    if format == "text":
+        return render_text(result)
+    return (encoded or pydantic_core.to_json(result, exclude_none=True)).decode()
+
+
+def render_text(value: Any, indent: int = 0) -> str:
+    """渲染为便于阅读的缩进文本"""
+    if isinstance(value, BaseModel):
+        value = value.model_dump(exclude_none=True)
+    pad = "  " * indent
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if item is None or item == {} or item == []:
+                continue
+            if isinstance(item, (dict, BaseModel)) or (isinstance(item, list) and item and isinstance(item[0], (dict, BaseModel))):
+                lines.append(f"{pad}{key}:")
+                lines.append(render_text(item, indent + 1))
+            else:
+                lines.append(f"{pad}{key}: {_text_scalar(item)}")
+        return "\n".join(lines)
+    if isinstance(value, list):
+        return "\n".join(
+            f"{pad}-\n{render_text(item, indent + 1)}" if isinstance(item, (dict, BaseModel)) else f"{pad}- {_text_scalar(item)}"
+            for item in value
+        )
+    return f"{pad}{_text_scalar(value)}"
+
+
+def _text_scalar(value: Any) -> str:
+    if isinstance(value, list):
+        return ", ".join(_text_scalar(item) for item in value)
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f")
+    return str(value)
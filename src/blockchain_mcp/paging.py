@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+工具响应大小预算与游标续页
+
+序列化后的结果超过字节预算（或列表项总数超过条数预算）时，只返回第一页，其余内容留在服务端：
+结果中所有列表（如区块交易ID、Solana 交易的 logMessages/accountKeys）按文档顺序依次切页，
+非列表字段每页都带上；响应中的 page 给出各列表本页的 offset/count/total 与 next_cursor。
+get_next_page 凭游标从保存的结果继续，不再请求上游，每页的开销只与页大小有关。
+
+保存的结果按 TTL 过期，总大小超过上限时淘汰最早的；多进程部署时同时写入共享缓存，
+任一工作进程都能续页。游标是不透明字符串，重复使用同一游标得到同一页（可安全重试）。
+"""
+import base64
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import pydantic_core
+from pydantic import BaseModel
+
+from blockchain_mcp.shared_cache import SHARED_CACHE, SharedCache
+
+logger = logging.getLogger(__name__)
+
+# 单个响应的字节预算（按紧凑JSON计），0 表示不限
+RESPONSE_MAX_BYTES = int(os.getenv("BLOCKCHAIN_MCP_RESPONSE_MAX_BYTES", "65536"))
+# 单个响应的列表项总数预算，0 表示不限
+RESPONSE_MAX_ITEMS = int(os.getenv("BLOCKCHAIN_MCP_RESPONSE_MAX_ITEMS", "1000"))
+CURSOR_TTL = float(os.getenv("BLOCKCHAIN_MCP_CURSOR_TTL", "600"))
+# 保存的待续页结果的总大小上限（按JSON字节计）
+CURSOR_MAX_BYTES = int(os.getenv("BLOCKCHAIN_MCP_CURSOR_MAX_BYTES", str(32 * 1024 * 1024)))
+# 页元数据与每个列表键的预留字节
+PAGE_OVERHEAD = 256
+LIST_OVERHEAD = 96
+
+Path = Tuple[str, ...]
+
+
+class PagedResult(NamedTuple):
+    """拆分后的结果：列表替换为空占位的骨架，以及各列表的路径、内容与每项的JSON字节数"""
+    skeleton: dict
+    skeleton_bytes: int
+    paths: List[Path]
+    lists: List[list]
+    sizes: List[List[int]]
+    total_bytes: int
+
+
+def _plain(result: Any) -> Any:
+    return result.model_dump(exclude_none=True) if isinstance(result, BaseModel) else result
+
+
+def _list_paths(value: dict, path: Path = ()) -> Iterator[Tuple[Path, list]]:
+    """字典中（含嵌套字典）的非空列表；列表内部的元素不再拆分"""
+    for key, item in value.items():
+        if isinstance(item, list) and item:
+            yield path + (key,), item
+        elif isinstance(item, dict):
+            yield from _list_paths(item, path + (key,))
+
+
+def _with_lists(skeleton: dict, values: Dict[Path, Any]) -> dict:
+    """复制骨架并在指定路径放入值，值为 None 时删除该键（只复制路径上的字典，键的顺序不变）"""
+    page = dict(skeleton)
+    for path, value in values.items():
+        node = page
+        for key in path[:-1]:
+            node[key] = node = dict(node[key])
+        if value is None:
+            del node[path[-1]]
+        else:
+            node[path[-1]] = value
+    return page
+
+
+class ResponsePages:
+    def __init__(
+        self,
+        max_bytes: int = RESPONSE_MAX_BYTES,
+        max_items: int = RESPONSE_MAX_ITEMS,
+        ttl: float = CURSOR_TTL,
+        max_stored_bytes: int = CURSOR_MAX_BYTES,
+        shared: Optional[SharedCache] = None
+    ):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.ttl = ttl
+        self.max_stored_bytes = max_stored_bytes
+        self.shared = shared
+        self._lock = threading.Lock()
+        # 结果ID -> (过期时间, 拆分后的结果)，按写入顺序淘汰
+        self._entries: "OrderedDict[str, Tuple[float, PagedResult]]" = OrderedDict()
+        self._stored_bytes = 0
+        self._stats = {"paged": 0, "pages": 0, "expired": 0, "evictions": 0}
+
+    def within_budget(self, result: Any, size: int) -> bool:
+        """size 为结果的JSON字节数；条数只在可能超出时才遍历统计（每项至少2字节）"""
+        if self.max_bytes and size > self.max_bytes:
+            return False
+        if not self.max_items or size <= 2 * self.max_items:
+            return True
+        plain = _plain(result)
+        return not isinstance(plain, dict) or sum(len(items) for _, items in _list_paths(plain)) <= self.max_items
+
+    def first_page(self, result: Any) -> Any:
+        """超出预算的结果拆分保存并返回第一页；无法拆分（顶层不是对象或没有列表）时原样返回"""
+        plain = _plain(result)
+        if not isinstance(plain, dict):
+            return result
+        found = list(_list_paths(plain))
+        if not found:
+            return result
+        paths = [path for path, _ in found]
+        # 列表位置保留占位，页面中放入切片或删除
+        skeleton = _with_lists(plain, {path: [] for path in paths})
+        skeleton_bytes = len(pydantic_core.to_json(skeleton))
+        sizes = [[len(pydantic_core.to_json(item)) + 1 for item in items] for _, items in found]
+        paged = PagedResult(
+            skeleton=skeleton,
+            skeleton_bytes=skeleton_bytes,
+            paths=paths,
+            lists=[items for _, items in found],
+            sizes=sizes,
+            total_bytes=skeleton_bytes + sum(map(sum, sizes)),
+        )
+        result_id = secrets.token_urlsafe(12)
+        self._store(result_id, paged)
+        self._count("paged")
+        return self._page(result_id, paged, 0, 0)
+
+    def next_page(self, cursor: str) -> dict:
+        """
+        按游标返回下一页
+        :raises ValueError: 游标无效或对应结果已过期
+        """
+        try:
+            result_id, index, offset = base64.urlsafe_b64decode(cursor.strip().encode()).decode().split(":")
+            index, offset = int(index), int(offset)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError("Invalid cursor")
+        paged = self._load(result_id)
+        if paged is None:
+            raise ValueError("Cursor expired or unknown, repeat the original request")
+        if not 0 <= index < len(paged.paths) or not 0 <= offset < len(paged.lists[index]):
+            raise ValueError("Invalid cursor")
+        return self._page(result_id, paged, index, offset)
+
+    def _page(self, result_id: str, paged: PagedResult, index: int, offset: int) -> dict:
+        """从第 index 个列表的 offset 处按预算装入列表项；每页至少一项，保证能够前进"""
+        budget = (self.max_bytes or float("inf")) - paged.skeleton_bytes - PAGE_OVERHEAD
+        items = 0
+        slices = {}
+        while index < len(paged.paths):
+            sizes = paged.sizes[index]
+            start = offset
+            budget -= LIST_OVERHEAD
+            while offset < len(sizes) and (items == 0 or (
+                sizes[offset] <= budget and (not self.max_items or items < self.max_items)
+            )):
+                budget -= sizes[offset]
+                offset += 1
+                items += 1
+            if offset > start:
+                slices[index] = (start, offset)
+            if offset < len(sizes):
+                break
+            index, offset = index + 1, 0
+        page = _with_lists(paged.skeleton, {
+            path: paged.lists[i][slices[i][0]:slices[i][1]] if i in slices else None for i, path in enumerate(paged.paths)
+        })
+        page["page"] = {
+            "lists": {
+                ".".join(paged.paths[i]): {"offset": start, "count": end - start, "total": len(paged.lists[i])}
+                for i, (start, end) in slices.items()
+            }
+        }
+        if index < len(paged.paths):
+            page["page"]["next_cursor"] = base64.urlsafe_b64encode(f"{result_id}:{index}:{offset}".encode()).decode()
+        self._count("pages")
+        return page
+
+    def _store(self, result_id: str, paged: PagedResult):
+        now = time.monotonic()
+        with self._lock:
+            # 所有项 TTL 相同，最早写入的最先过期
+            while self._entries and next(iter(self._entries.values()))[0] < now:
+                _, (_, expired) = self._entries.popitem(last=False)
+                self._stored_bytes -= expired.total_bytes
+                self._stats["expired"] += 1
+            self._entries[result_id] = (now + self.ttl, paged)
+            self._stored_bytes += paged.total_bytes
+            while self._stored_bytes > self.max_stored_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._stored_bytes -= evicted.total_bytes
+                self._stats["evictions"] += 1
+        if self.shared is not None:
+            self.shared.set(f"page:{result_id}", paged, ttl=self.ttl)
+
+    def _load(self, result_id: str) -> Optional[PagedResult]:
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[result_id]
+                self._stored_bytes -= entry[1].total_bytes
+                self._stats["expired"] += 1
+                entry = None
+        if entry is not None:
+            return entry[1]
+        # 其他工作进程保存的结果
+        return self.shared.get(f"page:{result_id}") if self.shared is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(
+                self._stats, entries=len(self._entries), stored_bytes=self._stored_bytes,
+                max_bytes=self.max_bytes, max_items=self.max_items
+            )
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+
+RESPONSE_PAGES = ResponsePages(shared=SHARED_CACHE)
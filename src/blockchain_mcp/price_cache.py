@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+进程级价格缓存
+
+一次 CoinGecko ``/simple/price`` 请求同时拉取所有支持链的价格，按TTL缓存：
+- 新鲜期内直接返回内存结果；
+- 过期但仍在 stale 窗口内时返回旧值，并在后台刷新（stale-while-revalidate）；
+- 并发调用方等待同一个进行中的请求，而不是各自请求上游；
+- 配置了跨进程共享缓存时，各工作进程先复用其他进程在TTL内获取的价格快照，再请求上游。
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import requests
+
+from blockchain_mcp.http_pool import get_session
+from blockchain_mcp.shared_cache import SHARED_CACHE, SharedCache
+
+logger = logging.getLogger(__name__)
+
+COINGECKO_PRICE_URL = os.getenv("COINGECKO_API_URL", "https://api.coingecko.com/api/v3") + "/simple/price"
+PRICE_TTL = float(os.getenv("BLOCKCHAIN_MCP_PRICE_TTL", "60"))
+PRICE_STALE_TTL = float(os.getenv("BLOCKCHAIN_MCP_PRICE_STALE_TTL", "300"))
+SUPPORTED_IDS = ("ethereum", "vechain", "solana", "bitcoin")
+SHARED_KEY = "prices:usd"
+
+
+class PriceFetchError(Exception):
+    """上游价格获取失败且没有可用缓存"""
+
+
+class PriceCache:
+    def __init__(
+        self,
+        ids: Iterable[str] = SUPPORTED_IDS,
+        ttl: float = PRICE_TTL,
+        stale_ttl: float = PRICE_STALE_TTL,
+        shared: Optional[SharedCache] = None
+    ):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.shared = shared
+        self._ids = set(ids)
+        self._prices: Dict[str, float] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._inflight: Optional[threading.Event] = None
+        self._last_error: Optional[str] = None
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "fetches": 0, "errors": 0, "coalesced": 0, "shared_hits": 0}
+
+    def peek(self, coin_id: str) -> Optional[float]:
+        """
+        非阻塞读取：新鲜或处于stale窗口内时返回价格（后者触发后台刷新），否则返回None
+        """
+        refresh = False
+        with self._lock:
+            price = self._prices.get(coin_id)
+            if price is None or self._fetched_at is None:
+                return None
+            age = time.monotonic() - self._fetched_at
+            if age <= self.ttl:
+                self._stats["hits"] += 1
+                return price
+            if age > self.stale_ttl:
+                return None
+            self._stats["stale_hits"] += 1
+            refresh = True
+        if refresh:
+            self._refresh(wait=False)
+        return price
+
+    def get(self, coin_id: str) -> float:
+        """
+        读取价格，缓存未命中时等待上游请求（与并发调用方共享同一请求），
+        上游失败时退回最近一次成功获取的价格
+        :raises PriceFetchError: 上游失败且没有可用缓存
+        """
+        price = self.peek(coin_id)
+        if price is not None:
+            return price
+        with self._lock:
+            self._stats["misses"] += 1
+            self._ids.add(coin_id)
+        self._refresh(wait=True)
+        with self._lock:
+            price = self._prices.get(coin_id)
+            if price is None:
+                raise PriceFetchError(self._last_error or "API响应数据结构异常")
+            return price
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["age_seconds"] = round(time.monotonic() - self._fetched_at, 3) if self._fetched_at else None
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._prices.clear()
+            self._fetched_at = None
+
+    def _refresh(self, wait: bool):
+        with self._lock:
+            event = self._inflight
+            leader = event is None
+            if leader:
+                event = self._inflight = threading.Event()
+            else:
+                self._stats["coalesced"] += 1
+        if leader:
+            if wait:
+                self._fetch(event)
+            else:
+                threading.Thread(target=self._fetch, args=(event,), daemon=True).start()
+        elif wait:
+            event.wait(timeout=10)
+
+    def _load_shared(self) -> bool:
+        """采用其他进程在TTL内获取的价格快照（墙钟时间戳），覆盖全部所需币种时返回True"""
+        snapshot = self.shared.get(SHARED_KEY)
+        if not snapshot:
+            return False
+        age = time.time() - snapshot["fetched_at"]
+        with self._lock:
+            if age > self.ttl or not self._ids <= snapshot["prices"].keys():
+                return False
+            self._prices.update(snapshot["prices"])
+            self._fetched_at = time.monotonic() - max(0.0, age)
+            self._last_error = None
+            self._stats["shared_hits"] += 1
+        return True
+
+    def _fetch(self, event: threading.Event):
+        try:
+            if self.shared is not None and self._load_shared():
+                return
+            with self._lock:
+                ids = ",".join(sorted(self._ids))
+                self._stats["fetches"] += 1
+            params = {"ids": ids, "vs_currencies": "usd"}
+            response = get_session("coingecko").get(COINGECKO_PRICE_URL, params=params, timeout=5)
+            if response.status_code != 200:
+                logger.error(f"API请求失败，状态码：{response.status_code}")
+                self._fail("API请求失败")
+                return
+            prices = {coin_id: item["usd"] for coin_id, item in response.json().items() if "usd" in item}
+            with self._lock:
+                self._prices.update(prices)
+                self._fetched_at = time.monotonic()
+                self._last_error = None
+                snapshot = {"prices": dict(self._prices), "fetched_at": time.time()}
+            if self.shared is not None:
+                self.shared.set(SHARED_KEY, snapshot, ttl=self.stale_ttl)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"网络连接异常：{str(e)}")
+            self._fail("网络连接异常")
+        except (ValueError, AttributeError):
+            logger.error("API响应数据结构异常")
+            self._fail("API响应数据结构异常")
+        finally:
+            with self._lock:
+                self._inflight = None
+            event.set()
+
+    def _fail(self, message: str):
+        with self._lock:
+            self._stats["errors"] += 1
+            self._last_error = message
+
+
+PRICE_CACHE = PriceCache(shared=SHARED_CACHE)
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+上游请求限流与退避重试
+
+- 每个上游提供方（会话名：链名或 coingecko）按端点主机维护一个令牌桶，速率由
+  ``BLOCKCHAIN_MCP_RATE_LIMITS`` 配置（如 ``ethereum=10:20,coingecko=0.5``，即 速率[:突发]）。
+  令牌不足时请求按到达顺序排队等待，预计等待超过 ``BLOCKCHAIN_MCP_RATE_MAX_WAIT`` 则立即失败；
+- 收到 429 时按 ``Retry-After``（缺省时按退避时间）暂停该主机的所有请求，并把速率减半（每秒最多一次，
+  同一批并发请求的多个 429 只降速一次），之后每个成功请求逐步恢复到配置速率；未配置速率的提供方同样遵守暂停；
+- 429/502/503/504 与连接错误按带抖动的指数退避重试（本服务只发送只读请求，重试是安全的）。
+"""
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+
+RATE_MAX_WAIT = float(os.getenv("BLOCKCHAIN_MCP_RATE_MAX_WAIT", "5"))
+RETRY_MAX = int(os.getenv("BLOCKCHAIN_MCP_RETRY_MAX", "3"))
+RETRY_BASE_DELAY = float(os.getenv("BLOCKCHAIN_MCP_RETRY_BASE_MS", "100")) / 1000
+RETRY_MAX_DELAY = float(os.getenv("BLOCKCHAIN_MCP_RETRY_MAX_DELAY", "2"))
+# 429 后速率最多降到配置值的比例，以及每个成功请求恢复的比例
+MIN_RATE_FRACTION = 0.1
+RECOVERY_STEP = 0.02
+DECREASE_INTERVAL = 1.0
+# 可重试的状态码（请求未被处理或被限流）
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def parse_rate_limits(value: Optional[str]) -> Dict[str, Tuple[float, float]]:
+    """解析 ``名称=速率[:突发]`` 列表；突发缺省为1，即请求严格按速率间隔发出，避免超出提供方的计数窗口"""
+    limits = {}
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        name, spec = item.split("=", 1)
+        rate, _, burst = spec.partition(":")
+        limits[name.strip().lower()] = (float(rate), float(burst) if burst else 1.0)
+    return limits
+
+
+RATE_LIMITS_CONFIG = parse_rate_limits(os.getenv("BLOCKCHAIN_MCP_RATE_LIMITS"))
+
+
+class RateLimitExceeded(requests.RequestException, aiohttp.ClientError):
+    """排队等待时间超过上限；同时是 requests 与 aiohttp 的异常类型，沿用各链已有的错误处理"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 头：秒数或 HTTP 日期"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+    """
+    第 attempt 次重试前的等待时间（全抖动指数退避，不短于 Retry-After）
+    :return: 等待秒数；超过 RATE_MAX_WAIT 时返回None，表示不再重试
+    """
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay if delay <= RATE_MAX_WAIT else None
+
+
+class TokenBucket:
+    def __init__(self, name: str, rate: Optional[float] = None, burst: float = 1.0):
+        self.name = name
+        self.limit = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.decreased_at = 0.0
+        self.acquired = 0
+        self.waited = 0.0
+        self.rejected = 0
+        self.throttled = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float = RATE_MAX_WAIT) -> float:
+        """
+        预留一个令牌，返回发送前需等待的秒数；令牌可透支，后到的请求排在前面的请求之后
+        :raises RateLimitExceeded: 需等待的时间超过 max_wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self.paused_until - now)
+            if self.rate:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens < 1:
+                    delay = max(delay, (1 - self.tokens) / self.rate)
+            if delay > max_wait:
+                self.rejected += 1
+                raise RateLimitExceeded(
+                    f"Rate limit for {self.name}: request would wait {delay:.1f}s (max {max_wait:.1f}s)"
+                )
+            if self.rate:
+                self.tokens -= 1
+            self.acquired += 1
+            self.waited += delay
+            return delay
+
+    def observe(self, status: int, retry_after: Optional[str] = None):
+        """根据响应调整：429 暂停并降速，成功则逐步恢复速率"""
+        with self._lock:
+            if status == 429:
+                self.throttled += 1
+                now = time.monotonic()
+                pause = parse_retry_after(retry_after)
+                if pause is None:
+                    pause = RETRY_BASE_DELAY * 2 ** min(self.throttled, 6)
+                self.paused_until = max(self.paused_until, now + pause)
+                if self.limit and now - self.decreased_at >= DECREASE_INTERVAL:
+                    self.decreased_at = now
+                    self.rate = max(self.limit * MIN_RATE_FRACTION, self.rate / 2)
+                    self.tokens = min(self.tokens, 0.0)
+            elif status < 400 and self.limit and self.rate < self.limit:
+                self.rate = min(self.limit, self.rate + self.limit * RECOVERY_STEP)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "limit_per_second": self.limit,
+                "rate_per_second": round(self.rate, 3) if self.rate else None,
+                "paused_for_seconds": round(max(0.0, self.paused_until - time.monotonic()), 2),
+                "acquired": self.acquired,
+                "waited_seconds": round(self.waited, 3),
+                "rejected": self.rejected,
+                "throttled": self.throttled,
+                "retries": self.retries,
+            }
+
+
+class RateLimits:
+    """按 (提供方, 端点主机) 管理令牌桶，多端点链的每个端点各自限流"""
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, name: str, url: str) -> TokenBucket:
+        key = (name, urlsplit(url).netloc)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    rate, burst = RATE_LIMITS_CONFIG.get(name, (None, 1.0))
+                    bucket = self._buckets[key] = TokenBucket(f"{name} ({key[1]})", rate, burst)
+        return bucket
+
+    def stats(self) -> Dict[str, Dict]:
+        """{提供方: {主机: 统计}}"""
+        with self._lock:
+            items = list(self._buckets.items())
+        result: Dict[str, Dict] = {}
+        for (name, host), bucket in items:
+            result.setdefault(name, {})[host] = bucket.stats()
+        return result
+
+
+RATE_LIMITS = RateLimits()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+多端点路由
+
+每条链可配置多个节点URL（环境变量逗号分隔）。链客户端始终使用第一个URL（主URL）构造请求，
+http_pool 的共享会话在发送前把主URL前缀替换为当前最健康的端点：
+
+- 按端点维护延迟与错误率的 EWMA，选择得分（延迟 × (1 + 错误惩罚 × 错误率)）最低的端点；
+- 连接错误、超时和 429/5xx 视为失败，自动在下一个端点重试；连续失败的端点暂停一段时间；
+- 少量请求随机发往其他端点，使恢复后的端点能重新获得流量；
+- 开启对冲（BLOCKCHAIN_MCP_ROUTER_HEDGE）时，异步请求在超过最近 p95 延迟仍未返回时，
+  向第二个端点发送相同请求，取先返回的结果。本服务只发送只读请求，重复发送是安全的。
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+ROUTER_EWMA_ALPHA = float(os.getenv("BLOCKCHAIN_MCP_ROUTER_EWMA_ALPHA", "0.2"))
+ROUTER_ERROR_PENALTY = float(os.getenv("BLOCKCHAIN_MCP_ROUTER_ERROR_PENALTY", "10"))
+ROUTER_EXPLORE = float(os.getenv("BLOCKCHAIN_MCP_ROUTER_EXPLORE", "0.02"))
+# 连续失败次数达到阈值后暂停该端点的秒数
+ROUTER_MAX_FAILURES = int(os.getenv("BLOCKCHAIN_MCP_ROUTER_MAX_FAILURES", "3"))
+ROUTER_COOLDOWN = float(os.getenv("BLOCKCHAIN_MCP_ROUTER_COOLDOWN", "10"))
+ROUTER_HEDGE = os.getenv("BLOCKCHAIN_MCP_ROUTER_HEDGE", "").strip().lower() in ("1", "true", "yes", "on")
+# 对冲延迟下限；p95 样本不足 HEDGE_MIN_SAMPLES 时不对冲
+HEDGE_MIN_DELAY = float(os.getenv("BLOCKCHAIN_MCP_HEDGE_MIN_DELAY_MS", "20")) / 1000
+HEDGE_MIN_SAMPLES = 20
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_endpoints(value: Optional[str]) -> List[str]:
+    """逗号分隔的URL列表，去除空白与末尾斜杠"""
+    return [url.strip().rstrip("/") for url in (value or "").split(",") if url.strip()]
+
+
+class Endpoint:
+    def __init__(self, url: str, index: int):
+        self.url = url
+        self.index = index
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.samples = deque(maxlen=200)
+        self._p95: Optional[float] = None
+        self._p95_at = 0
+
+    def score(self) -> float:
+        # 尚无样本的端点得分为0，优先探测
+        return (self.latency or 0.0) * (1 + ROUTER_ERROR_PENALTY * self.error_rate)
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < HEDGE_MIN_SAMPLES:
+            return None
+        # 每20个新样本重新计算一次
+        if self._p95 is None or self.requests - self._p95_at >= 20:
+            ordered = sorted(self.samples)
+            self._p95 = ordered[int(len(ordered) * 0.95)]
+            self._p95_at = self.requests
+        return self._p95
+
+    def stats(self, now: float) -> Dict:
+        return {
+            "url": self.url,
+            "ewma_latency_ms": round(self.latency * 1000, 2) if self.latency is not None else None,
+            "ewma_error_rate": round(self.error_rate, 4),
+            "p95_ms": round(self.p95() * 1000, 2) if self.p95() is not None else None,
+            "requests": self.requests,
+            "errors": self.errors,
+            "down_for_seconds": round(max(0.0, self.down_until - now), 1),
+        }
+
+
+class EndpointRouter:
+    def __init__(self, name: str, urls: List[str], hedge: Optional[bool] = None):
+        if not urls:
+            raise ValueError(f"No endpoints configured for {name}")
+        self.name = name
+        self.primary = urls[0]
+        self.endpoints = [Endpoint(url, index) for index, url in enumerate(urls)]
+        self.hedge = (ROUTER_HEDGE if hedge is None else hedge) and len(urls) > 1
+        self.failovers = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def routes(self, url: str) -> bool:
+        return len(self.endpoints) > 1 and url.startswith(self.primary)
+
+    def rewrite(self, url: str, endpoint: Endpoint) -> str:
+        return endpoint.url + url[len(self.primary):]
+
+    def candidates(self) -> List[Endpoint]:
+        """按健康程度排序的端点；暂停中的端点排在最后（全部暂停时仍会尝试）"""
+        now = time.monotonic()
+        with self._lock:
+            ranked = sorted(self.endpoints, key=lambda e: (e.down_until > now, e.score(), e.index))
+            if ROUTER_EXPLORE and self._random.random() < ROUTER_EXPLORE:
+                healthy = [e for e in ranked[1:] if e.down_until <= now]
+                if healthy:
+                    chosen = self._random.choice(healthy)
+                    ranked.remove(chosen)
+                    ranked.insert(0, chosen)
+        return ranked
+
+    def record(self, endpoint: Endpoint, seconds: float, ok: bool):
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.error_rate += ROUTER_EWMA_ALPHA * ((0.0 if ok else 1.0) - endpoint.error_rate)
+            if ok:
+                endpoint.latency = seconds if endpoint.latency is None else (
+                    endpoint.latency + ROUTER_EWMA_ALPHA * (seconds - endpoint.latency)
+                )
+                endpoint.samples.append(seconds)
+                endpoint.failures = 0
+            else:
+                endpoint.errors += 1
+                endpoint.failures += 1
+                if endpoint.failures >= ROUTER_MAX_FAILURES:
+                    endpoint.down_until = time.monotonic() + ROUTER_COOLDOWN
+
+    def hedge_delay(self, endpoint: Endpoint) -> Optional[float]:
+        """对冲等待时间（首选端点最近的 p95 延迟），样本不足或未开启对冲时返回None"""
+        if not self.hedge:
+            return None
+        p95 = endpoint.p95()
+        return max(p95, HEDGE_MIN_DELAY) if p95 is not None else None
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "hedge": self.hedge,
+                "failovers": self.failovers,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "endpoints": [endpoint.stats(now) for endpoint in self.endpoints],
+            }
+
+
+_routers: Dict[str, EndpointRouter] = {}
+
+
+def configure_endpoints(name: str, value: Optional[str]) -> Optional[str]:
+    """
+    解析链的节点URL列表并注册路由器
+    :param value: 逗号分隔的URL（环境变量原值）
+    :return: 主URL（链客户端使用），未配置时返回None
+    """
+    urls = parse_endpoints(value)
+    if not urls:
+        return None
+    router = _routers.get(name)
+    if router is None or [e.url for e in router.endpoints] != urls:
+        _routers[name] = EndpointRouter(name, urls)
+    return urls[0]
+
+
+def get_router(name: str) -> Optional[EndpointRouter]:
+    return _routers.get(name)
+
+
+def router_stats() -> Dict[str, Dict]:
+    return {name: router.stats() for name, router in list(_routers.items())}
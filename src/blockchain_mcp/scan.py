@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+区块范围扫描
+
+生产者按高度把任务放入有界队列，N 个工作协程并发获取区块（经区块缓存），
+每个区块只提取所需的数值字段交给聚合器后即被丢弃，内存占用与区块大小无关。
+"""
+import asyncio
+import math
+import os
+import time
+from array import array
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+SCAN_CONCURRENCY = int(os.getenv("BLOCKCHAIN_MCP_SCAN_CONCURRENCY", "8"))
+SCAN_MAX_BLOCKS = int(os.getenv("BLOCKCHAIN_MCP_SCAN_MAX_BLOCKS", "10000"))
+MAX_REPORTED_ERRORS = 20
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+FieldsFetcher = Callable[[Union[int, str]], Awaitable[Dict[str, float]]]
+
+
+class FieldAggregate:
+    """单个字段的流式聚合：count/sum/min/max 增量计算，分位数基于紧凑的 double 数组"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.values = array("d")
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.values.append(value)
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+        ordered = sorted(self.values)
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": self.total / self.count,
+            "p50": _percentile(ordered, 0.50),
+            "p90": _percentile(ordered, 0.90),
+            "p99": _percentile(ordered, 0.99),
+        }
+
+
+class ScanAggregator:
+    def __init__(self, fields: Optional[Iterable[str]] = None, series: bool = False):
+        self.fields = list(fields) if fields else None
+        self.series = series
+        self.aggregates: Dict[str, FieldAggregate] = {}
+        self.heights = array("q")
+        self.errors: List[Dict[str, str]] = []
+        self.error_count = 0
+
+    def add(self, height: int, values: Dict[str, float]):
+        selected = self.fields or values.keys()
+        for field in selected:
+            value = values.get(field)
+            if value is None:
+                continue
+            self.aggregates.setdefault(field, FieldAggregate()).add(float(value))
+        if self.series:
+            self.heights.append(height)
+
+    def add_error(self, height: int, error: Exception):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"block": height, "error": str(error)})
+
+    def result(self) -> Dict:
+        result = {
+            "fields": {field: aggregate.summary() for field, aggregate in self.aggregates.items()},
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+        if self.series:
+            # 工作协程乱序完成，按高度排序输出
+            order = sorted(range(len(self.heights)), key=self.heights.__getitem__)
+            result["series"] = {"block": [self.heights[i] for i in order]}
+            for field, aggregate in self.aggregates.items():
+                if aggregate.count == len(self.heights):
+                    result["series"][field] = [aggregate.values[i] for i in order]
+        return result
+
+
+def _percentile(ordered, q: float) -> float:
+    """线性插值分位数"""
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * q
+    low = math.floor(position)
+    high = math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+async def scan_blocks(
+    bc,
+    start: int,
+    end: int,
+    fields: Optional[Iterable[str]] = None,
+    concurrency: Optional[int] = None,
+    series: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    fetch: Optional[FieldsFetcher] = None,
+) -> Dict:
+    """
+    并发扫描 [start, end] 区间内的区块并聚合数值字段
+    :param bc: 区块链实例，未指定 fetch 时需实现 get_block_fields_async
+    :param fields: 需要聚合的字段，为空时聚合链返回的全部字段
+    :param concurrency: 并发获取的区块数，默认 SCAN_CONCURRENCY
+    :param series: 是否返回逐块数值序列
+    :param progress: 进度回调 (已完成数, 总数)
+    :param fetch: 按高度获取数值字段的协程函数，默认 bc.get_block_fields_async
+    """
+    if start > end:
+        raise ValueError(f"start ({start}) must not be greater than end ({end})")
+    if start < 0:
+        raise ValueError(f"start must be non-negative, got {start}")
+    total = end - start + 1
+    if total > SCAN_MAX_BLOCKS:
+        raise ValueError(f"Range of {total} blocks exceeds limit of {SCAN_MAX_BLOCKS}")
+    workers = max(1, min(concurrency or SCAN_CONCURRENCY, total))
+    fetch = fetch or bc.get_block_fields_async
+
+    aggregator = ScanAggregator(fields, series)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    done = 0
+
+    async def produce():
+        for height in range(start, end + 1):
+            await queue.put(height)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def work():
+        nonlocal done
+        while True:
+            height = await queue.get()
+            if height is None:
+                return
+            try:
+                aggregator.add(height, await fetch(height))
+            except NotImplementedError:
+                raise
+            except Exception as e:
+                aggregator.add_error(height, e)
+            done += 1
+            if progress is not None:
+                await progress(done, total)
+
+    started = time.perf_counter()
+    tasks = [asyncio.ensure_future(produce())] + [asyncio.ensure_future(work()) for _ in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    elapsed = time.perf_counter() - started
+
+    result = {"blockchain": bc.chain_name, "start": start, "end": end, "blocks": total}
+    result.update(aggregator.result())
+    result["concurrency"] = workers
+    result["elapsed_seconds"] = round(elapsed, 3)
+    result["blocks_per_sec"] = round(total / elapsed, 2) if elapsed > 0 else None
+    return result
@@ -1,15 +1,61 @@
 # -*- coding: utf-8 -*-
-from fastmcp import FastMCP
-from typing import Optional, Union
-from blockchain_mcp.chains_factory import GetBlockChain
+import logging
+import os
+import sys
+from fastmcp import Context, FastMCP
+from typing import List, Optional, Union
+from blockchain_mcp.base import BLOCK_TXS_LIMIT
+from blockchain_mcp.block_cache import BLOCK_CACHE
+from blockchain_mcp.chains_factory import (
+    GetBlockChain, GetConnectionStats, GetEndpointStats, GetHeadStats, StartHeadTracking
+)
+from blockchain_mcp.metrics import METRICS, instrument_tool, start_metrics_server
+from blockchain_mcp.models import DEFAULT_RESPONSE_FORMAT, serialize, validate_format
+from blockchain_mcp.paging import RESPONSE_PAGES
+from blockchain_mcp.price_cache import PRICE_CACHE
+from blockchain_mcp.ratelimit import RATE_LIMITS
+from blockchain_mcp.scan import scan_blocks as scan_block_range
+from blockchain_mcp.singleflight import SINGLE_FLIGHT, normalize_args
+from blockchain_mcp.token_metadata import TOKEN_METADATA
+
+# 日志输出到 stderr，stdio 传输时 stdout 专用于MCP消息
+LOG_LEVEL = os.getenv("BLOCKCHAIN_MCP_LOG_LEVEL", "INFO")
+# stdio：单进程标准输入输出；sse：HTTP/SSE 服务（见 http_server，可多进程）
+TRANSPORT = os.getenv("BLOCKCHAIN_MCP_TRANSPORT", "stdio")
+logger = logging.getLogger(__name__)
 
 mcp = FastMCP("BlockchainMCP", dependencies=["mcp[cli]", "web3"])
 
+
+async def _coalesced(bc, method: str, *args):
+    """相同链、方法和参数的并发调用共享一次上游请求"""
+    key = (bc.chain_name, method) + normalize_args(*args)
+    return await SINGLE_FLIGHT.do(key, lambda: getattr(bc, f"{method}_async")(*args))
+
+
+def _progress(ctx: Optional[Context]):
+    """区块范围工具的进度回调；仅在MCP请求上下文中上报（直接调用工具时没有请求上下文）"""
+    try:
+        ctx.request_context
+    except (AttributeError, ValueError):
+        return None
+
+    async def report(done: int, total: int):
+        # 限制进度通知频率，约每1%或结束时发送一次
+        if done == total or done % max(1, total // 100) == 0:
+            await ctx.report_progress(done, total)
+
+    return report
+
+
 @mcp.tool()
-def get_blockchain_info(
+@instrument_tool
+async def get_blockchain_info(
     blockchain_name: str,
-    block_number: Optional[Union[int, str]] = "latest"
-) -> dict:
+    block_number: Optional[Union[int, str]] = "latest",
+    detail: str = "summary",
+    format: str = DEFAULT_RESPONSE_FORMAT
+) -> str:
     """
     获取区块链最新区块信息（自动处理地址格式）
     
@@ -26,7 +72,13 @@ def get_blockchain_info(
                 "type": ["integer", "string"],
                 "pattern": "^[latest|best]$",
                 "description": "Block number（number or 'latest'or 'best'）"
-            }
+            },
+            "detail": {
+                "type": "string",
+                "enum": ["header", "summary", "full"],
+                "description": "header: 仅区块头; summary: 区块头+交易数（默认）; full: 区块头+交易ID列表"
+            },
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
         },
         "required": ["blockchain_name"， "block_number"],
         "description": "Get the specified block information of the blockchain"
@@ -37,17 +89,19 @@ def get_blockchain_info(
     if block_number is None:
         block_number = "latest"
         
-    print("Parameters: %s, %s"%(blockchain_name, block_number))
+    logger.debug("Parameters: %s, %s, %s", blockchain_name, block_number, detail)
     try:
+        validate_format(format)
         bc = GetBlockChain(blockchain_name)
-        return bc.get_block_info(block_number)
+        return serialize(await _coalesced(bc, "get_block_info", block_number, detail), format)
     except ValueError as ve:
         return f"ValueError: {str(ve)}"
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def get_balance(blockchain_name: str,address: str) -> dict:
+@instrument_tool
+async def get_balance(blockchain_name: str, address: str, format: str = DEFAULT_RESPONSE_FORMAT) -> str:
     """
     获取区块链地址余额（自动处理地址格式，保留5位小数）
     
@@ -63,7 +117,8 @@ def get_balance(blockchain_name: str,address: str) -> dict:
             "address": {
                 "type": "string",
                 "description": "有效的区块链地址"
-            }
+            },
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
         },
         "description": "获取指定区块链地址的余额",
         "required": ["blockchain_name", "address"]
@@ -72,17 +127,19 @@ def get_balance(blockchain_name: str,address: str) -> dict:
     
     try:
         # 获取原始余额
+        validate_format(format)
         bc = GetBlockChain(blockchain_name)
         trimed_address = address.strip()
-        balance = bc.get_balance(trimed_address)
-        return balance
+        balance = await _coalesced(bc, "get_balance", trimed_address)
+        return serialize(balance, format)
     except ValueError as ve:
         return f"ValueError: {str(ve)}"
     except Exception as e:
         return f"Error: {str(e)}"
     
 @mcp.tool()
-def get_transaction(blockchain_name:str, tx_hash:str) -> dict:
+@instrument_tool
+async def get_transaction(blockchain_name: str, tx_hash: str, format: str = DEFAULT_RESPONSE_FORMAT) -> str:
     """
     获取区块链交易详情（自动处理地址格式）
     
@@ -98,7 +155,8 @@ def get_transaction(blockchain_name:str, tx_hash:str) -> dict:
             "tx_hash": {
                 "type": "string",
                 "description": "有效的区块链交易哈希"
-            }
+            },
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
         },
         "description": "获取指定区块链交易的详细信息",
         "required": ["blockchain_name", "tx_hash"]
@@ -106,10 +164,11 @@ def get_transaction(blockchain_name:str, tx_hash:str) -> dict:
     """
     try:
         # 获取原始交易详情
+        validate_format(format)
         bc = GetBlockChain(blockchain_name)
         trimed_tx_hash = tx_hash.strip()
-        transaction = bc.get_transaction(trimed_tx_hash)
-        return transaction
+        transaction = await _coalesced(bc, "get_transaction", trimed_tx_hash)
+        return serialize(transaction, format)
     except ValueError as ve:
         return f"ValueError: {str(ve)}"
     except TypeError as te:
@@ -118,7 +177,234 @@ def get_transaction(blockchain_name:str, tx_hash:str) -> dict:
         return f"Error: {str(e)}"
  
 @mcp.tool()
-def get_price(blockchain_name: str) -> dict:
+@instrument_tool
+async def get_balances(blockchain_name: str, addresses: List[str], format: str = DEFAULT_RESPONSE_FORMAT) -> str:
+    """
+    批量获取多个地址余额（JSON-RPC批量请求，一次往返；Solana 每100个账户合并为一个 getMultipleAccounts 调用），逐项返回结果与错误
+    
+    参数 Schema：
+    {
+        "type": "object",
+        "properties": {
+            "blockchain_name": {
+                "type": "string",
+                "enum": ["bitcoin", "ethereum", "vechain", "solana"],
+                "description": "区块链类型（不区分大小写）"
+            },
+            "addresses": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "区块链地址列表"
+            },
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
+        },
+        "description": "批量获取区块链地址余额",
+        "required": ["blockchain_name", "addresses"]
+    }
+    """
+    try:
+        validate_format(format)
+        bc = GetBlockChain(blockchain_name)
+        trimed_addresses = [address.strip() for address in addresses]
+        return serialize(await _coalesced(bc, "get_balances", trimed_addresses), format)
+    except ValueError as ve:
+        return f"ValueError: {str(ve)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@instrument_tool
+async def get_transactions(blockchain_name: str, tx_hashes: List[str], format: str = DEFAULT_RESPONSE_FORMAT) -> str:
+    """
+    批量获取多笔交易详情（JSON-RPC批量请求，一次往返），逐项返回结果与错误
+    
+    参数 Schema：
+    {
+        "type": "object",
+        "properties": {
+            "blockchain_name": {
+                "type": "string",
+                "enum": ["bitcoin", "ethereum", "vechain", "solana"],
+                "description": "区块链类型（不区分大小写）"
+            },
+            "tx_hashes": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "交易哈希列表"
+            },
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
+        },
+        "description": "批量获取区块链交易详情",
+        "required": ["blockchain_name", "tx_hashes"]
+    }
+    """
+    try:
+        validate_format(format)
+        bc = GetBlockChain(blockchain_name)
+        trimed_tx_hashes = [tx_hash.strip() for tx_hash in tx_hashes]
+        return serialize(await _coalesced(bc, "get_transactions", trimed_tx_hashes), format)
+    except ValueError as ve:
+        return f"ValueError: {str(ve)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@instrument_tool
+async def get_token_balances(
+    blockchain_name: str, address: str, tokens: List[str], format: str = DEFAULT_RESPONSE_FORMAT
+) -> str:
+    """
+    查询地址持有的多个代币余额（Ethereum ERC-20 / Vechain VIP-180），全部 balanceOf 在一次上游请求中完成，
+    代币精度与符号持久缓存
+    
+    参数 Schema：
+    {
+        "type": "object",
+        "properties": {
+            "blockchain_name": {
+                "type": "string",
+                "enum": ["ethereum", "vechain"],
+                "description": "区块链类型（不区分大小写）"
+            },
+            "address": {"type": "string", "description": "持有人地址"},
+            "tokens": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "代币合约地址列表（最多100个）"
+            },
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
+        },
+        "description": "获取地址的代币余额（含代币符号与精度），单个代币失败时只在该项返回 error",
+        "required": ["blockchain_name", "address", "tokens"]
+    }
+    """
+    try:
+        validate_format(format)
+        bc = GetBlockChain(blockchain_name)
+        trimed_tokens = [token.strip() for token in tokens]
+        return serialize(await _coalesced(bc, "get_token_balances", address.strip(), trimed_tokens), format)
+    except ValueError as ve:
+        return f"ValueError: {str(ve)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@instrument_tool
+async def get_signature_statuses(blockchain_name: str, signatures: List[str], format: str = DEFAULT_RESPONSE_FORMAT) -> str:
+    """
+    批量查询交易签名的确认状态（Solana getSignatureStatuses，每次调用最多256个签名，全部在一次往返内完成）
+    
+    参数 Schema：
+    {
+        "type": "object",
+        "properties": {
+            "blockchain_name": {
+                "type": "string",
+                "enum": ["solana"],
+                "description": "区块链类型（不区分大小写）"
+            },
+            "signatures": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "交易签名列表"
+            },
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
+        },
+        "description": "批量查询交易的确认状态（slot、确认数、processed/confirmed/finalized、是否失败）",
+        "required": ["blockchain_name", "signatures"]
+    }
+    """
+    try:
+        validate_format(format)
+        bc = GetBlockChain(blockchain_name)
+        trimed_signatures = [signature.strip() for signature in signatures]
+        return serialize(await _coalesced(bc, "get_signature_statuses", trimed_signatures), format)
+    except ValueError as ve:
+        return f"ValueError: {str(ve)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@instrument_tool
+async def get_address_transactions(
+    blockchain_name: str,
+    address: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    format: str = DEFAULT_RESPONSE_FORMAT
+) -> str:
+    """
+    按时间倒序分页查询地址的交易记录（本地地址索引，目前支持以太坊）
+    
+    参数 Schema：
+    {
+        "type": "object",
+        "properties": {
+            "blockchain_name": {
+                "type": "string",
+                "enum": ["ethereum"],
+                "description": "区块链类型（不区分大小写）"
+            },
+            "address": {"type": "string", "description": "有效的区块链地址"},
+            "limit": {"type": "integer", "description": "每页条数（1-1000，默认20）"},
+            "cursor": {"type": "string", "description": "上一页返回的 next_cursor"},
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
+        },
+        "description": "查询地址的最近交易活动",
+        "required": ["blockchain_name", "address"]
+    }
+    """
+    try:
+        validate_format(format)
+        bc = GetBlockChain(blockchain_name)
+        return serialize(await _coalesced(bc, "get_address_transactions", address.strip(), limit, cursor), format)
+    except ValueError as ve:
+        return f"ValueError: {str(ve)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@instrument_tool
+async def get_block_transactions(
+    blockchain_name: str,
+    block_number: Union[int, str],
+    offset: int = 0,
+    limit: int = BLOCK_TXS_LIMIT,
+    format: str = DEFAULT_RESPONSE_FORMAT
+) -> str:
+    """
+    分页获取区块中的完整交易（整个区块一次上游请求获取并缓存，翻页不再请求节点）
+    
+    参数 Schema：
+    {
+        "type": "object",
+        "properties": {
+            "blockchain_name": {
+                "type": "string",
+                "enum": ["ethereum", "bitcoin", "vechain", "solana"],
+                "description": "区块链类型（不区分大小写）"
+            },
+            "block_number": {"type": ["integer", "string"], "description": "区块高度、区块哈希或链头标签（latest/best）"},
+            "offset": {"type": "integer", "description": "从区块内第几笔交易开始（默认0）"},
+            "limit": {"type": "integer", "description": "每页交易数（1-1000，默认50）"},
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
+        },
+        "description": "获取区块中的交易详情，下一页使用返回的 next_offset",
+        "required": ["blockchain_name", "block_number"]
+    }
+    """
+    try:
+        validate_format(format)
+        bc = GetBlockChain(blockchain_name)
+        return serialize(await _coalesced(bc, "get_block_transactions", block_number, offset, limit), format)
+    except ValueError as ve:
+        return f"ValueError: {str(ve)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@instrument_tool
+async def get_price(blockchain_name: str, format: str = DEFAULT_RESPONSE_FORMAT) -> str:
     """
     获取区块链当前价格（主网代币）
     
@@ -130,7 +416,8 @@ def get_price(blockchain_name: str) -> dict:
                 "type": "string",
                 "enum": ["bitcoin", "ethereum", "vechain", "solana"],
                 "description": "区块链类型（不区分大小写）"
-            }
+            },
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
         },
         "description": "获取指定区块链当前价格",
         "required": ["blockchain_name"]
@@ -138,25 +425,250 @@ def get_price(blockchain_name: str) -> dict:
     """
     try:
         # 获取原始价格
+        validate_format(format)
         bc = GetBlockChain(blockchain_name)
-        price = bc.get_price()
-        return price
+        price = await _coalesced(bc, "get_price")
+        return serialize(price, format)
     except ValueError as ve:
         return f"ValueError: {str(ve)}"
     except Exception as e:
         return f"Error: {str(e)}"
     
 
+@mcp.tool()
+@instrument_tool
+async def scan_blocks(
+    blockchain_name: str,
+    start: int,
+    end: int,
+    fields: Optional[List[str]] = None,
+    concurrency: Optional[int] = None,
+    series: bool = False,
+    format: str = DEFAULT_RESPONSE_FORMAT,
+    ctx: Context = None
+) -> str:
+    """
+    扫描区块范围 [start, end] 并聚合数值字段（sum/mean/min/max/p50/p90/p99），
+    例如区块 N..M 的 gas 利用率或最近1000个区块的交易数
+    
+    参数 Schema：
+    {
+        "type": "object",
+        "properties": {
+            "blockchain_name": {
+                "type": "string",
+                "enum": ["bitcoin", "ethereum", "vechain", "solana"],
+                "description": "区块链类型（不区分大小写）"
+            },
+            "start": {"type": "integer", "description": "起始区块高度（包含）"},
+            "end": {"type": "integer", "description": "结束区块高度（包含）"},
+            "fields": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "聚合字段，如 tx_count/gas_used/gas_utilization/size/timestamp，默认全部"
+            },
+            "concurrency": {"type": "integer", "description": "并发获取的区块数"},
+            "series": {"type": "boolean", "description": "是否返回逐块数值序列"},
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
+        },
+        "description": "区块范围统计分析",
+        "required": ["blockchain_name", "start", "end"]
+    }
+    """
+    try:
+        validate_format(format)
+        bc = GetBlockChain(blockchain_name)
+        return serialize(await scan_block_range(bc, start, end, fields, concurrency, series, _progress(ctx)), format)
+    except ValueError as ve:
+        return f"ValueError: {str(ve)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+@mcp.tool()
+@instrument_tool
+async def get_block_fees(
+    blockchain_name: str,
+    block_number: Union[int, str] = "latest",
+    end: Optional[int] = None,
+    transactions: bool = False,
+    concurrency: Optional[int] = None,
+    format: str = DEFAULT_RESPONSE_FORMAT,
+    ctx: Context = None
+) -> str:
+    """
+    区块手续费分析（以太坊）：每个区块的全部收据一次 eth_getBlockReceipts 获取，
+    计算手续费总额、燃烧的基础费用、给出块者的优先费与按 gas 加权的优先费分位数；
+    指定 end 时统计区块范围 [block_number, end] 内各项的 sum/mean/min/max/p50/p90/p99
+    
+    参数 Schema：
+    {
+        "type": "object",
+        "properties": {
+            "blockchain_name": {
+                "type": "string",
+                "enum": ["ethereum"],
+                "description": "区块链类型（不区分大小写）"
+            },
+            "block_number": {"type": ["integer", "string"], "description": "区块高度、哈希或 latest；指定 end 时为起始高度"},
+            "end": {"type": "integer", "description": "结束区块高度（包含），为空时只分析单个区块"},
+            "transactions": {"type": "boolean", "description": "单个区块时是否返回逐笔交易的手续费"},
+            "concurrency": {"type": "integer", "description": "区块范围时并发获取的区块数"},
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
+        },
+        "description": "区块或区块范围的手续费与燃烧量统计",
+        "required": ["blockchain_name"]
+    }
+    """
+    try:
+        validate_format(format)
+        bc = GetBlockChain(blockchain_name)
+        if end is None:
+            return serialize(await _coalesced(bc, "get_block_fees", block_number, transactions), format)
+        if not isinstance(block_number, int):
+            raise ValueError("block_number must be an integer block height when end is given")
+        result = await scan_block_range(
+            bc, block_number, end, None, concurrency, False, _progress(ctx), fetch=bc.get_block_fee_fields_async
+        )
+        return serialize(result, format)
+    except ValueError as ve:
+        return f"ValueError: {str(ve)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+@mcp.tool()
+@instrument_tool
+async def estimate_fees(blockchain_name: str, format: str = DEFAULT_RESPONSE_FORMAT) -> str:
+    """
+    基于最近区块窗口的手续费估计：基础费用趋势与慢/标准/快三档优先费建议（单位 gas 的 wei）。
+    以太坊来自 eth_feeHistory 的 p10/p50/p90 reward，Vechain 来自 baseGasPrice 与最近区块交易的 gasPriceCoef；
+    窗口随链头增量更新，只获取新区块
+    
+    参数 Schema：
+    {
+        "type": "object",
+        "properties": {
+            "blockchain_name": {
+                "type": "string",
+                "enum": ["ethereum", "vechain"],
+                "description": "区块链类型（不区分大小写）"
+            },
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
+        },
+        "description": "获取当前手续费建议（base_fee/next_base_fee、priority_fee 与 max_fee 三档、基础费用趋势）",
+        "required": ["blockchain_name"]
+    }
+    """
+    try:
+        validate_format(format)
+        bc = GetBlockChain(blockchain_name)
+        return serialize(await _coalesced(bc, "estimate_fees"), format)
+    except ValueError as ve:
+        return f"ValueError: {str(ve)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+@mcp.tool()
+@instrument_tool
+async def get_next_page(cursor: str, format: str = DEFAULT_RESPONSE_FORMAT) -> str:
+    """
+    获取超出响应大小预算的结果的下一页：任一工具的响应带有 page.next_cursor 时，用该游标继续，
+    从服务端保存的结果中取出，不再请求区块链节点
+    
+    参数 Schema：
+    {
+        "type": "object",
+        "properties": {
+            "cursor": {"type": "string", "description": "上一页响应中的 page.next_cursor"},
+            "format": {"type": "string", "enum": ["json", "text"], "description": "json: 紧凑JSON（默认）; text: 便于阅读的文本"}
+        },
+        "description": "续页；page.lists 给出本页各列表的 offset/count/total，最后一页没有 next_cursor",
+        "required": ["cursor"]
+    }
+    """
+    try:
+        validate_format(format)
+        return serialize(RESPONSE_PAGES.next_page(cursor), format, budget=False)
+    except ValueError as ve:
+        return f"ValueError: {str(ve)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+@mcp.resource("stats://connections")
+def connection_stats() -> dict:
+    """各链共享HTTP会话的连接复用计数（requests/connections/reused）"""
+    return GetConnectionStats()
+
+
+@mcp.resource("stats://endpoints")
+def endpoint_stats() -> dict:
+    """多端点链各节点的 EWMA 延迟、错误率、p95、暂停状态与失败切换/对冲计数"""
+    return GetEndpointStats()
+
+
+@mcp.resource("stats://ratelimits")
+def rate_limit_stats() -> dict:
+    """各提供方/端点主机的限流状态：配置与当前速率、暂停时间、排队等待、拒绝、429 与重试计数"""
+    return RATE_LIMITS.stats()
+
+
+@mcp.resource("stats://prices")
+def price_cache_stats() -> dict:
+    """价格缓存命中/未命中、上游请求与合并等待计数"""
+    return PRICE_CACHE.stats()
+
+
+@mcp.resource("stats://tokens")
+def token_metadata_stats() -> dict:
+    """代币元数据（精度、符号）缓存的条目数、命中/未命中与持久化文件路径"""
+    return TOKEN_METADATA.stats()
+
+
+@mcp.resource("stats://pages")
+def page_stats() -> dict:
+    """响应预算与续页：分页的结果数、已返回页数、保存中的结果数与字节数"""
+    return RESPONSE_PAGES.stats()
+
+
+@mcp.resource("stats://blocks")
+def block_cache_stats() -> dict:
+    """区块/交易缓存命中、准入与淘汰计数及内存占用"""
+    return BLOCK_CACHE.stats()
+
+
+@mcp.resource("stats://heads")
+def head_stats() -> dict:
+    """后台链头跟踪状态：当前高度、链头年龄、命中与重组计数"""
+    return GetHeadStats()
+
+
+@mcp.resource("stats://coalescing")
+def coalescing_stats() -> dict:
+    """单飞合并计数：总调用、实际上游执行与被合并的调用数"""
+    return SINGLE_FLIGHT.stats()
+
+
+@mcp.resource("stats://metrics")
+def metrics_stats() -> dict:
+    """各工具与各链上游RPC方法的调用数、错误率、延迟分位数（p50/p90/p99）与收发字节数"""
+    return METRICS.snapshot()
+
+
 @mcp.prompt()
 def generate_claude_prompt() -> str:
     return f"""
     ## 可用工具：
+    所有工具均支持 format 参数：json（紧凑JSON，默认）或 text（便于阅读的文本）
     # get_blockchain_info
     - 功能：查询区块链最新区块信息
     - 参数规范：
       {{
         "blockchain_name": "区块链名称（必填，可选：Ethereum/Bitcoin/Vechain/Solana）",
-        "block_number": "区块编号（可选，默认'latest'）"
+        "block_number": "区块编号（可选，默认'latest'）",
+        "detail": "详细程度（可选，header/summary/full，默认summary）"
       }}
     - 示例请求：
       用户输入："获取以太坊最新区块"
@@ -181,6 +693,81 @@ def generate_claude_prompt() -> str:
     - 示例请求：
       用户输入："获取以太坊地址余额"
       → 生成参数：{{"blockchain_name": "Ethereum", "address": "0x1234567890abcdef"}}
+    get_balances / get_transactions
+    - 功能：批量查询多个地址余额 / 多笔交易详情（一次请求，逐项返回）
+    - 参数规范：
+      {{
+        "blockchain_name": "区块链名称（必填）",
+        "addresses": "地址列表（get_balances）",
+        "tx_hashes": "交易哈希列表（get_transactions）"
+      }}
+    get_token_balances
+    - 功能：查询地址的多个代币余额（Ethereum ERC-20 / Vechain VIP-180）
+    - 参数规范：
+      {{
+        "blockchain_name": "区块链名称（必填，Ethereum/Vechain）",
+        "address": "持有人地址（必填）",
+        "tokens": "代币合约地址列表（必填，最多100个）"
+      }}
+    get_signature_statuses
+    - 功能：批量查询 Solana 交易签名的确认状态（不下载交易本身）
+    - 参数规范：
+      {{
+        "blockchain_name": "区块链名称（必填，Solana）",
+        "signatures": "交易签名列表（必填）"
+      }}
+    get_address_transactions
+    - 功能：分页查询地址的最近交易（以太坊，本地地址索引）
+    - 参数规范：
+      {{
+        "blockchain_name": "区块链名称（必填，Ethereum）",
+        "address": "地址（必填）",
+        "limit": "每页条数（可选，默认20）",
+        "cursor": "上一页返回的 next_cursor（可选）"
+      }}
+    get_block_transactions
+    - 功能：分页获取区块中的完整交易详情（金额、手续费、状态等）
+    - 参数规范：
+      {{
+        "blockchain_name": "区块链名称（必填，可选：Ethereum/Bitcoin/Vechain/Solana）",
+        "block_number": "区块编号或哈希（必填）",
+        "offset": "起始位置（可选，默认0，下一页使用返回的 next_offset）",
+        "limit": "每页条数（可选，默认50）"
+      }}
+    get_block_fees
+    - 功能：以太坊区块（或区块范围）的手续费总额、燃烧量与优先费分位数
+    - 参数规范：
+      {{
+        "blockchain_name": "区块链名称（必填，Ethereum）",
+        "block_number": "区块编号（可选，默认'latest'；指定 end 时为起始高度）",
+        "end": "结束区块高度（可选，指定时统计区块范围）",
+        "transactions": "是否返回逐笔手续费（可选，默认false）"
+      }}
+    get_next_page
+    - 功能：响应过大时按 page.next_cursor 获取下一页（不重新请求节点）
+    - 参数规范：
+      {{
+        "cursor": "上一页响应中的 page.next_cursor（必填）"
+      }}
+    estimate_fees
+    - 功能：当前手续费建议（基础费用趋势，慢/标准/快三档优先费与最高费用）
+    - 参数规范：
+      {{
+        "blockchain_name": "区块链名称（必填，Ethereum/Vechain）"
+      }}
+    scan_blocks
+    - 功能：扫描区块范围并统计数值字段（总和、均值、分位数、吞吐量）
+    - 参数规范：
+      {{
+        "blockchain_name": "区块链名称（必填）",
+        "start": "起始区块高度（必填）",
+        "end": "结束区块高度（必填）",
+        "fields": "聚合字段列表（可选，如 tx_count/gas_utilization）",
+        "series": "是否返回逐块序列（可选）"
+      }}
+    - 示例请求：
+      用户输入："统计以太坊区块 100 到 200 的 gas 利用率"
+      → 生成参数：{{"blockchain_name": "Ethereum", "start": 100, "end": 200, "fields": ["gas_utilization"]}}
     get_price
     - 功能：查询区块链当前价格（主网代币）
     - 参数规范：
@@ -192,6 +779,23 @@ def generate_claude_prompt() -> str:
         → 生成参数：{{"blockchain_name": "Ethereum"}}
     """
  
+def configure_logging():
+    # FastMCP 在创建时已为根日志器安装处理器，force 替换之，使日志级别与格式生效
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=LOG_LEVEL.upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        force=True
+    )
+
+
 def main():
-    print("Start blockchain mcp server.")
+    configure_logging()
+    logger.info("Start blockchain mcp server.")
+    if TRANSPORT.strip().lower() == "sse":
+        from blockchain_mcp.http_server import run_http
+        run_http()
+        return
+    start_metrics_server()
+    StartHeadTracking()
     mcp.run()
\ No newline at end of file
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+跨进程共享缓存
+
+多进程部署时，各工作进程通过同一个 SQLite 文件（WAL 模式，可并发读）共享已最终确定的区块/交易结果
+与价格快照，作为进程内缓存之下的第二层：进程内未命中时先查共享缓存，再请求上游。
+
+值以 pickle 序列化（与进程内缓存保存的上游原始对象一致），文件只应位于服务自身的私有目录中。
+缓存是尽力而为的：数据库繁忙或出错时按未命中处理，不影响请求。按写入顺序淘汰，总大小不超过上限。
+"""
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 共享缓存文件路径；多进程 HTTP 部署未设置时自动使用运行目录中的文件
+SHARED_CACHE_PATH = os.getenv("BLOCKCHAIN_MCP_SHARED_CACHE")
+SHARED_CACHE_MAX_BYTES = int(os.getenv("BLOCKCHAIN_MCP_SHARED_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# 每写入该次数检查一次总大小并淘汰
+EVICT_INTERVAL = 200
+BUSY_TIMEOUT = 1.0
+
+
+class SharedCache:
+    def __init__(self, path: str, max_bytes: int = SHARED_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+        self._connection().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL
+            );
+            """
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """每个线程一个连接；WAL 模式下读写互不阻塞，缓存数据无需持久化保证"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            row = self._connection().execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            value = pickle.loads(row[0]) if row is not None and (row[1] is None or row[1] >= time.time()) else None
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            self._count("errors")
+            logger.debug(f"Shared cache read failed for {key}: {str(e)}")
+            return None
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        写入缓存
+        :param ttl: 存活秒数，为空时只受大小淘汰影响（用于已最终确定的结果）
+        """
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            self._count("errors")
+            return
+        if len(data) > self.max_bytes:
+            return
+        expires_at = time.time() + ttl if ttl else None
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), expires_at)
+            )
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.debug(f"Shared cache write failed for {key}: {str(e)}")
+            return
+        with self._lock:
+            self._stats["writes"] += 1
+            self._writes_since_evict += 1
+            evict = self._writes_since_evict >= EVICT_INTERVAL
+            if evict:
+                self._writes_since_evict = 0
+        if evict:
+            self._evict()
+
+    def _evict(self):
+        """删除过期项，总大小超过上限时按写入顺序删除最早的项"""
+        connection = self._connection()
+        try:
+            removed = connection.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)).rowcount
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                excess, cutoff = total - self.max_bytes, None
+                for rowid, size in connection.execute("SELECT rowid, size FROM entries ORDER BY rowid"):
+                    excess -= size
+                    cutoff = rowid
+                    if excess <= 0:
+                        break
+                removed += connection.execute("DELETE FROM entries WHERE rowid <= ?", (cutoff,)).rowcount
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.debug(f"Shared cache eviction failed: {str(e)}")
+            return
+        with self._lock:
+            self._stats["evictions"] += removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        try:
+            entries, size = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            stats.update(entries=entries, bytes=size)
+        except sqlite3.Error:
+            pass
+        stats["path"] = self.path
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+
+SHARED_CACHE: Optional[SharedCache] = SharedCache(SHARED_CACHE_PATH) if SHARED_CACHE_PATH else None
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+单飞（single-flight）请求合并
+
+相同键的并发请求只执行一次上游调用，结果（或异常）分发给所有等待方。
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+def normalize_args(*args: Any) -> Tuple:
+    """规范化请求参数作为合并键：去除空白，0x十六进制统一小写，列表转为元组"""
+    normalized = []
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.strip()
+            if arg[:2].lower() == "0x":
+                arg = arg.lower()
+        elif isinstance(arg, (list, tuple)):
+            arg = normalize_args(*arg)
+        normalized.append(arg)
+    return tuple(normalized)
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行 fn 或等待相同键的进行中调用
+        :param key: 合并键，通常为 (链名, 方法名, 规范化参数...)
+        :param fn: 返回协程的无参函数，仅在没有进行中调用时执行
+        """
+        self._stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self._stats["executions"] += 1
+            # 独立任务执行：发起方被取消不会影响其他等待方
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        else:
+            self._stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        stats = dict(self._stats)
+        stats["inflight"] = len(self._inflight)
+        return stats
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self._stats["errors"] += 1
+
+
+SINGLE_FLIGHT = SingleFlight()
@@ -1,8 +1,29 @@
 
-from typing import Union
-from blockchain_mcp.base import BaseBlockchain, BlockchainResponse
+from functools import partial
+from typing import Callable, Dict, List, Tuple, Union
+from pydantic import BaseModel
+from blockchain_mcp.base import TRANSACTIONS_DETAIL, BaseBlockchain, BlockchainResponse
+from blockchain_mcp.block_cache import BLOCK_CACHE
+from blockchain_mcp.head_tracker import HEAD_POLL_INTERVAL, HeadTracker
+from blockchain_mcp.http_pool import get_async_session, get_session
+from blockchain_mcp.jsonrpc import RpcCall, RpcResult, batch_call, batch_call_async
+from blockchain_mcp.models import BalanceResult, BlockResult, TransactionResult, to_units
+import aiohttp
+import asyncio
 import requests
 import json
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# getMultipleAccounts / getSignatureStatuses 单次调用的最大条数（节点限制）
+MAX_MULTIPLE_ACCOUNTS = 100
+MAX_SIGNATURE_STATUSES = 256
+# 只做形状校验（Base58 字母数字），避免一个无效项让整组批量调用失败
+ADDRESS_PATTERN = re.compile(r'^[0-9A-Za-z]{32,44}$')
+SIGNATURE_PATTERN = re.compile(r'^[0-9A-Za-z]{64,88}$')
 
 class SolanaBlockchain(BaseBlockchain):
     """
@@ -18,59 +39,63 @@ class SolanaBlockchain(BaseBlockchain):
         """
         super().__init__(rpc_url=url, chain_id=101)
         self.chain_name = "solana"
-    
-    def get_block_info(self, block_identifier: Union[int, str]) -> BlockchainResponse:
+        self.head_tag = "latest"
+        self.session = get_session("solana")
+
+    def _rpc_call(self, payload: dict) -> requests.Response:
+        """Solana JSON-RPC调用（复用共享长连接会话）"""
+        return self.session.post(
+            self.rpc_url,
+            headers={"Content-Type": "application/json"},
+            data=json.dumps(payload),
+            timeout=10
+        )
+
+    async def _rpc_call_async(self, payload: dict) -> tuple:
+        """Solana JSON-RPC异步调用，返回 (状态码, 响应JSON)"""
+        session = get_async_session("solana")
+        async with session.post(
+            self.rpc_url,
+            headers={"Content-Type": "application/json"},
+            data=json.dumps(payload),
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as response:
+            if response.status != 200:
+                return response.status, None
+            return response.status, await response.json(content_type=None)
+
+    def get_block_info(self, block_identifier: Union[int, str], detail: str = "summary") -> BlockchainResponse:
         """
         Get Solana block information.
 
         Args:
-            block_identifier (Union[int, str]): Block height or hash (0x-prefixed string).
+            block_identifier (Union[int, str]): Slot number, or "latest" for the most recent finalized slot.
+            detail (str): header uses transactionDetails "none"; summary and full use "signatures".
 
         Returns:
             BlockchainResponse: Standardized response containing block information.
         """
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "getBlock",
-            "params": [
-                block_identifier,
-                {
-                    "encoding": "json",
-                    "maxSupportedTransactionVersion": 0,
-                    "transactionDetails": "full",  # 可选值：full/accounts/none
-                    "rewards": False
-                }
-            ]
-        }
+        self._validate_detail(detail)
+        formatter = partial(self._format_block, detail=detail)
+        head = self._tracked_head(block_identifier)
+        if head is not None:
+            return self._to_response(200, head, formatter)
 
         try:
-            response = requests.post(
-                self.rpc_url,
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(payload),
-                timeout=10
-            )
-        
-            if response.status_code == 200:
-                data = response.json()
-                content = f"""
-                    blockTime: {data["result"]["blockTime"]},
-                    blockHeight: {data["result"]["blockHeight"]},
-                    blockhash: {data["result"]["blockhash"]},
-                    parentSlot: {data["result"]["parentSlot"]},
-                    previousBlockhash: {data["result"]["previousBlockhash"]},
-                    transactions: {len(data["result"]["transactions"])}
-                """
-                return BlockchainResponse(success=True, data=content, error=None)
-            else:
-                print(f"请求失败，状态码：{response.status_code}")
-                return BlockchainResponse(success=False, data=f"Get请求失败，状态码：{response.status_code}", error=None)
-            
+            if block_identifier == "latest":
+                block_identifier = self._rpc_call(self._slot_payload()).json()["result"]
+            cache_key = self._cache_key(f"block:{self._transaction_details(detail)}", block_identifier)
+            cached = BLOCK_CACHE.get(cache_key)
+            if cached is not None:
+                return self._to_response(200, cached, formatter)
+            response = self._rpc_call(self._block_payload(block_identifier, detail))
+            data = response.json() if response.status_code == 200 else None
+            self._cache_finalized(cache_key, data)
+            return self._to_response(response.status_code, data, formatter)
         except requests.exceptions.RequestException as e:
-            print(f"网络异常：{str(e)}")
-            return BlockchainResponse(success=False, data=None, error=e)
-    
+            logger.error(f"网络异常：{str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
     def get_balance(self, address) -> BlockchainResponse:
         """
         Get the balance of a Solana address.
@@ -81,36 +106,16 @@ class SolanaBlockchain(BaseBlockchain):
         Returns:
             BlockchainResponse: Standardized response containing balance information.
         """
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "getBalance",
-            "params": [address]
-        }
+        payload = self._balance_payload(address)
 
         try:
-            response = requests.post(
-                self.rpc_url,
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(payload),
-                timeout=10
-            )
-        
-            if response.status_code == 200:
-                data = response.json()
-                balance = round(data["result"]["value"] / (10**9), 5)
-                content = f"""
-                    Balance: {balance} SOL
-                """
-                return BlockchainResponse(success=True, data=content, error=None)
-            else:
-                print(f"请求失败，状态码：{response.status_code}")
-                return BlockchainResponse(success=False, data=f"Get请求失败，状态码：{response.status_code}", error=None)
-            
+            response = self._rpc_call(payload)
+            data = response.json() if response.status_code == 200 else None
+            return self._to_response(response.status_code, data, partial(self._format_balance, address=address))
         except requests.exceptions.RequestException as e:
-            print(f"网络异常：{str(e)}")
-            return BlockchainResponse(success=False, data=None, error=e)
-              
+            logger.error(f"网络异常：{str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
     def get_transaction(self, tx_hash)-> BlockchainResponse:
         """
         Get transaction details for a given transaction hash.
@@ -121,46 +126,356 @@ class SolanaBlockchain(BaseBlockchain):
         Returns:
             BlockchainResponse: Standardized response containing transaction information.
         """
-        payload = {
+        cache_key = self._cache_key("tx", tx_hash)
+        cached = BLOCK_CACHE.get(cache_key)
+        if cached is not None:
+            return self._to_response(200, cached, self._format_transaction)
+        payload = self._transaction_payload(tx_hash)
+
+        try:
+            response = self._rpc_call(payload)
+            data = response.json() if response.status_code == 200 else None
+            self._cache_finalized(cache_key, data)
+            return self._to_response(response.status_code, data, self._format_transaction)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"网络异常：{str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+    async def get_block_info_async(self, block_identifier: Union[int, str], detail: str = "summary") -> BlockchainResponse:
+        """get_block_info 的异步版本"""
+        self._validate_detail(detail)
+        formatter = partial(self._format_block, detail=detail)
+        head = self._tracked_head(block_identifier)
+        if head is not None:
+            return self._to_response(200, head, formatter)
+        if block_identifier == "latest":
+            try:
+                block_identifier = await self._latest_slot_async()
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.error(f"网络异常：{str(e)}")
+                return BlockchainResponse(success=False, data=None, error=str(e))
+        return await self._call_async(
+            self._block_payload(block_identifier, detail),
+            formatter,
+            self._cache_key(f"block:{self._transaction_details(detail)}", block_identifier)
+        )
+
+    async def get_balance_async(self, address) -> BlockchainResponse:
+        """get_balance 的异步版本"""
+        return await self._call_async(self._balance_payload(address), partial(self._format_balance, address=address))
+
+    async def get_transaction_async(self, tx_hash) -> BlockchainResponse:
+        """get_transaction 的异步版本"""
+        return await self._call_async(
+            self._transaction_payload(tx_hash), self._format_transaction, self._cache_key("tx", tx_hash)
+        )
+
+    def get_balances(self, addresses: List[str]) -> BlockchainResponse:
+        """
+        Get balances of many addresses, 100 accounts per getMultipleAccounts call.
+
+        All calls go out in a single JSON-RPC batch request; dataSlice keeps account data out of the response.
+        """
+        calls, checked = self._chunked_calls(addresses, self._validate_address, MAX_MULTIPLE_ACCOUNTS, self._multiple_accounts_call)
+        rpc_results = batch_call(self.session, self.rpc_url, calls)
+        return self._chunked_response("address", addresses, checked, MAX_MULTIPLE_ACCOUNTS, rpc_results, self._format_account)
+
+    def get_signature_statuses(self, signatures: List[str]) -> BlockchainResponse:
+        """
+        Get confirmation status of many signatures, 256 per getSignatureStatuses call, in one batch request.
+        """
+        calls, checked = self._chunked_calls(signatures, self._validate_tx_hash, MAX_SIGNATURE_STATUSES, self._signature_statuses_call)
+        rpc_results = batch_call(self.session, self.rpc_url, calls)
+        return self._chunked_response("signature", signatures, checked, MAX_SIGNATURE_STATUSES, rpc_results, self._format_signature_status)
+
+    def get_transactions(self, tx_hashes: List[str]) -> BlockchainResponse:
+        """Get many transactions with a single JSON-RPC batch request."""
+        calls, errors = self._bulk_rpc_calls(tx_hashes, self._transaction_call)
+        rpc_results = batch_call(self.session, self.rpc_url, calls)
+        return self._bulk_rpc_response("tx_hash", tx_hashes, errors, rpc_results, self._format_raw_transaction)
+
+    async def get_balances_async(self, addresses: List[str]) -> BlockchainResponse:
+        """get_balances 的异步版本"""
+        calls, checked = self._chunked_calls(addresses, self._validate_address, MAX_MULTIPLE_ACCOUNTS, self._multiple_accounts_call)
+        rpc_results = await batch_call_async(get_async_session("solana"), self.rpc_url, calls)
+        return self._chunked_response("address", addresses, checked, MAX_MULTIPLE_ACCOUNTS, rpc_results, self._format_account)
+
+    async def get_signature_statuses_async(self, signatures: List[str]) -> BlockchainResponse:
+        """get_signature_statuses 的异步版本"""
+        calls, checked = self._chunked_calls(signatures, self._validate_tx_hash, MAX_SIGNATURE_STATUSES, self._signature_statuses_call)
+        rpc_results = await batch_call_async(get_async_session("solana"), self.rpc_url, calls)
+        return self._chunked_response("signature", signatures, checked, MAX_SIGNATURE_STATUSES, rpc_results, self._format_signature_status)
+
+    async def get_transactions_async(self, tx_hashes: List[str]) -> BlockchainResponse:
+        """get_transactions 的异步版本"""
+        calls, errors = self._bulk_rpc_calls(tx_hashes, self._transaction_call)
+        rpc_results = await batch_call_async(get_async_session("solana"), self.rpc_url, calls)
+        return self._bulk_rpc_response("tx_hash", tx_hashes, errors, rpc_results, self._format_raw_transaction)
+
+    async def _fetch_block_async(self, block_identifier: Union[int, str], detail: str = "summary") -> dict:
+        """Fetch the raw getBlock response through the cache, raising on RPC errors."""
+        # 链头跟踪只保存签名形式的区块，完整交易需另行获取
+        head = self._tracked_head(block_identifier) if detail != TRANSACTIONS_DETAIL else None
+        if head is not None:
+            return head
+        if block_identifier == "latest":
+            block_identifier = await self._latest_slot_async()
+        cache_key = self._cache_key(f"block:{self._transaction_details(detail)}", block_identifier)
+        cached = BLOCK_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        status_code, data = await self._rpc_call_async(self._block_payload(block_identifier, detail))
+        if status_code != 200:
+            raise ValueError(f"Get请求失败，状态码：{status_code}")
+        if data.get("error") or data.get("result") is None:
+            raise ValueError(str(data.get("error") or "Block not found"))
+        self._cache_finalized(cache_key, data)
+        return data
+
+    async def _latest_slot_async(self) -> int:
+        status_code, data = await self._rpc_call_async(self._slot_payload())
+        if status_code != 200 or data.get("error"):
+            raise ValueError(f"getSlot failed: {data.get('error') if data else status_code}")
+        return data["result"]
+
+    async def follow_head(self, tracker: HeadTracker):
+        """Poll getSlot (finalized) and fetch the block whenever the slot advances."""
+        while True:
+            slot = await self._latest_slot_async()
+            if slot == tracker.number:
+                tracker.touch()
+            else:
+                data = await self._fetch_block_async(slot)
+                result = data["result"]
+                tracker.update(slot, result["blockhash"], result["previousBlockhash"], data)
+            await asyncio.sleep(HEAD_POLL_INTERVAL)
+
+    def _block_fields(self, data: dict) -> Dict[str, float]:
+        result = data["result"]
+        return {
+            "number": result["blockHeight"],
+            "timestamp": result["blockTime"],
+            "tx_count": len(result.get("signatures", [])),
+        }
+
+    async def _call_async(self, payload: dict, formatter: Callable[[dict], BaseModel], cache_key: tuple = None) -> BlockchainResponse:
+        if cache_key is not None:
+            cached = BLOCK_CACHE.get(cache_key)
+            if cached is not None:
+                return self._to_response(200, cached, formatter)
+        try:
+            status_code, data = await self._rpc_call_async(payload)
+            if cache_key is not None:
+                self._cache_finalized(cache_key, data)
+            return self._to_response(status_code, data, formatter)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"网络异常：{str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+    def _cache_finalized(self, cache_key: tuple, data: dict):
+        """请求使用 finalized 承诺级别，有结果即不会再变化"""
+        if data and data.get("result") is not None and not data.get("error"):
+            BLOCK_CACHE.put(cache_key, data, final=True)
+
+    def _to_response(self, status_code: int, data: dict, formatter: Callable[[dict], BaseModel]) -> BlockchainResponse:
+        if status_code == 200:
+            if data.get("error"):
+                return BlockchainResponse(success=False, data=None, error=str(data["error"]))
+            if data.get("result") is None:
+                return BlockchainResponse(success=True, data="Not found", error=None)
+            return BlockchainResponse(success=True, data=formatter(data), error=None)
+        else:
+            logger.error(f"请求失败，状态码：{status_code}")
+            return BlockchainResponse(success=False, data=f"Get请求失败，状态码：{status_code}", error=None)
+
+    @staticmethod
+    def _transaction_details(detail: str) -> str:
+        if detail == TRANSACTIONS_DETAIL:
+            return "full"
+        return "none" if detail == "header" else "signatures"
+
+    def _block_payload(self, block_identifier: Union[int, str], detail: str = "summary") -> dict:
+        return {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getBlock",
+            "params": [
+                block_identifier,
+                {
+                    "encoding": "json",
+                    "commitment": "finalized",
+                    "maxSupportedTransactionVersion": 0,
+                    "transactionDetails": self._transaction_details(detail),  # 可选值：full/accounts/signatures/none
+                    "rewards": False
+                }
+            ]
+        }
+
+    def _slot_payload(self) -> dict:
+        return {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getSlot",
+            "params": [{"commitment": "finalized"}]
+        }
+
+    def _balance_payload(self, address) -> dict:
+        return {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getBalance",
+            "params": [address]
+        }
+
+    def _transaction_payload(self, tx_hash) -> dict:
+        return {
             "jsonrpc": "2.0",
             "id": 1,
             "method": "getTransaction",
-            "params": [tx_hash]
+            # 未声明 maxSupportedTransactionVersion 时节点拒绝返回 v0 交易
+            "params": [tx_hash, {"encoding": "json", "commitment": "finalized", "maxSupportedTransactionVersion": 0}]
         }
 
-        try:
-            response = requests.post(
-                self.rpc_url,
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(payload),
-                timeout=10
-            )
-        
-            if response.status_code == 200:
-                data = response.json()
-                print(f"Transaction: {data}")
-                content = f"""
-                    Transaction: {data["result"]}
-                """
-                return BlockchainResponse(success=True, data=content, error=None)
+    @staticmethod
+    def _multiple_accounts_call(addresses: List[str]) -> RpcCall:
+        # dataSlice 长度为0：只需要 lamports，不下载账户数据
+        return "getMultipleAccounts", [addresses, {"encoding": "base64", "dataSlice": {"offset": 0, "length": 0}}]
+
+    @staticmethod
+    def _signature_statuses_call(signatures: List[str]) -> RpcCall:
+        return "getSignatureStatuses", [signatures, {"searchTransactionHistory": True}]
+
+    def _validate_address(self, address: str):
+        if not isinstance(address, str) or not ADDRESS_PATTERN.match(address):
+            raise ValueError(f"Invalid Solana address: {address}")
+
+    def _validate_tx_hash(self, tx_hash: str):
+        if not isinstance(tx_hash, str) or not SIGNATURE_PATTERN.match(tx_hash):
+            raise ValueError(f"Invalid Solana signature: {tx_hash}")
+
+    @staticmethod
+    def _chunked_calls(
+        items: List[str], validate: Callable[[str], None], size: int, to_call: Callable[[List[str]], RpcCall]
+    ) -> Tuple[List[RpcCall], Dict[int, Union[str, None]]]:
+        """
+        把通过校验的项按 size 分组，每组生成一个数组参数的调用
+        :return: (调用列表, {项序号: 错误信息，通过校验的项为None})
+        """
+        checked = {}
+        for index, item in enumerate(items):
+            try:
+                validate(item)
+                checked[index] = None
+            except ValueError as e:
+                checked[index] = str(e)
+        valid = [items[index] for index, error in checked.items() if error is None]
+        return [to_call(valid[i:i + size]) for i in range(0, len(valid), size)], checked
+
+    def _chunked_response(
+        self,
+        key: str,
+        items: List[str],
+        checked: Dict[int, Union[str, None]],
+        size: int,
+        rpc_results: List[RpcResult],
+        formatter: Callable[[str, Union[dict, None]], BlockchainResponse],
+    ) -> BlockchainResponse:
+        """将分组调用结果（result.value 与参数数组一一对应）展开为逐项结果，与 _chunked_calls 配合使用"""
+        values = []
+        for rpc_result in rpc_results:
+            value = (rpc_result.result or {}).get("value") if not rpc_result.error else None
+            if value is None:
+                error = rpc_result.error or "Invalid response"
+                values.extend([BlockchainResponse(success=False, data=None, error=error)] * size)
             else:
-                print(f"请求失败，状态码：{response.status_code}")
-                return BlockchainResponse(success=False, data=f"Get请求失败，状态码：{response.status_code}", error=None)
-            
-        except requests.exceptions.RequestException as e:
-            print(f"网络异常：{str(e)}")
-            return BlockchainResponse(success=False, data=None, error=e)       
-            
-            
+                values.extend(value)
+        pending = iter(values)
+        responses = []
+        for index, item in enumerate(items):
+            if checked[index] is not None:
+                responses.append(BlockchainResponse(success=False, data=None, error=checked[index]))
+                continue
+            value = next(pending)
+            responses.append(value if isinstance(value, BlockchainResponse) else formatter(item, value))
+        return self._bulk_response(key, items, responses)
+
+    def _format_account(self, address: str, account: Union[dict, None]) -> BlockchainResponse:
+        """不存在的账户（null）余额为0，与 getBalance 一致"""
+        lamports = account["lamports"] if account else 0
+        return BlockchainResponse(success=True, data=self._format_balance({"result": {"value": lamports}}, address), error=None)
+
+    @staticmethod
+    def _format_signature_status(signature: str, status: Union[dict, None]) -> BlockchainResponse:
+        if status is None:
+            return BlockchainResponse(success=False, data="Not found", error="Not found")
+        data = {
+            "slot": status["slot"],
+            "confirmations": status.get("confirmations"),
+            "confirmation_status": status.get("confirmationStatus"),
+            "status": "failed" if status.get("err") else "success",
+            "err": status.get("err"),
+        }
+        return BlockchainResponse(success=True, data=data, error=None)
+
+    def _transaction_call(self, tx_hash) -> RpcCall:
+        payload = self._transaction_payload(tx_hash)
+        return payload["method"], payload["params"]
+
+    def _format_raw_transaction(self, tx_hash, result: dict) -> TransactionResult:
+        return self._format_transaction({"result": result})
+
+    def _format_block(self, data: dict, detail: str = "summary") -> BlockResult:
+        block = data["result"]
+        result = BlockResult(
+            chain=self.chain_name,
+            number=block["blockHeight"],
+            hash=block["blockhash"],
+            parent_hash=block["previousBlockhash"],
+            timestamp=block["blockTime"],
+            extra={"parent_slot": block["parentSlot"]}
+        )
+        if detail != "header":
+            result.tx_count = len(block["signatures"])
+        if detail == "full":
+            result.transactions = block["signatures"]
+        return result
+
+    def _format_balance(self, data: dict, address: str = None) -> BalanceResult:
+        return BalanceResult(
+            chain=self.chain_name, address=address, balance=to_units(data["result"]["value"], 9), symbol="SOL"
+        )
+
+    def _block_transactions(self, data: dict) -> list:
+        return data["result"]["transactions"]
+
+    def _format_block_transaction(self, data: dict, tx: dict) -> TransactionResult:
+        """getBlock 的结果不含 slot（跳过的 slot 使 parentSlot+1 不可靠），交易只带区块哈希和出块时间"""
+        result = self._format_transaction({"result": dict(tx, blockTime=data["result"].get("blockTime"))})
+        result.block_hash = data["result"].get("blockhash")
+        return result
+
+    def _format_transaction(self, data: dict) -> TransactionResult:
+        result = data["result"]
+        meta = result.get("meta") or {}
+        message = result["transaction"]["message"]
+        account_keys = message.get("accountKeys", [])
+        return TransactionResult(
+            chain=self.chain_name,
+            hash=result["transaction"]["signatures"][0],
+            block_number=result.get("slot"),
+            from_address=account_keys[0] if account_keys else None,
+            fee=to_units(meta["fee"], 9) if "fee" in meta else None,
+            status="failed" if meta.get("err") else "success",
+            symbol="SOL",
+            extra={"block_time": result.get("blockTime"), "meta": meta, "message": message}
+        )
+
+
 if __name__ == "__main__":
-    # Example usage
-    solana = SolanaBlockchain("https://api.mainnet-beta.solana.com")
-    block_info = solana.get_block_info(330047999)
-    print(block_info)
-    # transaction_info = solana.get_transaction("2qCLFR5VHUWWGCMSmX29mymAW2efjVZG8gL4LYe7jWPeceneC7FyeX6asZj6bLFxrHbrgGx4VK3uepUwF9fhcRDz")
-    # print(transaction_info)
-    balance_info = solana.get_balance("3wf3Ttu4UhGC6ff1N7NVruXjdhsiP2CgPDMo4qhBApK9")
-    print(balance_info)
-    
-    price_info = solana.get_price()
-    print(price_info)
\ No newline at end of file
+    # 本地调试可先运行 python benchmarks/mock_nodes.py 并按其输出设置环境变量，避免访问主网
+    SOLANA_NODE_URL = os.getenv("SOLANA_NODE_URL")
+    if not SOLANA_NODE_URL:
+        raise ValueError("SOLANA_NODE_URL environment variable is not set")
+    solana = SolanaBlockchain(SOLANA_NODE_URL)
+    print(solana.get_block_info("latest"))
+    print(solana.get_balance("3wf3Ttu4UhGC6ff1N7NVruXjdhsiP2CgPDMo4qhBApK9"))
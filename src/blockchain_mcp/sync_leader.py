@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+后台同步者选举
+
+本地索引（以太坊地址索引、比特币UTXO索引）的文件只能由一个进程写入。多个工作进程（或多个服务实例）
+打开同一索引时，持有锁文件独占 flock 的进程负责同步，直到进程退出；其他进程只读，
+并定期尝试接管（同步进程退出后操作系统释放锁）。
+"""
+import logging
+from typing import IO, Optional
+
+try:
+    import fcntl
+except ImportError:  # 非 POSIX 平台不支持 flock，按单进程部署处理
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SyncLeader:
+    def __init__(self, path: str):
+        self.path = path
+        self._handle: Optional[IO] = None
+
+    @property
+    def held(self) -> bool:
+        return self._handle is not None or fcntl is None
+
+    def acquire(self) -> bool:
+        """尝试成为同步者（不阻塞），已经持有时直接返回 True"""
+        if self.held:
+            return True
+        handle = open(self.path, "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._handle = handle
+        logger.info(f"Acquired sync lock {self.path}")
+        return True
+
+    def release(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
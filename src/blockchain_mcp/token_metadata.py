@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+代币元数据持久化缓存
+
+代币合约的 decimals/symbol 部署后不会改变，每个代币只需向节点查询一次。
+元数据保存在进程内字典中，并写入 SQLite 文件（WAL 模式，可多进程共享），第一次使用时载入（导入模块不访问文件系统）；
+进程内未命中时再查文件（其他工作进程可能已写入），仍未命中才需要请求节点。
+文件不可用时退化为只在进程内缓存，不影响请求。
+同一合约地址在不同网络上可能是不同的代币，记录带有该链节点URL的摘要（与磁盘预热缓存相同），
+更换节点（测试网、分叉、模拟节点）后不会读到其他网络的元数据。
+"""
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+
+from blockchain_mcp.warm_cache import node_namespace
+
+logger = logging.getLogger(__name__)
+
+# 元数据文件路径，设置为空字符串时只在进程内缓存
+TOKEN_METADATA_PATH = os.getenv(
+    "BLOCKCHAIN_MCP_TOKEN_METADATA",
+    os.path.join(os.path.expanduser("~"), ".cache", "blockchain_mcp", "token_metadata.sqlite")
+)
+BUSY_TIMEOUT = 1.0
+
+# (decimals, symbol)；symbol 无法解码时为 None
+TokenMetadata = Tuple[int, Optional[str]]
+
+
+class TokenMetadataCache:
+    def __init__(self, path: Optional[str] = TOKEN_METADATA_PATH):
+        self.path = path or None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (节点URL摘要, 链, 小写代币地址) -> 元数据
+        self._entries: Dict[Tuple[str, str, str], TokenMetadata] = {}
+        self._stats = {"hits": 0, "misses": 0, "loaded": 0, "writes": 0, "errors": 0}
+        self._loaded = False
+
+    def _load(self):
+        """第一次使用时创建文件并载入全部元数据；文件不可用时只在进程内缓存"""
+        with self._lock:
+            if self._loaded:
+                return
+            if self.path is not None:
+                try:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    connection = self._connection()
+                    # 旧版本的 tokens 表不区分网络，无法判断记录来自哪个节点，直接丢弃
+                    connection.execute("DROP TABLE IF EXISTS tokens")
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS network_tokens ("
+                        "network TEXT NOT NULL, chain TEXT NOT NULL, token TEXT NOT NULL, decimals INTEGER NOT NULL, symbol TEXT, "
+                        "PRIMARY KEY (network, chain, token))"
+                    )
+                    rows = connection.execute("SELECT network, chain, token, decimals, symbol FROM network_tokens")
+                    for network, chain, token, decimals, symbol in rows:
+                        self._entries[(network, chain, token)] = (decimals, symbol)
+                    self._stats["loaded"] = len(self._entries)
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(f"Token metadata file {self.path} unavailable, caching in memory only: {str(e)}")
+                    self.path = None
+            self._loaded = True
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, chain: str, token: str) -> Optional[TokenMetadata]:
+        if not self._loaded:
+            self._load()
+        key = (node_namespace(chain), chain, token.lower())
+        with self._lock:
+            metadata = self._entries.get(key)
+        if metadata is None and self.path is not None:
+            try:
+                row = self._connection().execute(
+                    "SELECT decimals, symbol FROM network_tokens WHERE network = ? AND chain = ? AND token = ?", key
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._count("errors")
+                logger.debug(f"Token metadata read failed for {key}: {str(e)}")
+                row = None
+            if row is not None:
+                metadata = (row[0], row[1])
+                with self._lock:
+                    self._entries[key] = metadata
+        self._count("hits" if metadata is not None else "misses")
+        return metadata
+
+    def put(self, chain: str, token: str, decimals: int, symbol: Optional[str]):
+        if not self._loaded:
+            self._load()
+        key = (node_namespace(chain), chain, token.lower())
+        with self._lock:
+            self._entries[key] = (decimals, symbol)
+            self._stats["writes"] += 1
+        if self.path is None:
+            return
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO network_tokens (network, chain, token, decimals, symbol) VALUES (?, ?, ?, ?, ?)",
+                key + (decimals, symbol)
+            )
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.debug(f"Token metadata write failed for {key}: {str(e)}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries))
+        stats["path"] = self.path
+        return stats
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+
+TOKEN_METADATA = TokenMetadataCache()
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+比特币本地 UTXO 索引
+
+通过 ``getblock <hash> 2`` 逐块摄入区块，在 SQLite 中维护 地址→余额 和未花费输出表，
+任意地址的余额查询只读取一行主键记录，无需访问节点。
+每个区块花费掉的输出记录在 undo 表中，重组时逐块回滚到分叉点后再沿新链摄入。
+多个进程打开同一数据库时只有持有 ``<路径>.lock`` 的进程同步（见 sync_leader 模块），其他进程只读。
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from blockchain_mcp.jsonrpc import RpcCall, batch_call
+from blockchain_mcp.sync_leader import SyncLeader
+
+logger = logging.getLogger(__name__)
+
+# 从该高度开始建立索引；非0时早于该高度创建的输出不计入余额
+UTXO_INDEX_START = int(os.getenv("BITCOIN_UTXO_INDEX_START", "0"))
+# 保留 undo 记录的区块数，即可回滚的最大重组深度
+UTXO_UNDO_DEPTH = int(os.getenv("BITCOIN_UTXO_UNDO_DEPTH", "100"))
+UTXO_SYNC_BATCH = int(os.getenv("BITCOIN_UTXO_SYNC_BATCH", "20"))
+UTXO_SYNC_INTERVAL = float(os.getenv("BITCOIN_UTXO_SYNC_INTERVAL", "30"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (height INTEGER PRIMARY KEY, hash TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS utxos (
+    txid TEXT NOT NULL, vout INTEGER NOT NULL, address TEXT NOT NULL, value INTEGER NOT NULL, height INTEGER NOT NULL,
+    PRIMARY KEY (txid, vout)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS utxos_height ON utxos (height);
+CREATE TABLE IF NOT EXISTS balances (
+    address TEXT PRIMARY KEY, balance INTEGER NOT NULL, utxo_count INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS undo (
+    height INTEGER NOT NULL, txid TEXT NOT NULL, vout INTEGER NOT NULL,
+    address TEXT NOT NULL, value INTEGER NOT NULL, created_height INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS undo_height ON undo (height);
+"""
+
+
+class UtxoIndexError(Exception):
+    """索引无法继续同步（节点错误或重组深度超出 undo 记录）"""
+
+
+class ReorgDetected(Exception):
+    """待摄入区块与索引链头不连续"""
+
+
+def output_address(output: dict) -> Optional[str]:
+    script = output.get("scriptPubKey", {})
+    if "address" in script:
+        return script["address"]
+    addresses = script.get("addresses")
+    # OP_RETURN、裸多签等没有单一地址的输出不计入索引
+    return addresses[0] if addresses and len(addresses) == 1 else None
+
+
+def _to_satoshi(value: float) -> int:
+    return int(round(value * 1e8))
+
+
+class UtxoIndex:
+    def __init__(self, path: str, start_height: int = UTXO_INDEX_START, undo_depth: int = UTXO_UNDO_DEPTH):
+        self.path = path
+        self.start_height = start_height
+        self.undo_depth = undo_depth
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # 写入（摄入/回滚）与读取共用连接，由锁串行化；同步流程另有锁保证只有一个同步者
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._leader = SyncLeader(path + ".lock")
+        self._thread: Optional[threading.Thread] = None
+        self._last_error: Optional[str] = None
+        self._stats = {"blocks": 0, "transactions": 0, "rollbacks": 0, "lookups": 0, "errors": 0}
+
+    def tip(self) -> Optional[Tuple[int, str]]:
+        """已索引的最高区块 (高度, 哈希)，索引为空时返回None"""
+        with self._lock:
+            return self._conn.execute("SELECT height, hash FROM blocks ORDER BY height DESC LIMIT 1").fetchone()
+
+    def balance(self, address: str) -> Tuple[int, int]:
+        """返回地址的 (余额satoshi, UTXO数量)"""
+        with self._lock:
+            self._stats["lookups"] += 1
+            row = self._conn.execute(
+                "SELECT balance, utxo_count FROM balances WHERE address = ?", (address,)
+            ).fetchone()
+        return row if row is not None else (0, 0)
+
+    def apply_block(self, block: dict):
+        """
+        摄入一个 verbosity=2 的区块：删除被花费的输出（记入undo），写入新输出，更新地址余额
+        :raises ReorgDetected: 区块高度或父哈希与索引链头不连续
+        """
+        height = block["height"]
+        deltas: Dict[str, List[int]] = {}
+        with self._lock:
+            tip = self._conn.execute("SELECT height, hash FROM blocks ORDER BY height DESC LIMIT 1").fetchone()
+            if tip is not None and (height != tip[0] + 1 or block.get("previousblockhash") != tip[1]):
+                raise ReorgDetected(f"Block {height} does not extend indexed tip {tip[0]}")
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                cursor.execute("INSERT INTO blocks (height, hash) VALUES (?, ?)", (height, block["hash"]))
+                for tx in block["tx"]:
+                    for vin in tx.get("vin", []):
+                        if "coinbase" in vin:
+                            continue
+                        spent = cursor.execute(
+                            "DELETE FROM utxos WHERE txid = ? AND vout = ? RETURNING address, value, height",
+                            (vin["txid"], vin["vout"])
+                        ).fetchone()
+                        if spent is None:
+                            continue
+                        address, value, created_height = spent
+                        cursor.execute(
+                            "INSERT INTO undo (height, txid, vout, address, value, created_height) VALUES (?, ?, ?, ?, ?, ?)",
+                            (height, vin["txid"], vin["vout"], address, value, created_height)
+                        )
+                        delta = deltas.setdefault(address, [0, 0])
+                        delta[0] -= value
+                        delta[1] -= 1
+                    outputs = []
+                    for output in tx.get("vout", []):
+                        address = output_address(output)
+                        if address is None:
+                            continue
+                        value = _to_satoshi(output["value"])
+                        outputs.append((tx["txid"], output["n"], address, value, height))
+                        delta = deltas.setdefault(address, [0, 0])
+                        delta[0] += value
+                        delta[1] += 1
+                    # 同一区块内后续交易可能花费这些输出，需逐笔写入
+                    cursor.executemany(
+                        "INSERT OR REPLACE INTO utxos (txid, vout, address, value, height) VALUES (?, ?, ?, ?, ?)",
+                        outputs
+                    )
+                self._apply_deltas(cursor, deltas)
+                cursor.execute("DELETE FROM undo WHERE height <= ?", (height - self.undo_depth,))
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            self._stats["blocks"] += 1
+            self._stats["transactions"] += len(block["tx"])
+
+    def rollback(self) -> int:
+        """回滚索引链头区块，返回被回滚的高度"""
+        with self._lock:
+            tip = self._conn.execute("SELECT height FROM blocks ORDER BY height DESC LIMIT 1").fetchone()
+            if tip is None:
+                raise UtxoIndexError("Nothing to roll back")
+            height = tip[0]
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                deltas: Dict[str, List[int]] = {}
+                for address, value in cursor.execute(
+                    "DELETE FROM utxos WHERE height = ? RETURNING address, value", (height,)
+                ).fetchall():
+                    delta = deltas.setdefault(address, [0, 0])
+                    delta[0] -= value
+                    delta[1] -= 1
+                # 同一区块内创建又花费的输出无需恢复
+                restored = cursor.execute(
+                    "SELECT txid, vout, address, value, created_height FROM undo WHERE height = ? AND created_height < ?",
+                    (height, height)
+                ).fetchall()
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO utxos (txid, vout, address, value, height) VALUES (?, ?, ?, ?, ?)", restored
+                )
+                for _, _, address, value, _ in restored:
+                    delta = deltas.setdefault(address, [0, 0])
+                    delta[0] += value
+                    delta[1] += 1
+                self._apply_deltas(cursor, deltas)
+                cursor.execute("DELETE FROM undo WHERE height = ?", (height,))
+                cursor.execute("DELETE FROM blocks WHERE height = ?", (height,))
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            self._stats["rollbacks"] += 1
+            return height
+
+    def sync(self, session: requests.Session, url: str, batch_size: int = UTXO_SYNC_BATCH) -> int:
+        """
+        追到节点链头：先回滚到与节点一致的分叉点，再批量获取区块哈希和区块摄入
+        :return: 本次摄入的区块数
+        """
+        if not self._leader.acquire():
+            raise UtxoIndexError("Index is synced by another process")
+        with self._sync_lock:
+            ingested = 0
+            node_tip = self._call(session, url, [("getblockcount", [])])[0]
+            self._rewind_to_fork(session, url, node_tip)
+            while True:
+                tip = self.tip()
+                next_height = tip[0] + 1 if tip else self.start_height
+                if next_height > node_tip:
+                    return ingested
+                heights = range(next_height, min(next_height + batch_size, node_tip + 1))
+                hashes = self._call(session, url, [("getblockhash", [height]) for height in heights], batch_size)
+                blocks = self._call(session, url, [("getblock", [block_hash, 2]) for block_hash in hashes], batch_size)
+                try:
+                    for block in blocks:
+                        self.apply_block(block)
+                        ingested += 1
+                except ReorgDetected:
+                    node_tip = self._call(session, url, [("getblockcount", [])])[0]
+                    self._rewind_to_fork(session, url, node_tip)
+
+    def follow(self, session: requests.Session, url: str, interval: float = UTXO_SYNC_INTERVAL):
+        """在后台线程中持续同步；其他进程正在同步时只读（WAL 下可直接读到其提交），同步进程退出后接管"""
+        if self._thread is not None:
+            return
+
+        def _run():
+            while True:
+                try:
+                    if self._leader.acquire():
+                        self.sync(session, url)
+                    self._last_error = None
+                except Exception as e:
+                    logger.error(f"UTXO index sync error: {str(e)}")
+                    self._stats["errors"] += 1
+                    self._last_error = str(e)
+                time.sleep(interval)
+
+        self._thread = threading.Thread(target=_run, name="utxo-index", daemon=True)
+        self._thread.start()
+
+    def stats(self) -> Dict:
+        tip = self.tip()
+        stats = dict(self._stats)
+        stats["height"] = tip[0] if tip else None
+        stats["role"] = "writer" if self._leader.held else "reader"
+        stats["last_error"] = self._last_error
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        self._leader.release()
+
+    def _rewind_to_fork(self, session: requests.Session, url: str, node_tip: int):
+        """逐块回滚，直到索引链头哈希与节点同高度的区块哈希一致"""
+        rolled_back = 0
+        while True:
+            tip = self.tip()
+            if tip is None:
+                return
+            # 高于节点链头的区块必然已被重组掉；其余高度出错时直接抛出，不因网络故障误回滚
+            if tip[0] <= node_tip and self._call(session, url, [("getblockhash", [tip[0]])])[0] == tip[1]:
+                return
+            if rolled_back >= self.undo_depth:
+                raise UtxoIndexError(f"Reorg deeper than {self.undo_depth} blocks, index must be rebuilt")
+            logger.info(f"UTXO index rolling back block {tip[0]}")
+            self.rollback()
+            rolled_back += 1
+
+    @staticmethod
+    def _call(session: requests.Session, url: str, calls: Iterable[RpcCall], batch_size: Optional[int] = None) -> list:
+        results = batch_call(session, url, list(calls), max_batch_size=batch_size, version="1.0", timeout=60)
+        for result in results:
+            if result.error is not None:
+                raise UtxoIndexError(result.error)
+        return [result.result for result in results]
+
+    @staticmethod
+    def _apply_deltas(cursor: sqlite3.Cursor, deltas: Dict[str, List[int]]):
+        cursor.executemany(
+            "INSERT INTO balances (address, balance, utxo_count) VALUES (?, ?, ?) "
+            "ON CONFLICT (address) DO UPDATE SET balance = balance + excluded.balance, "
+            "utxo_count = utxo_count + excluded.utxo_count",
+            [(address, value, count) for address, (value, count) in deltas.items() if value or count]
+        )
+        cursor.executemany(
+            "DELETE FROM balances WHERE address = ? AND utxo_count = 0",
+            [(address,) for address, (_, count) in deltas.items() if count < 0]
+        )
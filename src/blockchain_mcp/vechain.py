@@ -1,10 +1,30 @@
+import asyncio
+import json
+import logging
 import os
 import re
-from typing import Union
+from typing import Dict, List, Optional, Tuple, Union
 
+import aiohttp
 import requests
 
-from blockchain_mcp.base import BlockchainResponse, BaseBlockchain
+from blockchain_mcp.base import TRANSACTIONS_DETAIL, BlockchainResponse, BaseBlockchain
+from blockchain_mcp.block_cache import BLOCK_CACHE
+from blockchain_mcp.erc20 import decode_uint
+from blockchain_mcp.fee_history import REWARD_PERCENTILES, FeeWindow
+from blockchain_mcp.fees import weighted_percentiles
+from blockchain_mcp.head_tracker import HeadTracker
+from blockchain_mcp.http_pool import get_async_session, get_session
+from blockchain_mcp.jsonrpc import RpcResult
+from blockchain_mcp.models import BalanceResult, BlockResult, FeeEstimateResult, TransactionResult, to_units
+
+logger = logging.getLogger(__name__)
+
+BLOCK_TAGS = ("best", "finalized")
+# 内置 Params 合约的 get(bytes32) 调用，读取治理参数 base-gas-price
+# （键与 thor 的 BytesToBytes32 一致，左侧补零）
+PARAMS_ADDRESS = "0x0000000000000000000000000000506172616d73"
+BASE_GAS_PRICE_DATA = "0x8eaa6ac0" + b"base-gas-price".hex().rjust(64, "0")
 
 
 class Vechain(BaseBlockchain):
@@ -14,7 +34,11 @@ class Vechain(BaseBlockchain):
     def __init__(self, url: str):
         super().__init__(url, 42)
         self.chain_name = "vechain"
-        self.session = requests.Session()
+        self.head_tag = "best"
+        self.token_standard = "VIP-180"
+        self.session = get_session("vechain")
+        self._finalized_number = -1
+        self.fee_window = FeeWindow()
         
         # 配置默认请求头
         self.headers = {
@@ -22,48 +46,32 @@ class Vechain(BaseBlockchain):
             'User-Agent': 'Vechain-Client/1.0'
         }
         
-    def get_block_info(self, block_identifier: Union[int, str])->BlockchainResponse:
+    def get_block_info(self, block_identifier: Union[int, str], detail: str = "summary")->BlockchainResponse:
         """
-        获取Vechain区块信息
+        获取Vechain区块信息（均使用非expanded形式）
         :param block_identifier: 区块高度或哈希（0x开头字符串）
+        :param detail: header/summary/full
         :return: 包含区块哈希、时间戳、交易根等数据的标准化响应
         """
         try:
             self._validate_block_identifier(block_identifier)
-            url = f"{self.rpc_url}/blocks/{block_identifier}"
-            response = self.session.get(url, headers=self.headers)
-            response.raise_for_status()
-            
-            block_info = response.json()
+            self._validate_detail(detail)
+            block_info = self._tracked_head(block_identifier) or BLOCK_CACHE.get(self._cache_key("block", block_identifier))
+            if block_info is None:
+                block_info = self._get(f"/blocks/{block_identifier}")
+                self._cache_block(block_identifier, block_info)
             if block_info is None:
                 return BlockchainResponse(success=True, data="Block not found", error=None)
-            
-            data = f"""
-                id: {block_info["id"]},
-                parentID: {block_info["parentID"]},
-                number: {block_info["number"]},
-                size: {block_info["size"]},
-                timestamp: {block_info["timestamp"]},
-                beneficiary: {block_info["beneficiary"]},
-                gasUsed: {block_info["gasUsed"]},
-                gasLimit: {block_info["gasLimit"]},
-                stateRoot: {block_info["stateRoot"]},
-                receiptsRoot: {block_info["receiptsRoot"]},
-                signer: {block_info["signer"]},
-                txsFeatures: {block_info["txsFeatures"]},
-                isTrunk: {block_info["isTrunk"]},
-                isFinalized: {block_info["isFinalized"]},
-                transactions:{block_info["transactions"]}
-            """
+            data = self._format_block(block_info, detail)
             return BlockchainResponse(success=True, data=data, error=None)
         except requests.HTTPError as e:
-            print(f"Get block info error: {str(e)}")
+            logger.error(f"Get block info error: {str(e)}")
             if e.response.status_code == 400:
                 return BlockchainResponse(success=True, data="Block Id is not valid", error=str(e))
             else:
                 return BlockchainResponse(success=False, data=None, error=str(e))
         except requests.RequestException as e:
-            print(f"Get block info error: {str(e)}")
+            logger.error(f"Get block info error: {str(e)}")
             return BlockchainResponse(success=False, data=None, error=str(e))
     
     def get_transaction(self, tx_id: str) -> BlockchainResponse:
@@ -74,44 +82,32 @@ class Vechain(BaseBlockchain):
         """
         try:
             self._validate_tx_hash(tx_hash=tx_id)
-            url = f"{self.rpc_url}/transactions/{tx_id}"
-            response = self.session.get(url, headers=self.headers)
-            response.raise_for_status()
-            transaction_info = response.json()
+            transaction_info = BLOCK_CACHE.get(self._cache_key("tx", tx_id))
+            if transaction_info is None:
+                transaction_info = self._get(f"/transactions/{tx_id}")
+                if self._finality_unknown(transaction_info):
+                    self._refresh_finalized()
+                self._cache_transaction(tx_id, transaction_info)
             if transaction_info is None:
                 data = "Transaction not found"
                 return BlockchainResponse(success=True, data=data, error=None)
             else:
-                data = f"""
-                    id: {transaction_info["id"]},
-                    chainTag: {transaction_info["chainTag"]},
-                    blockRef: {transaction_info["blockRef"]},
-                    expiration: {transaction_info["expiration"]},
-                    gasPriceCoef: {transaction_info["gasPriceCoef"]},
-                    gas: {transaction_info["gas"]},
-                    nonce: {transaction_info["nonce"]},
-                    origin: {transaction_info["origin"]},
-                    delegator: {transaction_info["delegator"]},
-                    dependsOn: {transaction_info["dependsOn"]},
-                    size: {transaction_info["size"]},
-                    clauses: {transaction_info["clauses"]},
-                    meta: {transaction_info["meta"]}
-                """    
+                data = self._format_transaction(transaction_info)
                 return BlockchainResponse(success=True, data=data, error=None)
         except requests.HTTPError as e:
-            print(f"Get transaction error: {str(e)}")
+            logger.error(f"Get transaction error: {str(e)}")
             if e.response.status_code == 400:
                 return BlockchainResponse(success=True, data="Transaction not found", error=str(e))
             else:
                 return BlockchainResponse(success=False, data=None, error=str(e))
         except requests.RequestException as e:
-            print(f"Get transaction error: {str(e)}")
+            logger.error(f"Get transaction error: {str(e)}")
             return BlockchainResponse(success=False, data=None, error=str(e))
         except ValueError as e:
-            print(f"Error: {str(e)}")
+            logger.error(f"Error: {str(e)}")
             return BlockchainResponse(success=False, data=None, error=str(e))
         except Exception as e:
-            print(f"Unexpected error: {str(e)}")
+            logger.error(f"Unexpected error: {str(e)}")
             return BlockchainResponse(success=False, data=None, error=str(e))
            
     
@@ -123,33 +119,338 @@ class Vechain(BaseBlockchain):
         """
         try:
             self._validate_address(address=address)
-            url = f"{self.rpc_url}/accounts/{address}"
-            print(f"url:{url}")
-            response = self.session.get(url, headers=self.headers)
-            response.raise_for_status()
-            balance_info = response.json()
-            data = f"""
-                Balance:{Vechain.hex_to_decimal(balance_info['balance'])} VET
-                Energe:{Vechain.hex_to_decimal(balance_info['energy'])} VTHO
-                HasCode:{balance_info['hasCode']}
-            """
+            balance_info = self._get(f"/accounts/{address}")
+            data = self._format_balance(balance_info, address)
             return BlockchainResponse(success=True, data=data, error=None)
         except requests.HTTPError as e:
-            print(f"Get balance error: {str(e)}")
+            logger.error(f"Get balance error: {str(e)}")
             if e.response.status_code == 400:
                 return BlockchainResponse(success=True, data="Invalid address", error=str(e))
             else:
                 return BlockchainResponse(success=False, data=f"Get balance error: {str(e)}", error=str(e))
         except requests.RequestException as e:
-            print(f"Get balance error: {str(e)}")
+            logger.error(f"Get balance error: {str(e)}")
             return BlockchainResponse(success=False, data=f"Get balance error: {str(e)}", error=str(e))
         except ValueError as e:
-            print(f"Error: {str(e)}")
+            logger.error(f"Error: {str(e)}")
             return BlockchainResponse(success=False, data=f"Error: {str(e)}", error=str(e))
         except Exception as e:
-            print(f"Unexpected error: {str(e)}")
+            logger.error(f"Unexpected error: {str(e)}")
             return BlockchainResponse(success=False, data=f"Unexpected error: {str(e)}", error=str(e))
     
+    async def get_block_info_async(self, block_identifier: Union[int, str], detail: str = "summary") -> BlockchainResponse:
+        """get_block_info 的异步版本"""
+        try:
+            self._validate_detail(detail)
+            block_info = await self._fetch_block_async(block_identifier)
+            if block_info is None:
+                return BlockchainResponse(success=True, data="Block not found", error=None)
+            data = self._format_block(block_info, detail)
+            return BlockchainResponse(success=True, data=data, error=None)
+        except aiohttp.ClientResponseError as e:
+            logger.error(f"Get block info error: {str(e)}")
+            if e.status == 400:
+                return BlockchainResponse(success=True, data="Block Id is not valid", error=str(e))
+            else:
+                return BlockchainResponse(success=False, data=None, error=str(e))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Get block info error: {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+    async def get_transaction_async(self, tx_id: str) -> BlockchainResponse:
+        """get_transaction 的异步版本"""
+        try:
+            self._validate_tx_hash(tx_hash=tx_id)
+            transaction_info = BLOCK_CACHE.get(self._cache_key("tx", tx_id))
+            if transaction_info is None:
+                transaction_info = await self._get_async(f"/transactions/{tx_id}")
+                if self._finality_unknown(transaction_info):
+                    await self._refresh_finalized_async()
+                self._cache_transaction(tx_id, transaction_info)
+            if transaction_info is None:
+                return BlockchainResponse(success=True, data="Transaction not found", error=None)
+            data = self._format_transaction(transaction_info)
+            return BlockchainResponse(success=True, data=data, error=None)
+        except aiohttp.ClientResponseError as e:
+            logger.error(f"Get transaction error: {str(e)}")
+            if e.status == 400:
+                return BlockchainResponse(success=True, data="Transaction not found", error=str(e))
+            else:
+                return BlockchainResponse(success=False, data=None, error=str(e))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Get transaction error: {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+        except ValueError as e:
+            logger.error(f"Error: {str(e)}")
+            return BlockchainResponse(success=False, data=None, error=str(e))
+
+    async def get_balance_async(self, address: str) -> BlockchainResponse:
+        """get_balance 的异步版本"""
+        try:
+            self._validate_address(address=address)
+            balance_info = await self._get_async(f"/accounts/{address}")
+            data = self._format_balance(balance_info, address)
+            return BlockchainResponse(success=True, data=data, error=None)
+        except aiohttp.ClientResponseError as e:
+            logger.error(f"Get balance error: {str(e)}")
+            if e.status == 400:
+                return BlockchainResponse(success=True, data="Invalid address", error=str(e))
+            else:
+                return BlockchainResponse(success=False, data=f"Get balance error: {str(e)}", error=str(e))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Get balance error: {str(e)}")
+            return BlockchainResponse(success=False, data=f"Get balance error: {str(e)}", error=str(e))
+        except ValueError as e:
+            logger.error(f"Error: {str(e)}")
+            return BlockchainResponse(success=False, data=f"Error: {str(e)}", error=str(e))
+
+    def _get(self, path: str):
+        """通过共享会话请求Thor REST接口"""
+        response = self.session.get(f"{self.rpc_url}{path}", headers=self.headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def _get_async(self, path: str):
+        """通过共享异步会话请求Thor REST接口"""
+        session = get_async_session("vechain")
+        async with session.get(f"{self.rpc_url}{path}", headers=self.headers) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def _post_async(self, path: str, body: dict):
+        """通过共享异步会话POST到Thor REST接口"""
+        session = get_async_session("vechain")
+        async with session.post(f"{self.rpc_url}{path}", json=body, headers=self.headers) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def _call_contracts_async(self, calls: List[Tuple[str, str]]) -> List[RpcResult]:
+        """所有调用作为一个多 clause 模拟执行请求（POST /accounts/*），在同一区块状态下执行"""
+        outputs = await self._post_async("/accounts/*", {
+            "clauses": [{"to": to, "value": "0x0", "data": data} for to, data in calls]
+        })
+        return [
+            RpcResult(None, output.get("vmError") or "execution reverted") if output.get("reverted")
+            else RpcResult(output.get("data"), None)
+            for output in outputs
+        ]
+
+    async def _extend_fee_window_async(self, window: FeeWindow, head_number: int, count: int):
+        """
+        新区块以 expanded 形式并发获取，同时读取 baseGasPrice；
+        每笔交易的单位优先费为 baseGasPrice * gasPriceCoef / 255（动态费用交易直接取 maxPriorityFeePerGas），
+        区块内按 gasUsed 加权取分位数；区块带 baseFeePerGas 时以其作为基础费用
+        """
+        heights = range(head_number - count + 1, head_number + 1)
+        (params, *blocks) = await asyncio.gather(
+            self._call_contracts_async([(PARAMS_ADDRESS, BASE_GAS_PRICE_DATA)]),
+            *(self._fetch_block_async(height, TRANSACTIONS_DETAIL) for height in heights)
+        )
+        if params[0].error:
+            raise ValueError(f"Read baseGasPrice failed: {params[0].error}")
+        base_gas_price = decode_uint(params[0].result)
+        for height, block_info in zip(heights, blocks):
+            if block_info is None:
+                raise ValueError(f"Block not found: {height}")
+            transactions = block_info["transactions"]
+            priority = [
+                int(tx["maxPriorityFeePerGas"], 16) if tx.get("maxPriorityFeePerGas")
+                else base_gas_price * int(tx.get("gasPriceCoef") or 0) // 255
+                for tx in transactions
+            ]
+            gas_used = [tx.get("gasUsed") or 0 for tx in transactions]
+            base_fee = int(block_info["baseFeePerGas"], 16) if block_info.get("baseFeePerGas") else base_gas_price
+            ratio = block_info["gasUsed"] / block_info["gasLimit"] if block_info["gasLimit"] else 0.0
+            window.append(height, base_fee, ratio, weighted_percentiles(priority, gas_used, REWARD_PERCENTILES))
+        # 没有协议计算的下一区块基础费用，按最新区块估计
+        window.next_base_fee = None
+
+    def _format_fee_estimate(self, summary: Dict) -> FeeEstimateResult:
+        """
+        附带与三档优先费对应的 gasPriceCoef（0-255），用于传统交易；
+        传统交易按 baseGasPrice * (1 + coef/255) 付费，max_fee 即该单位价格（不预留基础费用上涨空间）
+        """
+        base_fee = summary["base_fee"]
+        coefs = {tier: min(255, round(fee * 255 / base_fee)) if base_fee else 0 for tier, fee in summary["priority_fee"].items()}
+        summary["max_fee"] = {tier: base_fee + fee for tier, fee in summary["priority_fee"].items()}
+        return FeeEstimateResult(
+            chain=self.chain_name, symbol="VTHO", extra={"source": "baseGasPrice", "gas_price_coef": coefs}, **summary
+        )
+
+    async def _fetch_block_async(self, block_identifier: Union[int, str], detail: str = "summary") -> dict:
+        """
+        经缓存获取原始区块，区块不存在时返回None
+        TRANSACTIONS_DETAIL 时为 expanded 形式（交易为含执行结果的完整对象），否则交易仅含ID
+        """
+        self._validate_block_identifier(block_identifier)
+        expanded = detail == TRANSACTIONS_DETAIL
+        kind = "block:expanded" if expanded else "block"
+        block_info = (None if expanded else self._tracked_head(block_identifier)) or BLOCK_CACHE.get(self._cache_key(kind, block_identifier))
+        if block_info is None:
+            block_info = await self._get_async(f"/blocks/{block_identifier}" + ("?expanded=true" if expanded else ""))
+            self._cache_block(block_identifier, block_info, kind)
+        return block_info
+
+    def _block_transactions(self, block_info: dict) -> list:
+        return block_info["transactions"]
+
+    def _format_block_transaction(self, block_info: dict, tx: dict) -> TransactionResult:
+        """expanded 交易没有 meta，由区块补全；附带执行结果（是否回滚、消耗的gas与VTHO）"""
+        meta = {"blockID": block_info["id"], "blockNumber": block_info["number"], "blockTimestamp": block_info["timestamp"]}
+        result = self._format_transaction(dict(tx, meta=meta))
+        result.status = "reverted" if tx.get("reverted") else "success"
+        result.extra.update({
+            "gas_used": tx.get("gasUsed"),
+            "gas_payer": tx.get("gasPayer"),
+            "paid": str(to_units(int(tx["paid"], 16), 18)) if tx.get("paid") else None,
+            "paid_symbol": "VTHO",
+        })
+        return result
+
+    async def follow_head(self, tracker: HeadTracker):
+        """
+        订阅 /subscriptions/block websocket；订阅消息缺少 isTrunk/isFinalized，
+        收到新区块后按ID获取完整区块。obsolete 消息表示该区块已被分叉丢弃
+        """
+        url = re.sub(r"^http", "ws", self.rpc_url) + "/subscriptions/block"
+        session = get_async_session("vechain")
+        async with session.ws_connect(url, headers=self.headers, heartbeat=30) as ws:
+            async for message in ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    break
+                block = json.loads(message.data)
+                if block.get("obsolete"):
+                    logger.warning(f"Vechain reorg: block {block['number']} is obsolete")
+                    tracker.reorg()
+                    continue
+                block_info = await self._get_async(f"/blocks/{block['id']}")
+                if block_info is not None:
+                    self._cache_block(block_info["id"], block_info)
+                    tracker.update(block_info["number"], block_info["id"], block_info["parentID"], block_info)
+        raise ConnectionError(f"Block subscription closed: {ws.close_code}")
+
+    def _block_fields(self, block_info: dict) -> Dict[str, float]:
+        return {
+            "number": block_info["number"],
+            "timestamp": block_info["timestamp"],
+            "tx_count": len(block_info["transactions"]),
+            "size": block_info["size"],
+            "gas_used": block_info["gasUsed"],
+            "gas_limit": block_info["gasLimit"],
+            "gas_utilization": block_info["gasUsed"] / block_info["gasLimit"] if block_info["gasLimit"] else 0.0,
+        }
+
+    def _cache_block(self, block_identifier: Union[int, str], block_info: dict, kind: str = "block"):
+        """best/finalized 只做短TTL缓存；isFinalized 的区块按高度和ID永久缓存"""
+        if block_info is None:
+            return
+        if block_identifier in BLOCK_TAGS:
+            BLOCK_CACHE.put_head(self._cache_key(kind, block_identifier), block_info)
+        if block_info.get("isFinalized"):
+            self._finalized_number = max(self._finalized_number, block_info["number"])
+            BLOCK_CACHE.put(self._cache_key(kind, block_info["number"]), block_info, final=True)
+            BLOCK_CACHE.put(self._cache_key(kind, block_info["id"]), block_info, final=True)
+
+    def _finality_unknown(self, transaction_info: dict) -> bool:
+        """
+        交易所在区块高于已知的最终确定高度，且 finalized 区块的短TTL缓存已失效（仍有效时据此更新高度），
+        需要查询一次 /blocks/finalized 才能判断交易是否已最终确定
+        """
+        number = ((transaction_info or {}).get("meta") or {}).get("blockNumber")
+        if number is None or number <= self._finalized_number:
+            return False
+        cached = BLOCK_CACHE.get(self._cache_key("block", "finalized"))
+        if cached is not None:
+            self._finalized_number = max(self._finalized_number, cached["number"])
+            return False
+        return True
+
+    def _refresh_finalized(self):
+        """查询 finalized 区块并短TTL缓存；失败时交易按未最终确定处理"""
+        try:
+            self._cache_block("finalized", self._get("/blocks/finalized"))
+        except requests.RequestException as e:
+            logger.warning(f"Get finalized block error: {str(e)}")
+
+    async def _refresh_finalized_async(self):
+        """_refresh_finalized 的异步版本"""
+        try:
+            self._cache_block("finalized", await self._get_async("/blocks/finalized"))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Get finalized block error: {str(e)}")
+
+    def _cache_transaction(self, tx_id: str, transaction_info: dict):
+        """交易所在区块不高于已知的最终确定高度时永久缓存"""
+        meta = (transaction_info or {}).get("meta") or {}
+        final = meta.get("blockNumber", self._finalized_number + 1) <= self._finalized_number
+        BLOCK_CACHE.put(self._cache_key("tx", tx_id), transaction_info, final=final)
+
+    def _format_block(self, block_info: dict, detail: str = "summary") -> BlockResult:
+        result = BlockResult(
+            chain=self.chain_name,
+            number=block_info["number"],
+            hash=block_info["id"],
+            parent_hash=block_info["parentID"],
+            timestamp=block_info["timestamp"],
+            size=block_info["size"],
+            gas_used=block_info["gasUsed"],
+            gas_limit=block_info["gasLimit"],
+            extra={
+                "beneficiary": block_info["beneficiary"],
+                "state_root": block_info["stateRoot"],
+                "receipts_root": block_info["receiptsRoot"],
+                "signer": block_info["signer"],
+                "txs_features": block_info["txsFeatures"],
+                "is_trunk": block_info["isTrunk"],
+                "is_finalized": block_info["isFinalized"],
+            }
+        )
+        if detail != "header":
+            result.tx_count = len(block_info["transactions"])
+        if detail == "full":
+            result.transactions = block_info["transactions"]
+        return result
+
+    def _format_transaction(self, transaction_info: dict) -> TransactionResult:
+        meta = transaction_info.get("meta") or {}
+        clauses = transaction_info["clauses"]
+        return TransactionResult(
+            chain=self.chain_name,
+            hash=transaction_info["id"],
+            block_number=meta.get("blockNumber"),
+            block_hash=meta.get("blockID"),
+            from_address=transaction_info["origin"],
+            to_address=clauses[0]["to"] if len(clauses) == 1 else None,
+            value=sum(to_units(int(clause["value"], 16), 18) for clause in clauses),
+            symbol="VET",
+            extra={
+                "chain_tag": transaction_info["chainTag"],
+                "block_ref": transaction_info["blockRef"],
+                "expiration": transaction_info["expiration"],
+                "gas_price_coef": transaction_info["gasPriceCoef"],
+                "gas": transaction_info["gas"],
+                "nonce": transaction_info["nonce"],
+                "delegator": transaction_info["delegator"],
+                "depends_on": transaction_info["dependsOn"],
+                "size": transaction_info["size"],
+                "clauses": clauses,
+                "block_timestamp": meta.get("blockTimestamp"),
+            }
+        )
+
+    def _format_balance(self, balance_info: dict, address: Optional[str] = None) -> BalanceResult:
+        return BalanceResult(
+            chain=self.chain_name,
+            address=address,
+            balance=to_units(int(balance_info["balance"], 16), 18),
+            symbol="VET",
+            extra={
+                "energy": str(to_units(int(balance_info["energy"], 16), 18)),
+                "energy_symbol": "VTHO",
+                "has_code": balance_info["hasCode"],
+            }
+        )
+
     @staticmethod
     def hex_to_decimal(hex_str: str, divisor: int = 10**18) -> float:
         decimal_value = int(hex_str, 16)
@@ -160,8 +461,8 @@ class Vechain(BaseBlockchain):
             if block_identifier < 0:
                 raise ValueError("Block identifier must be a non-negative integer")
         elif isinstance(block_identifier, str):
-            if block_identifier == "best":
-                return 
+            if block_identifier in BLOCK_TAGS:
+                return
             elif not re.match(r'^(0x)?[0-9a-fA-F]{64}$', block_identifier):
                 raise ValueError("Block identifier must be an integer or string")
     def _validate_address(self, address):
@@ -178,9 +479,10 @@ class Vechain(BaseBlockchain):
     
            
 if __name__ == "__main__":
+    # 本地调试可先运行 python benchmarks/mock_nodes.py 并按其输出设置环境变量，避免访问主网
     VECHAIN_NODE_URL = os.getenv("VECHAIN_NODE_URL")
+    if not VECHAIN_NODE_URL:
+        raise ValueError("VECHAIN_NODE_URL environment variable is not set")
     vechain = Vechain(VECHAIN_NODE_URL)
-    # print(vechain.get_block_info("best"))
-    # print(vechain.get_balance("0x1234567890abcdef1234567890abcdef12345678"))
-    #print(vechain.get_transaction("0x1c31133a632433cd4896c6303a562926eb84378356dee33484ebf6b72391daed"))
-    print(vechain.get_price())
\ No newline at end of file
+    print(vechain.get_block_info("best"))
+    print(vechain.get_balance("0x1234567890abcdef1234567890abcdef12345678"))
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+磁盘预热缓存
+
+已最终确定的区块/交易结果不会再变化，重启后没有理由重新向节点请求。结果以追加方式写入日志文件，
+每条记录为 [crc32, 键长, 值长] 头 + 键 + pickle 值；进程内只保存 键 -> (偏移, 长度) 的索引，
+值在命中时才从文件读取（os.pread），启动时间与内存占用与日志大小基本无关。
+
+日志在第一次读写时才打开（导入模块不访问文件系统），索引在压缩和进程退出时写入旁边的 .idx 文件；
+打开时载入索引后只需扫描其后新追加的记录头。
+日志超过大小上限时压缩：按写入顺序保留最新的记录直到目标大小，写入新文件后原子替换。
+多进程追加与压缩通过文件锁（flock）互斥；其他进程替换日志后，写入前会发现并重新打开。
+记录键带有该链节点URL（<名称>_NODE_URL）的摘要，更换节点（主网/测试网、模拟节点）后不会读到其他网络的结果。
+缓存是尽力而为的：文件不可用、记录损坏时按未命中处理，不影响请求。
+"""
+import atexit
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # 非 POSIX 平台（无 flock/pread）不使用磁盘缓存
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 日志文件路径，设置为空字符串时不使用磁盘缓存
+WARM_CACHE_PATH = os.getenv(
+    "BLOCKCHAIN_MCP_WARM_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "blockchain_mcp", "warm_cache.log")
+)
+WARM_CACHE_MAX_BYTES = int(os.getenv("BLOCKCHAIN_MCP_WARM_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# 压缩后保留的大小占上限的比例
+WARM_CACHE_COMPACT_TO = float(os.getenv("BLOCKCHAIN_MCP_WARM_CACHE_COMPACT_TO", "0.75"))
+
+HEADER = struct.Struct("<III")
+INDEX_SUFFIX = ".idx"
+
+
+@functools.lru_cache(maxsize=None)
+def node_namespace(chain: str) -> str:
+    """该链节点URL（<名称>_NODE_URL）的摘要，区分不同网络（主网/测试网、分叉、模拟节点）的持久化结果"""
+    urls = sorted(url.strip().rstrip("/") for url in os.getenv(f"{chain.upper()}_NODE_URL", "").split(","))
+    return hashlib.sha1(",".join(urls).encode()).hexdigest()[:12]
+
+
+def record_key(key: Hashable) -> str:
+    """缓存键 (链, 类型, 标识) 转为记录键：节点URL摘要 + repr"""
+    chain = key[0] if isinstance(key, tuple) and key and isinstance(key[0], str) else ""
+    return f"{node_namespace(chain)}:{key!r}"
+
+
+class WarmCache:
+    def __init__(self, path: str, max_bytes: int = WARM_CACHE_MAX_BYTES, compact_to: float = WARM_CACHE_COMPACT_TO):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compact_to = compact_to
+        self._lock = threading.Lock()
+        # 键 -> (记录偏移, 记录长度)，按写入顺序
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._size = 0
+        self._fd = -1
+        # 打开失败或已关闭后不再打开，按未命中处理
+        self._closed = False
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "loaded": 0, "compactions": 0, "errors": 0}
+
+    def _ensure_open(self) -> bool:
+        """持有 self._lock 时调用：第一次使用时打开日志，返回日志是否可用"""
+        if self._fd < 0 and not self._closed:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._open()
+                self._stats["loaded"] = len(self._index)
+            except OSError as e:
+                logger.warning(f"Warm cache file {self.path} unavailable, caching in memory only: {str(e)}")
+                self._closed = True
+        return self._fd >= 0
+
+    def _open(self):
+        """打开日志并重建索引：载入 .idx 快照（与当前日志是同一文件时），再扫描其后的记录头"""
+        if self._fd >= 0:
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o600)
+        self._index, self._size = {}, 0
+        try:
+            with open(self.path + INDEX_SUFFIX, "rb") as handle:
+                snapshot = pickle.load(handle)
+            if snapshot["inode"] == os.fstat(self._fd).st_ino and snapshot["size"] <= os.fstat(self._fd).st_size:
+                self._index, self._size = snapshot["index"], snapshot["size"]
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError):
+            pass
+        self._scan()
+
+    def _scan(self):
+        """从已索引位置起读取新记录头；长度越过文件末尾的记录视为未写完，停止扫描"""
+        end = os.fstat(self._fd).st_size
+        offset = self._size
+        while offset + HEADER.size <= end:
+            header = os.pread(self._fd, HEADER.size, offset)
+            _, key_length, value_length = HEADER.unpack(header)
+            length = HEADER.size + key_length + value_length
+            if offset + length > end:
+                break
+            key = os.pread(self._fd, key_length, offset + HEADER.size).decode("utf-8", "replace")
+            self._index[key] = (offset, length)
+            offset += length
+        self._size = offset
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        key = record_key(key)
+        with self._lock:
+            if not self._ensure_open():
+                self._stats["misses"] += 1
+                return None
+            location = self._index.get(key)
+            if location is None:
+                location = self._refresh(key)
+            fd = self._fd
+        value = None
+        if location is not None:
+            try:
+                record = os.pread(fd, location[1], location[0])
+                checksum, key_length, _ = HEADER.unpack_from(record)
+                body = record[HEADER.size:]
+                if zlib.crc32(body) != checksum:
+                    raise ValueError("checksum mismatch")
+                value = pickle.loads(body[key_length:])
+            except (OSError, ValueError, struct.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+                self._count("errors")
+                logger.debug(f"Warm cache read failed for {key}: {str(e)}")
+                with self._lock:
+                    if self._index.get(key) == location:
+                        del self._index[key]
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def _refresh(self, key: str) -> Optional[Tuple[int, int]]:
+        """未命中时读取其他进程新追加的记录（日志被替换过则重新打开）"""
+        try:
+            if os.stat(self.path).st_ino != os.fstat(self._fd).st_ino:
+                self._open()
+            elif os.fstat(self._fd).st_size > self._size:
+                self._scan()
+        except OSError as e:
+            self._stats["errors"] += 1
+            logger.debug(f"Warm cache refresh failed: {str(e)}")
+        return self._index.get(key)
+
+    def set(self, key: Hashable, value: Any):
+        """追加一条记录；已有的键不重复写入（只用于不会变化的结果）"""
+        key = record_key(key)
+        with self._lock:
+            if not self._ensure_open() or key in self._index:
+                return
+        try:
+            encoded = key.encode("utf-8")
+            body = encoded + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            self._count("errors")
+            return
+        record = HEADER.pack(zlib.crc32(body), len(encoded), len(body) - len(encoded)) + body
+        if len(record) > self.max_bytes * self.compact_to:
+            return
+        with self._lock:
+            try:
+                self._locked(self._append, key, record)
+            except OSError as e:
+                self._stats["errors"] += 1
+                logger.debug(f"Warm cache write failed for {key}: {str(e)}")
+                return
+            self._stats["writes"] += 1
+            compact = self._size > self.max_bytes
+        if compact:
+            self.compact()
+
+    def _append(self, key: str, record: bytes):
+        """持有文件锁时调用：日志被其他进程压缩替换过则先重新打开，再读取其他进程追加的记录，最后写到文件末尾"""
+        if os.stat(self.path).st_ino != os.fstat(self._fd).st_ino:
+            self._open()
+        self._scan()
+        if key in self._index:
+            return
+        offset = self._size
+        os.pwrite(self._fd, record, offset)
+        self._index[key] = (offset, len(record))
+        self._size = offset + len(record)
+
+    def compact(self):
+        """按写入顺序保留最新的记录直到目标大小，写入新日志后原子替换并保存索引"""
+        with self._lock:
+            if not self._ensure_open():
+                return
+            try:
+                self._locked(self._compact)
+            except OSError as e:
+                self._stats["errors"] += 1
+                logger.warning(f"Warm cache compaction failed: {str(e)}")
+
+    def _compact(self):
+        self._scan()
+        target = self.max_bytes * self.compact_to
+        kept, total = [], 0
+        for key, (offset, length) in reversed(list(self._index.items())):
+            if total + length > target:
+                break
+            kept.append((key, offset, length))
+            total += length
+        temporary = self.path + ".compact"
+        index, position = {}, 0
+        with open(temporary, "wb") as handle:
+            for key, offset, length in reversed(kept):
+                handle.write(os.pread(self._fd, length, offset))
+                index[key] = (position, length)
+                position += length
+        os.replace(temporary, self.path)
+        os.close(self._fd)
+        self._fd = os.open(self.path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        self._index, self._size = index, position
+        self._stats["compactions"] += 1
+        self._save_index()
+
+    def _save_index(self):
+        snapshot = {"inode": os.fstat(self._fd).st_ino, "size": self._size, "index": self._index}
+        temporary = self.path + INDEX_SUFFIX + ".tmp"
+        with open(temporary, "wb") as handle:
+            pickle.dump(snapshot, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self.path + INDEX_SUFFIX)
+
+    def _locked(self, function, *args):
+        """在跨进程文件锁内执行（锁文件独立于日志，日志被替换后仍是同一把锁）"""
+        with open(self.path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                return function(*args)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def close(self):
+        """保存索引快照，下次启动无需重新扫描"""
+        with self._lock:
+            self._closed = True
+            if self._fd < 0:
+                return
+            try:
+                self._save_index()
+            except OSError as e:
+                logger.debug(f"Warm cache index save failed: {str(e)}")
+            os.close(self._fd)
+            self._fd = -1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._index), bytes=self._size)
+        stats["path"] = self.path
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+
+def open_warm_cache(path: Optional[str] = WARM_CACHE_PATH) -> Optional[WarmCache]:
+    """路径为空或平台不支持时返回 None（只使用内存缓存）；日志文件在第一次读写时才打开"""
+    if not path or fcntl is None:
+        return None
+    cache = WarmCache(path)
+    atexit.register(cache.close)
+    return cache
+
+
+WARM_CACHE: Optional[WarmCache] = open_warm_cache()